@@ -1,26 +1,34 @@
 # -*- coding: utf-8 -*-
 import os
+import re
 import time
 import json
 import random
 import typing
 import shutil
+import queue
+import atexit
 import sqlite3
 import hashlib
+import threading
 import collections
 from .datatype import DynamicObject, str2float, str2number, DynamicObjectError
 from typing import Any, Optional, Union, List, Tuple, Sequence, Dict, Callable
-from ..misc.settings import UiInputSetting, UiIntegerInput, UiDoubleInput
+from ..misc.settings import UiInputSetting, UiIntegerInput, UiDoubleInput, UiLogMessage, LoggingMsgCallback
 
 try:
     from pysqlcipher3 import dbapi2 as sqlcipher
 except ImportError:
     import sqlite3 as sqlcipher
 
-__all__ = ['SQLiteDatabase', 'SQLCipherDatabase', 'SQLiteUserPasswordDatabase', 'SQLiteDatabaseError',
+__all__ = ['SQLiteDatabase', 'SQLiteReaderPool', 'SQLCipherDatabase', 'SQLiteUserPasswordDatabase',
+           'SQLiteDatabaseError', 'SQLiteWriteBehind', 'SQLiteWriteBehindStatistic',
+           'SQLiteInstrumentedCursor', 'SQLiteStatementStatistic',
            'SQLiteDatabaseCreator', 'SQLiteGeneralSettingsItem',
-           'DBItemType', 'DBItemSearchAttr', 'DBTable', 'DBColumn',
-           'SQLiteUIElementScheme', 'SQLiteUITableScheme', 'SQLiteUIScheme', 'sqlite_create_tables']
+           'DBItemType', 'DBItemSearchAttr', 'DBTable', 'DBColumn', 'DBTableSchema',
+           'SQLiteUIElementScheme', 'SQLiteUITableScheme', 'SQLiteUIScheme', 'sqlite_create_tables',
+           'sqlite_fts_name', 'sqlite_fts_sentences', 'sqlite_fts_drop_sentences', 'sqlite_fts_condition',
+           'sqlite_create_fts_index', 'sqlite_index_sentence']
 
 
 class SQLiteDatabaseError(Exception):
@@ -29,6 +37,7 @@ class SQLiteDatabaseError(Exception):
 
 DBItemType = collections.namedtuple('DBItemType', 'int real text blob')(*'INTEGER REAL TEXT BLOB'.split())
 DBItemSearchAttr = collections.namedtuple('DBItemSubtype', 'Normal Timestamp Enum Fuzzy')(*(0x1, 0x2, 0x4, 0x8))
+DBTableSchema = collections.namedtuple('DBTableSchema', 'columns types autoincrement pk')
 
 
 class DBColumn(DynamicObject):
@@ -85,9 +94,75 @@ class DBColumn(DynamicObject):
         }.get(self.type.upper(), '')
 
 
+def sqlite_index_sentence(name: str, columns: typing.Sequence[str], unique: bool = False, index_name: str = '') -> str:
+    """Create index sentence, default index name is `{table}_{columns}_idx`"""
+    index_name = index_name or f'{name}_{"_".join(columns)}_idx'
+    unique = 'UNIQUE ' if unique else ''
+    return f'CREATE {unique}INDEX IF NOT EXISTS {index_name} ON {name} ({", ".join(columns)});'
+
+
+def sqlite_fts_name(name: str) -> str:
+    return f'{name}_fts'
+
+
+def sqlite_fts_sentences(name: str, columns: typing.Sequence[str], tokenize: str = 'trigram') -> typing.List[str]:
+    """Sentences to create a shadow FTS5 index for table `name` columns, kept in sync by triggers
+
+    Index is an external content table(only index is stored, content is read from `name`),
+    trigram tokenizer supports substring match like `LIKE '%value%'`, requires sqlite >= 3.34.0
+
+    :param name: table name
+    :param columns: indexed columns name
+    :param tokenize: fts5 tokenizer
+    :return: create index, triggers and rebuild index sentences
+    """
+    fts = sqlite_fts_name(name)
+    new = ', '.join(f'new.{x}' for x in columns)
+    old = ', '.join(f'old.{x}' for x in columns)
+    columns = ', '.join(columns)
+
+    insert = f'INSERT INTO {fts}(rowid, {columns}) VALUES (new.rowid, {new});'
+    delete = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.rowid, {old});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content='{name}', tokenize='{tokenize}');",
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {name} BEGIN {insert} END;',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {name} BEGIN {delete} END;',
+        f'CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE ON {name} BEGIN {delete} {insert} END;',
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild');",
+    ]
+
+
+def sqlite_fts_drop_sentences(name: str) -> typing.List[str]:
+    """Sentences to drop table `name` shadow FTS5 index and its triggers"""
+    fts = sqlite_fts_name(name)
+    return [f'DROP TRIGGER IF EXISTS {fts}_{x};' for x in ('ai', 'ad', 'au')] + [f'DROP TABLE IF EXISTS {fts};']
+
+
+def sqlite_fts_condition(name: str, column: str, value: str) -> str:
+    """Condition of records which `column` contains `value`, matched on table `name` shadow FTS5 index"""
+    fts = sqlite_fts_name(name)
+    phrase = '"{}"'.format(value.replace('"', '""')).replace("'", "''")
+    return f"rowid IN (SELECT rowid FROM {fts} WHERE {fts} MATCH '{column} : {phrase}')"
+
+
 class DBTable:
+    # Trigram tokenizer could not match less than 3 characters
+    FTS_MIN_LENGTH = 3
+
     def __init__(self, name: str, scheme: typing.Sequence[DBColumn],
-                 readonly: bool = False, init_records: typing.Sequence[typing.Dict[str, typing.Any]] = None):
+                 readonly: bool = False, init_records: typing.Sequence[typing.Dict[str, typing.Any]] = None,
+                 fts: bool = False, indexes: typing.Sequence[typing.Sequence[str]] = None):
+        """Table definition
+
+        :param name: table name
+        :param scheme: table columns
+        :param readonly: table is readonly
+        :param init_records: records inserted when table is created
+        :param fts: create shadow FTS5 index for fuzzy search columns
+        :param indexes: secondary indexes, each index is a sequence of columns name
+        """
+        self.fts = fts
+        self.indexes = [tuple(x) for x in indexes or list()]
         self.name = name
         self.scheme = scheme
         self.readonly = readonly
@@ -146,9 +221,19 @@ class DBTable:
     def get_fuzzy_columns(self) -> typing.List[int]:
         return [i for i, c in enumerate(self.scheme) if c.search_attr & DBItemSearchAttr.Fuzzy]
 
+    def get_fts_columns(self) -> typing.List[str]:
+        return [self.scheme[x].name for x in self.get_fuzzy_columns()] if self.fts else list()
+
     def get_create_sentence(self) -> str:
         return f'CREATE TABLE {self.name} ({", ".join([str(x) for x in self.scheme])});'
 
+    def get_fts_sentences(self) -> typing.List[str]:
+        columns = self.get_fts_columns()
+        return sqlite_fts_sentences(self.name, columns) if columns else list()
+
+    def get_index_sentences(self) -> typing.List[str]:
+        return [sqlite_index_sentence(self.name, columns) for columns in self.indexes]
+
     def get_placeholder_sentence(self) -> str:
         return self.get_insert_sentence(self.default_values())
 
@@ -163,25 +248,254 @@ class DBTable:
         return f'UPDATE {self.name} SET {", ".join(v)} WHERE {cond}'
 
 
+class SQLiteReaderPool(object):
+    def __init__(self, db_path: str, timeout: int = 20, pragmas: Sequence[str] = (), size: int = 4):
+        """Per-thread read only connections pool
+
+        Each thread gets it's own connection, connection of exited thread is reclaimed and reused
+
+        :param db_path: database path
+        :param timeout: connection busy timeout
+        :param pragmas: pragmas executed when connection is created
+        :param size: max idle connections number
+        """
+        self.__size = size
+        self.__path = db_path
+        self.__timeout = timeout
+        self.__pragmas = pragmas
+
+        self.__idle = list()
+        self.__using = dict()
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        with self.__lock:
+            return len(self.__idle) + len(self.__using)
+
+    def __connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(f'file:{self.__path}?mode=ro', timeout=self.__timeout, uri=True,
+                               check_same_thread=False)
+        for pragma in self.__pragmas:
+            conn.execute(f'PRAGMA {pragma}')
+
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Get current thread connection"""
+        try:
+            return self.__using[threading.get_ident()][1]
+        except KeyError:
+            pass
+
+        with self.__lock:
+            # Reclaim connections of exited threads
+            for ident, (thread, conn) in list(self.__using.items()):
+                if not thread.is_alive():
+                    del self.__using[ident]
+                    self.__idle.append(conn)
+
+            while len(self.__idle) > self.__size:
+                self.__idle.pop().close()
+
+            conn = self.__idle.pop() if self.__idle else self.__connect()
+            self.__using[threading.get_ident()] = (threading.current_thread(), conn)
+            return conn
+
+    def close(self):
+        with self.__lock:
+            for conn in self.__idle + [x[1] for x in self.__using.values()]:
+                conn.close()
+
+            self.__idle.clear()
+            self.__using.clear()
+
+
+class SQLiteConcurrentCursor(object):
+    READ_STATEMENTS = ('SELECT', 'WITH', 'EXPLAIN', 'PRAGMA TABLE_INFO')
+
+    def __init__(self, writer: sqlite3.Connection, readers: SQLiteReaderPool, lock: threading.RLock):
+        """Cursor dispatches read statements to current thread reader connection, others to the writer
+
+        Writes are serialized by transaction: the thread which opens a writer transaction holds writer lock
+        until it's committed or rollback(`end`), other writers are blocked until then, so a thread must always
+        end it's own transaction. Transaction owner thread reads from the writer to get it's own changes,
+        other threads read the latest committed data without blocking
+
+        :param writer: writer connection
+        :param readers: reader connections pool
+        :param lock: writer lock
+        """
+        self.__lock = lock
+        self.__owner = None
+        self.__writer = writer
+        self.__readers = readers
+        self.__local = threading.local()
+
+    def __getattr__(self, item):
+        return getattr(self.__cursor(), item)
+
+    def __cursor(self) -> sqlite3.Cursor:
+        try:
+            return self.__local.cursor
+        except AttributeError:
+            self.__local.cursor = self.__writer.cursor()
+            return self.__local.cursor
+
+    def __is_read(self, sql: str) -> bool:
+        if self.__owner == threading.get_ident():
+            return False
+
+        return ' '.join(sql.split()[:2]).upper().startswith(self.READ_STATEMENTS)
+
+    def __write(self, method: str, *args) -> sqlite3.Cursor:
+        ident = threading.get_ident()
+        self.__lock.acquire()
+
+        try:
+            self.__local.cursor = self.__writer.cursor()
+            return getattr(self.__local.cursor, method)(*args)
+        finally:
+            # Transaction opened by this statement, keep holding writer lock until transaction is ended
+            if self.__writer.in_transaction and self.__owner != ident:
+                self.__owner = ident
+            else:
+                # Transaction ended by this statement(e.g. raw COMMIT)
+                if not self.__writer.in_transaction and self.__owner == ident:
+                    self.__owner = None
+                    self.__lock.release()
+
+                self.__lock.release()
+
+    def end(self, rollback: bool = False):
+        """Commit or rollback current thread transaction and release writer lock"""
+        with self.__lock:
+            if rollback:
+                self.__writer.rollback()
+            else:
+                self.__writer.commit()
+
+            if self.__owner == threading.get_ident():
+                self.__owner = None
+                self.__lock.release()
+
+    def execute(self, sql: str, parameters: Sequence[Any] = ()) -> sqlite3.Cursor:
+        if self.__is_read(sql):
+            self.__local.cursor = self.__readers.connection().cursor()
+            return self.__local.cursor.execute(sql, parameters)
+
+        return self.__write('execute', sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters: Sequence[Sequence[Any]]) -> sqlite3.Cursor:
+        return self.__write('executemany', sql, seq_of_parameters)
+
+
+class SQLiteInstrumentedCursor(object):
+    def __init__(self, cursor: Union[sqlite3.Cursor, SQLiteConcurrentCursor],
+                 callback: Callable[[str, Sequence[Any], float], None]):
+        """Cursor wrapper, measure each executed statement duration and report it with `callback`
+
+        :param cursor: wrapped cursor
+        :param callback: called with (sql, parameters, duration in seconds) after statement executed
+        """
+        self.__cursor = cursor
+        self.__callback = callback
+
+    def __getattr__(self, item):
+        return getattr(self.__cursor, item)
+
+    @property
+    def cursor(self) -> Union[sqlite3.Cursor, SQLiteConcurrentCursor]:
+        return self.__cursor
+
+    def execute(self, sql: str, parameters: Sequence[Any] = ()):
+        start = time.perf_counter()
+        try:
+            return self.__cursor.execute(sql, parameters)
+        finally:
+            self.__callback(sql, parameters, time.perf_counter() - start)
+
+    def executemany(self, sql: str, seq_of_parameters: Sequence[Sequence[Any]]):
+        start = time.perf_counter()
+        try:
+            return self.__cursor.executemany(sql, seq_of_parameters)
+        finally:
+            self.__callback(sql, seq_of_parameters[0] if seq_of_parameters else (), time.perf_counter() - start)
+
+
+class SQLiteStatementStatistic(DynamicObject):
+    _properties = {'sql', 'count', 'total', 'average', 'max', 'plan', 'full_scan'}
+
+    def __repr__(self):
+        scan = ' FULL SCAN' if self.full_scan else ''
+        return f'{self.total * 1000:10.3f}ms {self.count:>8} {self.average * 1000:8.3f}ms' \
+               f' {self.max * 1000:8.3f}ms{scan} {self.sql}'
+
+
 class SQLiteDatabase(object):
     SpcSequenceTBLName = 'sqlite_sequence'
     TYPE_INTEGER, TYPE_REAL, TYPE_TEXT, TYPE_BLOB = list(range(4))
     TBL_CID, TBL_NAME, TBL_TYPE, TBL_REQUIRED, TBL_DEF, TBL_PK = list(range(6))
+    CONCURRENT_PRAGMAS = ('journal_mode=WAL', 'synchronous=NORMAL', 'cache_size=-8192', 'mmap_size=67108864')
+    READER_PRAGMAS = ('cache_size=-8192', 'mmap_size=67108864', 'query_only=ON')
+
+    # Instrumentation, full scan on table has more rows than threshold is flagged
+    INSTRUMENT_MAX_STATEMENTS = 1000
+    INSTRUMENT_SCAN_THRESHOLD = 10000
+    INSTRUMENT_EXPLAIN_STATEMENTS = ('SELECT', 'WITH', 'UPDATE', 'DELETE', 'INSERT', 'REPLACE')
+    _INSTRUMENT_LITERAL = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"|\b\d+(?:\.\d+)?\b")
+    _INSTRUMENT_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)$')
+    _INSTRUMENT_WHERE = re.compile(r'\bWHERE\b(.*?)(?:\bGROUP\b|\bORDER\b|\bLIMIT\b|;|$)', re.I | re.S)
+    _INSTRUMENT_PREDICATE = re.compile(r'\b(\w+)\s*(==|=|IN\b|IS\b|<=|>=|<|>|BETWEEN\b)', re.I)
 
     def __init__(self, db_path: str,
                  timeout: int = 20,
                  check_same_thread: bool = True,
-                 conn: Optional[sqlite3.Connection] = None):
-
+                 conn: Optional[sqlite3.Connection] = None,
+                 concurrent: bool = False, readers: int = 4, instrument: bool = False):
+        """SQLite database
+
+        If `concurrent` is enabled, database is switched to WAL mode and could be shared between threads:
+        writes are serialized on one connection, reads run on a per-thread read only connection
+
+        :param db_path: database path
+        :param timeout: connection busy timeout
+        :param check_same_thread: only the creating thread may use the connection, ignored if `concurrent`
+        :param conn: exist connection
+        :param concurrent: enable concurrent mode
+        :param readers: max idle reader connections in concurrent mode
+        :param instrument: record executed statements duration and query plan, see `enableInstrument`
+        """
         if isinstance(conn, sqlite3.Connection):
             self._conn = conn
         else:
             if not os.path.isfile(db_path):
                 raise IOError("{} do not exist".format(db_path))
 
+            check_same_thread = check_same_thread and not concurrent
             self._conn = sqlite3.connect(db_path, timeout=timeout, check_same_thread=check_same_thread)
 
-        self._cursor = self._conn.cursor()
+        self._readers = None
+        self._concurrent_cursor = None
+        self._schema_cache = dict()
+        self._write_lock = threading.RLock()
+
+        self._statements = dict()
+        self._statements_lock = threading.Lock()
+        self._scan_threshold = self.INSTRUMENT_SCAN_THRESHOLD
+
+        if concurrent:
+            db_path = self._conn.execute('PRAGMA database_list').fetchone()[2]
+            for pragma in self.CONCURRENT_PRAGMAS:
+                self._conn.execute(f'PRAGMA {pragma}')
+
+            self._readers = SQLiteReaderPool(db_path, timeout, self.READER_PRAGMAS, readers)
+            self._concurrent_cursor = SQLiteConcurrentCursor(self._conn, self._readers, self._write_lock)
+            self._cursor = self._concurrent_cursor
+        else:
+            self._cursor = self._conn.cursor()
+
+        if instrument:
+            self.enableInstrument()
 
     @property
     def raw_cursor(self) -> sqlite3.Cursor:
@@ -191,6 +505,205 @@ class SQLiteDatabase(object):
     def raw_connect(self) -> sqlite3.Connection:
         return self._conn
 
+    def is_concurrent(self) -> bool:
+        return self._readers is not None
+
+    def isInstrumented(self) -> bool:
+        return isinstance(self._cursor, SQLiteInstrumentedCursor)
+
+    def enableInstrument(self, enable: bool = True, scan_threshold: int = INSTRUMENT_SCAN_THRESHOLD):
+        """Enable or disable statements instrumentation
+
+        Each executed statement duration is recorded, statements differ only in literals are recorded as one,
+        statement query plan is explained when it's first executed, full table scan is flagged when table has
+        more than `scan_threshold` rows
+
+        :param enable: enable or disable
+        :param scan_threshold: large table rows threshold
+        :return:
+        """
+        self._scan_threshold = scan_threshold
+        if enable and not self.isInstrumented():
+            self._cursor = SQLiteInstrumentedCursor(self._cursor, self.__record_statement)
+        elif not enable and self.isInstrumented():
+            self._cursor = self._cursor.cursor
+
+    def clearStatementStatistics(self):
+        with self._statements_lock:
+            self._statements.clear()
+
+    def __raw_query(self, sql: str, parameters: Sequence[Any] = ()) -> List[Tuple]:
+        """Query without instrumentation, and do not disturb cursor pending results"""
+        with self._write_lock:
+            return self._conn.execute(sql, parameters).fetchall()
+
+    def __explain_statement(self, sql: str, parameters: Sequence[Any]) -> Tuple[List[str], bool]:
+        try:
+            plan = [x[-1] for x in self.__raw_query(f'EXPLAIN QUERY PLAN {sql}', parameters)]
+        except (sqlite3.Error, ValueError):
+            return list(), False
+
+        for detail in plan:
+            scan = self._INSTRUMENT_SCAN.match(detail)
+            if not scan:
+                continue
+
+            try:
+                if self.__raw_query(f'SELECT COUNT(*) FROM {scan.group(1)}')[0][0] > self._scan_threshold:
+                    return plan, True
+            except sqlite3.Error:
+                continue
+
+        return plan, False
+
+    def __record_statement(self, sql: str, parameters: Sequence[Any], duration: float):
+        key = ' '.join(self._INSTRUMENT_LITERAL.sub('?', sql).split())
+        with self._statements_lock:
+            record = self._statements.get(key)
+            if record is not None:
+                record['count'] += 1
+                record['total'] += duration
+                record['max'] = max(record['max'], duration)
+                return
+
+            if len(self._statements) >= self.INSTRUMENT_MAX_STATEMENTS:
+                return
+
+        plan, full_scan = list(), False
+        if key.upper().startswith(self.INSTRUMENT_EXPLAIN_STATEMENTS):
+            plan, full_scan = self.__explain_statement(sql, parameters)
+
+        with self._statements_lock:
+            record = self._statements.setdefault(key, dict(sql=sql, count=0, total=0.0, max=0.0,
+                                                           plan=plan, full_scan=full_scan))
+            record['count'] += 1
+            record['total'] += duration
+            record['max'] = max(record['max'], duration)
+
+    def getStatementStatistics(self) -> List[SQLiteStatementStatistic]:
+        """Get instrumented statements statistic, sorted by total duration"""
+        with self._statements_lock:
+            records = [dict(x, plan=list(x['plan'])) for x in self._statements.values()]
+
+        return sorted([SQLiteStatementStatistic(average=x['total'] / x['count'], **x) for x in records],
+                      key=lambda x: x.total, reverse=True)
+
+    def getSlowestStatements(self, top: int = 10) -> List[SQLiteStatementStatistic]:
+        return self.getStatementStatistics()[:top]
+
+    def getFullScanStatements(self) -> List[SQLiteStatementStatistic]:
+        return [x for x in self.getStatementStatistics() if x.full_scan]
+
+    def getInstrumentReport(self, top: int = 10) -> str:
+        """Top N slowest(total duration) statements with query plan, and suggested indexes"""
+        lines = [f'{"total":>12} {"count":>8} {"average":>10} {"max":>10} statement']
+        for statistic in self.getSlowestStatements(top):
+            lines.append(repr(statistic))
+            lines.extend(f'{"":>44}{detail}' for detail in statistic.plan)
+
+        advice = self.adviseIndexes()
+        if advice:
+            lines.append('Suggested indexes:')
+            lines.extend(advice)
+
+        return '\n'.join(lines)
+
+    def adviseIndexes(self) -> List[str]:
+        """Suggest indexes for full scanned statements, based on the columns filtered in WHERE clause
+
+        Equality filtered columns come first and then the first range filtered column,
+        suggestion is skipped if an exist index already covers it
+        """
+        advice = list()
+        for statistic in self.getFullScanStatements():
+            where = self._INSTRUMENT_WHERE.search(statistic.sql)
+            if not where:
+                continue
+
+            for detail in statistic.plan:
+                scan = self._INSTRUMENT_SCAN.match(detail)
+                if not scan:
+                    continue
+
+                table = scan.group(1)
+                try:
+                    columns = [x[1] for x in self.__raw_query(f'PRAGMA table_info({table})')]
+                    indexes = self.listIndexes(table).values()
+                except (sqlite3.Error, SQLiteDatabaseError):
+                    continue
+
+                equality, ranges = list(), list()
+                for column, operator in self._INSTRUMENT_PREDICATE.findall(where.group(1)):
+                    if column not in columns or column in equality + ranges:
+                        continue
+
+                    if operator.upper().strip() in ('=', '==', 'IN', 'IS'):
+                        equality.append(column)
+                    else:
+                        ranges.append(column)
+
+                index = tuple(equality + ranges[:1])
+                if not index or any(x[:len(index)] == index for x in indexes):
+                    continue
+
+                sentence = sqlite_index_sentence(table, index)
+                if sentence not in advice:
+                    advice.append(sentence)
+
+        return advice
+
+    def createIndex(self, name: str, columns: Sequence[str], unique: bool = False,
+                    index_name: str = '', commit: bool = True) -> str:
+        """Create index on table columns
+
+        :param name: table name
+        :param columns: index columns
+        :param unique: create unique index
+        :param index_name: index name, default is `{table}_{columns}_idx`
+        :param commit: commit after created
+        :return: created index name, error raise SQLiteDatabaseError
+        """
+        try:
+            if not columns:
+                raise ValueError('index at least needs one column')
+
+            index_name = index_name or f'{name}_{"_".join(columns)}_idx'
+            self._cursor.execute(sqlite_index_sentence(name, columns, unique, index_name))
+        except (ValueError, sqlite3.DatabaseError) as error:
+            raise SQLiteDatabaseError(f'createIndex error: {error}')
+        else:
+            self.commit(commit)
+            return index_name
+
+    def dropIndex(self, index_name: str, commit: bool = True):
+        try:
+            self._cursor.execute(f'DROP INDEX IF EXISTS {index_name};')
+        except sqlite3.DatabaseError as error:
+            raise SQLiteDatabaseError(f'dropIndex error: {error}')
+        else:
+            self.commit(commit)
+
+    def listIndexes(self, name: str) -> Dict[str, Tuple[str, ...]]:
+        """List table indexes(include auto created unique/primary key indexes)
+
+        :param name: table name
+        :return: index name -> index columns
+        """
+        try:
+            indexes = dict()
+            for index in self.__raw_query(f'PRAGMA index_list({name})'):
+                info = sorted(self.__raw_query(f'PRAGMA index_info({index[1]})'))
+                indexes[index[1]] = tuple(x[2] for x in info)
+            return indexes
+        except sqlite3.DatabaseError as error:
+            raise SQLiteDatabaseError(f'listIndexes error: {error}')
+
+    def close(self):
+        if self._readers is not None:
+            self._readers.close()
+
+        self._conn.close()
+
     @staticmethod
     def conditionFormat(k: str, v: Any, t: Optional[int] = None) -> str:
         t = SQLiteDatabase.str2type(t) if isinstance(t, str) else SQLiteDatabase.detectDataType(v)
@@ -251,17 +764,110 @@ class SQLiteDatabase(object):
         except TypeError:
             return '*'
 
+    def __end_transaction(self, rollback: bool):
+        if self._concurrent_cursor is not None:
+            return self._concurrent_cursor.end(rollback)
+
+        with self._write_lock:
+            if rollback:
+                self._conn.rollback()
+            else:
+                self._conn.commit()
+
     def commit(self, commit: bool = True):
         if commit:
-            self._conn.commit()
+            self.__end_transaction(rollback=False)
+
+    def rollback(self):
+        """Discard current(in concurrent mode, current thread) transaction"""
+        self.__end_transaction(rollback=True)
 
     def rawExecute(self, sql: str):
         try:
+            # Raw sql may alter table
+            self.invalidateSchemaCache()
             self._cursor.execute(sql)
             return self._cursor.fetchall()
         except sqlite3.DatabaseError as error:
             raise SQLiteDatabaseError(error)
 
+    def invalidateSchemaCache(self, name: str = ''):
+        """Invalidate table schema cache, if name is empty invalidate all tables"""
+        if name:
+            self._schema_cache.pop(name, None)
+        else:
+            self._schema_cache.clear()
+
+    def getTableSchema(self, name: str) -> DBTableSchema:
+        """Get table schema(columns name, columns type, is autoincrement, primary key name), result is cached
+
+        :param name: table name
+        :return: table schema
+        """
+        try:
+            return self._schema_cache[name]
+        except KeyError:
+            pass
+
+        try:
+            self._cursor.execute("PRAGMA table_info({})".format(name))
+            table_info = self._cursor.fetchall()
+            if not table_info:
+                raise SQLiteDatabaseError(f"no such table: {name}")
+
+            self._cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name = ?", (name,))
+            sql = self._cursor.fetchone()[0]
+        except (TypeError, sqlite3.DatabaseError) as error:
+            raise SQLiteDatabaseError(f"getTableSchema error: {error}")
+
+        pk = [x[self.TBL_NAME] for x in table_info if x[self.TBL_PK]]
+        schema = DBTableSchema(
+            columns=tuple(x[self.TBL_NAME] for x in table_info),
+            types=tuple(self.str2type(x[self.TBL_TYPE]) for x in table_info),
+            autoincrement='AUTOINCREMENT' in sql.upper(),
+            pk=pk[0] if len(pk) == 1 else ''
+        )
+
+        self._schema_cache[name] = schema
+        return schema
+
+    def hasFTSIndex(self, name: str) -> bool:
+        return sqlite_fts_name(name) in self.getTableList()
+
+    def createFTSIndex(self, name: str, columns: Sequence[str], tokenize: str = 'trigram', commit: bool = True):
+        """Create shadow FTS5 index for table columns, index is built from exist records and kept in sync by triggers
+
+        :param name: table name
+        :param columns: indexed columns name
+        :param tokenize: fts5 tokenizer, trigram supports substring search(sqlite >= 3.34.0)
+        :param commit: commit after created
+        :return: error raise SQLiteDatabaseError
+        """
+        try:
+            for sentence in sqlite_fts_sentences(name, columns, tokenize):
+                self._cursor.execute(sentence)
+        except sqlite3.DatabaseError as error:
+            self.rollback()
+            raise SQLiteDatabaseError(f'createFTSIndex error: {error}')
+        else:
+            self.commit(commit)
+
+    def dropFTSIndex(self, name: str, commit: bool = True):
+        try:
+            for sentence in sqlite_fts_drop_sentences(name):
+                self._cursor.execute(sentence)
+        except sqlite3.DatabaseError as error:
+            raise SQLiteDatabaseError(f'dropFTSIndex error: {error}')
+        else:
+            self.commit(commit)
+
+    def searchCondition(self, name: str, column: str, value: str) -> str:
+        """Condition of records which `column` contains `value`, using FTS index if exist otherwise LIKE"""
+        if len(value) >= DBTable.FTS_MIN_LENGTH and self.hasFTSIndex(name):
+            return sqlite_fts_condition(name, column, value)
+
+        return self.searchConditionFormat(column, value, self.TYPE_TEXT)
+
     def getTableList(self) -> List[str]:
         """Get database table name list
 
@@ -368,6 +974,7 @@ class SQLiteDatabase(object):
 
     def deleteTable(self, name: str):
         try:
+            self.invalidateSchemaCache(name)
             self._cursor.execute(f'DROP TABLE {name}')
         except (TypeError, ValueError, sqlite3.DatabaseError) as error:
             raise SQLiteDatabaseError("deleteTable error: {}".format(error))
@@ -395,6 +1002,7 @@ class SQLiteDatabase(object):
                 data.append(data_format)
 
             # print("CREATE TABLE {} ({});".format(name, ",".join(data)))
+            self.invalidateSchemaCache(name)
             self._cursor.execute("CREATE TABLE {} ({});".format(name, ",".join(data)))
         except (TypeError, ValueError, sqlite3.DatabaseError) as error:
             raise SQLiteDatabaseError("Create table error:{}".format(error))
@@ -446,24 +1054,91 @@ class SQLiteDatabase(object):
         :param record: recode data
         :return: success return true else return false
         """
-        try:
-            if not isinstance(record, (list, tuple)):
-                raise TypeError("recode require list or tuple type")
+        if not isinstance(record, (list, tuple)):
+            raise TypeError("recode require list or tuple type")
 
-            # Get column names and types
-            column_names = self.getColumnList(name)
-            column_length = len(column_names) - 1 if self.isAutoincrement(name) else len(column_names)
+        self.insertRecords(name, [record], commit=False)
 
-            if column_length != len(record):
-                raise ValueError("recode length dis-matched")
+    def __get_insert_columns(self, name: str, length: int) -> Tuple[DBTableSchema, Tuple[str, ...]]:
+        """Get insert columns, autoincrement primary key could be omitted"""
+        schema = self.getTableSchema(name)
+        if length == len(schema.columns):
+            return schema, schema.columns
 
-            # Pre-process placeholder
-            placeholder = ", ".join(['?'] * len(record))
+        if schema.autoincrement and length == len(schema.columns) - 1:
+            return schema, tuple(x for x in schema.columns if x != schema.pk)
 
-            # Insert to sqlite and save
-            self._cursor.execute("INSERT INTO {} VALUES({})".format(name, placeholder), record)
+        raise ValueError("recode length dis-matched")
+
+    def __execute_many(self, sql: str, rows: Sequence[Sequence[Any]], commit: bool) -> int:
+        try:
+            self._cursor.executemany(sql, rows)
         except sqlite3.DatabaseError as error:
+            # Whole batch is discarded
+            if commit:
+                self.rollback()
             raise SQLiteDatabaseError(error)
+        else:
+            self.commit(commit)
+            return len(rows)
+
+    def insertRecords(self, name: str, rows: Sequence[Sequence[Any]], commit: bool = True) -> int:
+        """Insert records to table in one transaction, using one prepared statement
+
+        :param name: table name
+        :param rows: records, each record contains all columns, autoincrement primary key could be omitted
+        :param commit: commit after insert, if commit is true and insert failed whole transaction is rollback
+        :return: inserted records count, error raise SQLiteDatabaseError
+        """
+        if not rows:
+            return 0
+
+        try:
+            length = len(rows[0])
+            schema, columns = self.__get_insert_columns(name, length)
+            if any(len(x) != length for x in rows):
+                raise ValueError("recode length dis-matched")
+        except (TypeError, ValueError) as error:
+            raise SQLiteDatabaseError("Insert error:{}".format(error))
+
+        placeholder = ", ".join(['?'] * length)
+        sql = "INSERT INTO {} ({}) VALUES({})".format(name, ", ".join(columns), placeholder)
+        return self.__execute_many(sql, rows, commit)
+
+    def upsertRecords(self, name: str, rows: Sequence[Sequence[Any]], commit: bool = True) -> int:
+        """Insert records to table, if primary key is already exist update the record
+
+        :param name: table name
+        :param rows: records, each record contains all columns
+        :param commit: commit after upsert, if commit is true and upsert failed whole transaction is rollback
+        :return: upsert records count, error raise SQLiteDatabaseError
+        """
+        if not rows:
+            return 0
+
+        try:
+            schema = self.getTableSchema(name)
+            if not schema.pk:
+                raise ValueError(f"{name} do not have a single column primary key")
+
+            if any(len(x) != len(schema.columns) for x in rows):
+                raise ValueError("recode length dis-matched")
+        except (TypeError, ValueError) as error:
+            raise SQLiteDatabaseError("Upsert error:{}".format(error))
+
+        columns = ", ".join(schema.columns)
+        placeholder = ", ".join(['?'] * len(schema.columns))
+
+        # UPSERT is supported since sqlite 3.24.0, otherwise replace the record
+        if sqlite3.sqlite_version_info >= (3, 24, 0):
+            update = ", ".join(f"{x} = excluded.{x}" for x in schema.columns if x != schema.pk) or \
+                f"{schema.pk} = excluded.{schema.pk}"
+            sql = f"INSERT INTO {name} ({columns}) VALUES({placeholder}) " \
+                  f"ON CONFLICT({schema.pk}) DO UPDATE SET {update}"
+        else:
+            sql = f"INSERT OR REPLACE INTO {name} ({columns}) VALUES({placeholder})"
+
+        return self.__execute_many(sql, rows, commit)
 
     def updateRecord(self, name: str, record: Union[list, tuple, dict],
                      condition: Optional[str] = None, commit: bool = True):
@@ -560,6 +1235,234 @@ class SQLCipherDatabase(SQLiteDatabase):
         self._cursor.execute("PRAGMA key='{}'".format(key))
 
 
+class SQLiteWriteBehindStatistic(DynamicObject):
+    _properties = {'depth', 'pending', 'committed', 'batches', 'errors', 'dropped',
+                   'latency_last', 'latency_avg', 'latency_max'}
+
+
+class SQLiteWriteBehind(object):
+    COMMIT_RETRY_TIMES = 5
+    COMMIT_RETRY_BACKOFF = 0.1
+    OP_INSERT, OP_UPSERT, OP_UPDATE = list(range(3))
+
+    def __init__(self, db: Union[str, SQLiteDatabase], batch_size: int = 500, batch_window: float = 0.5,
+                 max_depth: int = 10000, put_timeout: Optional[float] = None, name: str = ''):
+        """Write records to database in background, records are grouped into transactions by count or time window
+
+        :param db: database path or database(must be usable from other thread, e.g. concurrent mode)
+        :param batch_size: max records in one transaction
+        :param batch_window: max delay in seconds from first record received to transaction committed
+        :param max_depth: max queued records, if queue is full writing will be blocked(back-pressure)
+        :param put_timeout: max blocking time when queue is full, None block until free, 0 never block,
+        if timeout record is dropped
+        :param name: writer thread name
+        """
+        self.__db = SQLiteDatabase(db, check_same_thread=False) if isinstance(db, str) else db
+        if not isinstance(self.__db, SQLiteDatabase):
+            raise TypeError(f"'db' must be a path or a instance of {SQLiteDatabase.__name__}")
+
+        self.__batch_size = batch_size
+        self.__put_timeout = put_timeout
+        self.__batch_window = batch_window
+        self.__queue = queue.Queue(maxsize=max_depth)
+
+        self.__pending = 0
+        self.__latency = collections.deque(maxlen=128)
+        self.__statistic = dict(committed=0, batches=0, errors=0, dropped=0)
+        self.__cond = threading.Condition()
+
+        self.__closed = False
+        self.__flush = threading.Event()
+        self.__stopped = threading.Event()
+        self.__thread = threading.Thread(target=self.__write_thread, daemon=True, name=name or 'SQLiteWriteBehind')
+        self.__thread.start()
+
+        # Guarantee flush on interpreter shutdown
+        atexit.register(self.close)
+
+    @property
+    def database(self) -> SQLiteDatabase:
+        return self.__db
+
+    @property
+    def depth(self) -> int:
+        """Queued records number"""
+        return self.__queue.qsize()
+
+    @property
+    def statistic(self) -> SQLiteWriteBehindStatistic:
+        with self.__cond:
+            latency = list(self.__latency)
+            return SQLiteWriteBehindStatistic(
+                depth=self.depth, pending=self.__pending,
+                latency_last=latency[-1] if latency else 0.0,
+                latency_avg=sum(latency) / len(latency) if latency else 0.0,
+                latency_max=max(latency) if latency else 0.0,
+                **self.__statistic
+            )
+
+    def __put(self, item: tuple) -> bool:
+        # Pending is counted under the same lock as closed check, writer thread will not exit before it's written
+        with self.__cond:
+            if self.__closed:
+                return False
+
+            self.__pending += 1
+
+        try:
+            self.__queue.put(item, block=self.__put_timeout != 0, timeout=self.__put_timeout or None)
+            return True
+        except queue.Full:
+            with self.__cond:
+                self.__pending -= 1
+                self.__statistic['dropped'] += 1
+                self.__cond.notify_all()
+            return False
+
+    def insert(self, name: str, record: Sequence[Any]) -> bool:
+        """Insert a record(same as SQLiteDatabase.insertRecord) in background, return false if dropped"""
+        return self.__put((self.OP_INSERT, name, tuple(record), None))
+
+    def upsert(self, name: str, record: Sequence[Any]) -> bool:
+        """Upsert a record(same as SQLiteDatabase.upsertRecords) in background, return false if dropped"""
+        return self.__put((self.OP_UPSERT, name, tuple(record), None))
+
+    def update(self, name: str, record: Union[list, tuple, dict], condition: Optional[str] = None) -> bool:
+        """Update record(same as SQLiteDatabase.updateRecord) in background, return false if dropped"""
+        return self.__put((self.OP_UPDATE, name, record, condition))
+
+    def loggingCallback(self, name: str) -> LoggingMsgCallback:
+        """Get a logging callback, log message is written to table #name as (timestamp, level, content)"""
+        def callback(msg: UiLogMessage):
+            self.insert(name, (time.time(), msg.level, msg.content))
+
+        return callback
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Commit queued records immediately and wait committed
+
+        :param timeout: wait timeout
+        :return: false if timeout
+        """
+        self.__flush.set()
+        with self.__cond:
+            return self.__cond.wait_for(lambda: not self.__pending, timeout)
+
+    def close(self, timeout: Optional[float] = None):
+        """Stop receive records, flush queued records and stop writer thread"""
+        atexit.unregister(self.close)
+        with self.__cond:
+            if self.__closed:
+                return
+
+            self.__closed = True
+
+        self.__stopped.set()
+        self.__thread.join(timeout)
+
+    def __next_batch(self) -> list:
+        try:
+            batch = [self.__queue.get(timeout=0.1)]
+        except queue.Empty:
+            return list()
+
+        deadline = time.perf_counter() + self.__batch_window
+        while len(batch) < self.__batch_size:
+            try:
+                if self.__flush.is_set() or self.__stopped.is_set():
+                    batch.append(self.__queue.get_nowait())
+                else:
+                    batch.append(self.__queue.get(timeout=max(deadline - time.perf_counter(), 0)))
+            except queue.Empty:
+                break
+
+        self.__flush.clear()
+        return batch
+
+    def __apply(self, op: int, name: str, records: list, condition: Optional[str]):
+        if op == self.OP_INSERT:
+            self.__db.insertRecords(name, records, commit=False)
+        elif op == self.OP_UPSERT:
+            self.__db.upsertRecords(name, records, commit=False)
+        else:
+            for record in records:
+                self.__db.updateRecord(name, record, condition, commit=False)
+
+    def __commit(self, batch: list) -> int:
+        """Commit a batch in one transaction, if failed retry record by record, return failed records number"""
+        # Merge consecutive inserts(upserts) of the same table into one executemany
+        groups = list()
+        for op, name, record, condition in batch:
+            if groups and groups[-1][:2] == (op, name) and op != self.OP_UPDATE and \
+                    len(groups[-1][2][0]) == len(record):
+                groups[-1][2].append(record)
+            else:
+                groups.append((op, name, [record], condition))
+
+        try:
+            for group in groups:
+                self.__apply(*group)
+            self.__db.commit()
+            return 0
+        except (SQLiteDatabaseError, sqlite3.Error) as error:
+            print(f'{self.__class__.__name__}: commit error: {error}, retry one by one')
+            self.__rollback()
+
+        errors = 0
+        for op, name, record, condition in batch:
+            try:
+                self.__apply(op, name, [record], condition)
+            except (SQLiteDatabaseError, sqlite3.Error) as error:
+                errors += 1
+                print(f'{self.__class__.__name__}: {name} {record} error: {error}')
+
+        # Commit may fail by database lock(e.g. reader holds a shared lock), retry with backoff
+        for retry in range(self.COMMIT_RETRY_TIMES):
+            try:
+                self.__db.commit()
+                return errors
+            except (SQLiteDatabaseError, sqlite3.Error) as error:
+                print(f'{self.__class__.__name__}: commit error: {error}, retry[{retry + 1}]')
+                time.sleep(self.COMMIT_RETRY_BACKOFF * (retry + 1))
+
+        self.__rollback()
+        return len(batch)
+
+    def __rollback(self):
+        try:
+            self.__db.rollback()
+        except (SQLiteDatabaseError, sqlite3.Error) as error:
+            print(f'{self.__class__.__name__}: rollback error: {error}')
+
+    def __is_idle(self) -> bool:
+        with self.__cond:
+            return not self.__pending
+
+    def __write_thread(self):
+        while not (self.__stopped.is_set() and self.__is_idle()):
+            batch = self.__next_batch()
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            try:
+                errors = self.__commit(batch)
+            except Exception as error:
+                # Writer thread never exits before closed, failed batch is counted as errors
+                print(f'{self.__class__.__name__}: write error: {error}')
+                self.__rollback()
+                errors = len(batch)
+            latency = time.perf_counter() - start
+
+            with self.__cond:
+                self.__pending -= len(batch)
+                self.__latency.append(latency)
+                self.__statistic['errors'] += errors
+                self.__statistic['batches'] += 1
+                self.__statistic['committed'] += len(batch) - errors
+                self.__cond.notify_all()
+
+
 class SQLiteUserPasswordDatabase(object):
     DEF_PATH = "cipher.db"
     MAGIC_STR = "SQLiteUserPasswordDatabase"
@@ -1070,6 +1973,16 @@ class SQLiteDatabaseCreator(object):
 
         return True
 
+    def create_table(self, tbl: DBTable):
+        """Create table from table definition, declared indexes and fts index(if sqlite supports) are created as well"""
+        for sentence in [tbl.get_create_sentence()] + tbl.get_index_sentences():
+            self._db_cursor.execute(sentence)
+
+        sqlite_create_fts_index(self._db_cursor, tbl)
+
+    def create_index(self, table_name: str, columns: Sequence[str], unique: bool = False):
+        self._db_cursor.execute(sqlite_index_sentence(table_name, columns, unique))
+
     def create_general_table(self, name: str, max_column: int):
         """Create a generate database table with specified name and column count
 
@@ -1237,6 +2150,32 @@ class SQLiteDatabaseCreator(object):
             self._db_cursor.execute("INSERT INTO {} VALUES({})".format(table_name, data))
 
 
+def sqlite_create_fts_index(cursor: sqlite3.Cursor, tbl: DBTable, verbose: bool = False) -> bool:
+    """Create table shadow FTS5 index, FTS is optional(search fallback to LIKE), if sqlite doesn't support it
+    (e.g. trigram tokenizer requires sqlite >= 3.34.0) index is skipped with a warning
+
+    :param cursor: database cursor
+    :param tbl: table definition
+    :param verbose: show sentences
+    :return: index is created
+    """
+    try:
+        for sentence in tbl.get_fts_sentences():
+            if verbose:
+                print(sentence)
+
+            cursor.execute(sentence)
+    except sqlite3.OperationalError as error:
+        # Drop partially created index, otherwise triggers break writing table
+        for sentence in sqlite_fts_drop_sentences(tbl.name):
+            cursor.execute(sentence)
+
+        print(f'create {tbl.name!r} fts index error: {error}, skipped, search fallback to LIKE')
+        return False
+
+    return True
+
+
 def sqlite_create_tables(db_name: str, tables: typing.Sequence[DBTable], verbose: bool = False) -> bool:
     error = None
     db_conn = sqlite3.connect(db_name)
@@ -1250,6 +2189,14 @@ def sqlite_create_tables(db_name: str, tables: typing.Sequence[DBTable], verbose
 
             db_cursor.execute(create_sentence)
 
+            for sentence in tbl.get_index_sentences():
+                if verbose:
+                    print(sentence)
+
+                db_cursor.execute(sentence)
+
+            sqlite_create_fts_index(db_cursor, tbl, verbose)
+
             for record in tbl.init_records:
                 insert_sentence = tbl.get_insert_sentence(record)
                 if verbose:
@@ -1,58 +1,268 @@
 # -*- coding: utf-8 -*-
 import time
+import heapq
 import queue
+import array
 import inspect
+import itertools
 import traceback
 import threading
 import collections
-from typing import Optional, Callable, Any, Tuple, TypeVar
+from typing import Optional, Callable, Any, Tuple, TypeVar, List, Dict
 
 from .datatype import DynamicObject
 from .utils import util_check_arguments, util_auto_kwargs
-from .threading import ThreadLockAndDataWrap, ThreadConditionWrap, ThreadSafeBool
-__all__ = ['SwTimer', 'Tasklet', 'Task']
+from .threading import ThreadLockAndDataWrap, ThreadConditionWrap, ThreadSafeBool, ThreadSafeInteger
+__all__ = ['SwTimer', 'Tasklet', 'Task', 'TimerScheduler']
 TL = TypeVar('TL', bound='Tasklet')
 
 
+class TimerStatistic(DynamicObject):
+    _properties = {'name', 'cnt', 'cost', 'lateness', 'jobs'}
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('cnt', 0)
+        kwargs.setdefault('jobs', 0)
+        kwargs.setdefault('cost', 0.0)
+        kwargs.setdefault('lateness', 0.0)
+        super(TimerStatistic, self).__init__(**kwargs)
+
+    def __repr__(self):
+        return '{}'.format({k: format(v, '.4f') if isinstance(v, float) else v for k, v in self.dict.items()})
+
+
+class TimerScheduler(object):
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, max_workers: int = 4, name: str = 'TimerScheduler'):
+        """Shared timer scheduler, one timer thread and a bounded worker pool for many SwTimer/Tasklet
+
+        Each attached timer callback is dispatched to worker pool when it's due,
+        a timer callback never runs concurrently with itself, next due time is calculated after callback finished.
+
+        Notice: workers are shared, a long blocking callback will occupy a worker, increase max_workers if needed
+
+        :param max_workers: worker thread number
+        :param name: scheduler name, used as thread name prefix
+        """
+        if not isinstance(max_workers, int) or max_workers <= 0:
+            raise ValueError('max_workers must be a positive integer')
+
+        self.__heap = list()
+        self.__stop = False
+        self.__name = name
+        self.__timers = dict()
+        self.__armed = dict()
+        self.__stats = dict()
+        self.__running = set()
+        self.__jobs = queue.Queue()
+        self.__max_workers = max_workers
+        self.__sequence = itertools.count()
+        self.__condition = threading.Condition()
+
+        threading.Thread(target=self.__timer_thread, daemon=True, name=f'{name} timer').start()
+        for i in range(max_workers):
+            threading.Thread(target=self.__worker, daemon=True, name=f'{name} worker {i}').start()
+
+    def __repr__(self):
+        return f'{type(self).__name__}, {self.__name}, workers: {self.__max_workers}, ' \
+               f'timers: {len(self.__timers)}, jobs: {self.__jobs.qsize()}'
+
+    @classmethod
+    def default(cls) -> Optional['TimerScheduler']:
+        """Process-wide default scheduler, SwTimer without scheduler specified will attach to it if installed"""
+        return cls._default
+
+    @classmethod
+    def install_default(cls, max_workers: int = 4) -> 'TimerScheduler':
+        """Install process-wide default scheduler, only affect timers created after it installed"""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls(max_workers=max_workers)
+            return cls._default
+
+    @classmethod
+    def uninstall_default(cls):
+        with cls._default_lock:
+            scheduler, cls._default = cls._default, None
+
+        if scheduler is not None:
+            scheduler.shutdown()
+
+    def __timer_thread(self):
+        with self.__condition:
+            while not self.__stop:
+                if not self.__heap:
+                    self.__condition.wait()
+                    continue
+
+                deadline, sequence, timer = self.__heap[0]
+                timeout = deadline - time.perf_counter()
+                if timeout > 0:
+                    self.__condition.wait(timeout)
+                    continue
+
+                heapq.heappop(self.__heap)
+                if self.__armed.get(id(timer)) != sequence:
+                    continue
+
+                del self.__armed[id(timer)]
+                self.__running.add(id(timer))
+                self.__jobs.put((self.__fire, (timer, deadline)))
+
+    def __worker(self):
+        while True:
+            job = self.__jobs.get()
+            if job is None:
+                break
+
+            func, args = job
+            try:
+                func(*args)
+            except Exception as e:
+                print(f'{self}: job {func} raise exception: {e}, {traceback.format_exc()}')
+
+    def __fire(self, timer: 'SwTimer', deadline: float):
+        start = time.perf_counter()
+        try:
+            timer._fire()
+        finally:
+            end = time.perf_counter()
+            with self.__condition:
+                self.__running.discard(id(timer))
+                stats = self.__statistic(timer.name)
+                stats.cnt += 1
+                stats.cost += end - start
+                stats.lateness = max(stats.lateness, start - deadline)
+
+        if id(timer) in self.__timers:
+            self.__arm(timer, timer._next_timeout())
+
+    def __arm(self, timer: 'SwTimer', timeout: Optional[float]):
+        with self.__condition:
+            if id(timer) not in self.__timers or id(timer) in self.__running:
+                return
+
+            # None timeout means sleep until timer wakeup
+            if timeout is None:
+                self.__armed.pop(id(timer), None)
+                return
+
+            sequence = next(self.__sequence)
+            self.__armed[id(timer)] = sequence
+            heapq.heappush(self.__heap, (time.perf_counter() + timeout, sequence, timer))
+            if self.__heap[0][1] == sequence:
+                self.__condition.notify()
+
+    def __statistic(self, name: str) -> TimerStatistic:
+        return self.__stats.setdefault(name, TimerStatistic(name=name))
+
+    def attach(self, timer: 'SwTimer'):
+        with self.__condition:
+            self.__timers[id(timer)] = timer
+
+        self.__arm(timer, timer._next_timeout())
+
+    def detach(self, timer: 'SwTimer'):
+        with self.__condition:
+            self.__timers.pop(id(timer), None)
+            self.__armed.pop(id(timer), None)
+
+    def wakeup(self, timer: 'SwTimer'):
+        """Recalculate timer next due time, if timer callback is running, it will be recalculated after finished"""
+        self.__arm(timer, timer._next_timeout())
+
+    def submit(self, func: Callable, *args, name: str = ''):
+        """Submit a job to worker pool, job will be counted to `name` statistic"""
+        with self.__condition:
+            self.__statistic(name).jobs += 1
+
+        self.__jobs.put((func, args))
+
+    def stats(self) -> Dict[str, TimerStatistic]:
+        """Get each timer(by name) statistic: callback count, callback cost, max lateness and submitted jobs"""
+        with self.__condition:
+            return {k: TimerStatistic(**v.dict) for k, v in self.__stats.items()}
+
+    def shutdown(self):
+        with self.__condition:
+            self.__stop = True
+            self.__heap.clear()
+            self.__armed.clear()
+            self.__timers.clear()
+            self.__condition.notify()
+
+        for _ in range(self.__max_workers):
+            self.__jobs.put(None)
+
+
 class SwTimer(object):
     TIMER_KEYWORD = 'timer'
     AUTO_ARGS = (TIMER_KEYWORD,)
 
     def __init__(self, base: float = 1.0, private: Any = None,
-                 callback: Optional[Callable] = None, cb_args: Optional[tuple] = None, auto_start: bool = False):
+                 callback: Optional[Callable] = None, cb_args: Optional[tuple] = None, auto_start: bool = False,
+                 name: str = '', scheduler: Optional[TimerScheduler] = None):
         """
         Software timer base on thread
         :param base: timer base interval unit second
         :param callback: timer callback
         :param cb_args: timer callback args
         :param auto_start: auto start the timer
+        :param name: timer name, used as thread name or scheduler statistic name
+        :param scheduler: attach to a shared scheduler instead of create a thread, default is TimerScheduler.default()
         """
         self._base = base
         self._private = private
         self._cb_callback = callback
         self._cb_args = cb_args or ()
+        self._name = str(name) or 'Software timer'
+        self._scheduler = scheduler if isinstance(scheduler, TimerScheduler) else TimerScheduler.default()
 
         if callable(self._cb_callback):
             util_check_arguments(self._cb_callback, self._cb_args, self.AUTO_ARGS)
 
         self._event = threading.Event()
+        self._interrupt = threading.Event()
         self._stop = ThreadLockAndDataWrap(False)
         self._timer_cnt = ThreadLockAndDataWrap(0)
         self._start_timestamp = time.perf_counter()
         self._is_running = ThreadLockAndDataWrap(auto_start)
 
-        self._th = threading.Thread(target=self.__timer_thread, name="Software timer")
-        self._th.setDaemon(True)
-        self._th.start()
+        if self._scheduler is not None:
+            self._th = None
+            self._scheduler.attach(self)
+        else:
+            self._th = threading.Thread(target=self.__timer_thread, name=self._name)
+            self._th.setDaemon(True)
+            self._th.start()
 
     def __del__(self):
-        self.stop()
+        # Constructor may raise before timer is fully initialized
+        if hasattr(self, '_stop'):
+            self.stop()
 
     def __timer_thread(self):
         while not self._stop:
-            self._event.wait(self._base)
-            if self._is_running:
-                self.__callback()
+            self._interrupt.wait(self._next_timeout())
+            self._interrupt.clear()
+            self._fire()
+
+    def _fire(self):
+        if self._is_running:
+            self.__callback()
+
+    def _next_timeout(self) -> Optional[float]:
+        """Time to sleep before next callback, None means sleep until `_wakeup`"""
+        return self._base
+
+    def _wakeup(self):
+        """Interrupt current sleep, timer will recalculate next timeout after callback"""
+        if self._scheduler is not None:
+            self._scheduler.wakeup(self)
+        else:
+            self._interrupt.set()
 
     def __callback(self):
         self._timer_cnt.data += 1
@@ -64,6 +274,10 @@ class SwTimer(object):
     def cnt(self) -> int:
         return self._timer_cnt.data
 
+    @property
+    def name(self) -> str:
+        return self._name
+
     @property
     def private(self) -> Any:
         return self._private
@@ -76,6 +290,9 @@ class SwTimer(object):
         self._event.set()
         self._stop.data = True
         self._is_running.data = False
+        self._interrupt.set()
+        if self._scheduler is not None:
+            self._scheduler.detach(self)
 
     def pause(self):
         self._is_running.data = False
@@ -114,6 +331,82 @@ class TaskRuntime(DynamicObject):
         return '{}'.format({k: format(v, '.2f') if k != 'cnt' else v for k, v in self.dict.items() if k != 'tasklet'})
 
 
+class TaskStatistic(object):
+    SIZE = 128
+    PERCENTILES = (0.5, 0.95, 0.99)
+
+    def __init__(self, size: int = SIZE):
+        """Task rolling statistic, keeps latest `size` samples of run cost, schedule lateness and worker queue wait
+
+        Samples are stored in fixed-size ring buffers, percentiles are calculated on demand
+        :param size: ring buffer size
+        """
+        self.__cnt = 0
+        self.__index = 0
+        self.__size = size
+        self.__overrun = 0
+        self.__enqueued = 0.0
+        self.__lock = threading.Lock()
+        self.__cost = array.array('d', bytes(8 * size))
+        self.__lateness = array.array('d', bytes(8 * size))
+        self.__wait = array.array('d', bytes(8 * size))
+
+    def __repr__(self):
+        summary = self.summary()
+        return '{}'.format({k: format(v * 1000, '.2f') if isinstance(v, float) else v for k, v in summary.items()})
+
+    @staticmethod
+    def percentile(samples: List[float], p: float) -> float:
+        if not samples:
+            return 0.0
+
+        samples = sorted(samples)
+        return samples[min(int(round(p * (len(samples) - 1))), len(samples) - 1)]
+
+    def enqueue(self):
+        """Mark task is put to worker queue"""
+        self.__enqueued = time.perf_counter()
+
+    def record(self, start: float, end: float, due: float, overrun: bool):
+        """Record a run sample
+
+        :param start: run start timestamp
+        :param end: run end timestamp
+        :param due: timestamp of the task should be scheduled
+        :param overrun: task run cost is greater than it's period
+        """
+        with self.__lock:
+            wait = start - self.__enqueued if self.__enqueued else 0.0
+            self.__cost[self.__index] = end - start
+            self.__lateness[self.__index] = max(start - due, 0.0)
+            self.__wait[self.__index] = wait
+            self.__index = (self.__index + 1) % self.__size
+            self.__overrun += 1 if overrun else 0
+            self.__enqueued = 0.0
+            self.__cnt += 1
+
+    def reset(self):
+        with self.__lock:
+            self.__cnt = self.__index = self.__overrun = 0
+
+    def summary(self) -> Dict[str, Any]:
+        """Get statistic summary: run count, overrun count and cost/lateness/wait percentiles(unit second)"""
+        with self.__lock:
+            number = min(self.__cnt, self.__size)
+            samples = {
+                'cost': self.__cost[:number].tolist(),
+                'lateness': self.__lateness[:number].tolist(),
+                'wait': self.__wait[:number].tolist()
+            }
+            summary = dict(cnt=self.__cnt, overrun=self.__overrun)
+
+        for name, values in samples.items():
+            for p in self.PERCENTILES:
+                summary[f'{name}_p{int(p * 100)}'] = self.percentile(values, p)
+
+        return summary
+
+
 class Task(DynamicObject):
     TASK_KEYWORD = 'task'
     TASKLET_KEYWORD = 'tasklet'
@@ -144,6 +437,9 @@ class Task(DynamicObject):
         self.__paused = ThreadSafeBool(False)
         self.__id_ignore_args = True if id_ignore_args else False
         self.__id_ignore_timeout = True if id_ignore_timeout else False
+        self.__id = self.__generate_id()
+        self.__due = time.perf_counter() + self.timeout
+        self.__statistic = TaskStatistic()
 
     @staticmethod
     def create_tid() -> TID:
@@ -153,6 +449,9 @@ class Task(DynamicObject):
         return self.id() == other.id()
 
     def __str__(self):
+        return self.__id
+
+    def __generate_id(self) -> str:
         args = '' if self.__id_ignore_args else f'{self.args}'
         timeout = '' if self.__id_ignore_timeout else f'{self.timeout}'
         return f"{self.func.__name__}{inspect.signature(self.func)}{args}{timeout}{self.periodic}"
@@ -163,7 +462,13 @@ class Task(DynamicObject):
         return f'{dict_}'
 
     def id(self) -> str:
-        return str(self)
+        return self.__id
+
+    def update(self, data, ignore_type_check: bool = False):
+        super(Task, self).update(data, ignore_type_check)
+        self.__id = self.__generate_id()
+        self.__due = time.perf_counter() + self.timeout
+        self.__statistic = TaskStatistic()
 
     def run(self):
         """Run task and set result"""
@@ -180,6 +485,8 @@ class Task(DynamicObject):
             finally:
                 end_ts = time.perf_counter()
                 self.runtime.update(dict(cnt=self.runtime.cnt + 1, latest=end_ts, cost=end_ts - start_ts))
+                overrun = self.periodic and end_ts - start_ts > self.timeout
+                self.__statistic.record(start_ts, end_ts, self.__due, overrun)
 
             # Periodic task auto reload timeout
             if self.periodic:
@@ -205,6 +512,7 @@ class Task(DynamicObject):
 
         self.runtime.tasklet = tasklet
         self.runtime.update(dict(timeout=self.timeout, cnt=0))
+        self.__due = time.perf_counter() + self.timeout
 
     def tick(self):
         if self.is_attached():
@@ -218,6 +526,7 @@ class Task(DynamicObject):
 
     def reload(self):
         self.runtime.update(dict(timeout=self.timeout))
+        self.__due = time.perf_counter() + self.timeout
 
     def delete(self):
         if self.is_attached():
@@ -254,12 +563,22 @@ class Task(DynamicObject):
     def running_times(self) -> int:
         return self.runtime.cnt
 
+    @property
+    def statistic(self) -> TaskStatistic:
+        return self.__statistic
+
 
 class Tasklet(SwTimer):
+    SCHEDULE_TICK = 'tick'
+    SCHEDULE_DEADLINE = 'deadline'
+    SCHEDULE_POLICIES = (SCHEDULE_TICK, SCHEDULE_DEADLINE)
+
     def __init__(self,
                  schedule_interval: float = 1.0,
                  max_workers: Optional[int] = None,
-                 name: str = '', dump: Optional[Callable[[str], None]] = None, err: Callable[[str], None] = print):
+                 name: str = '', dump: Optional[Callable[[str], None]] = None, err: Callable[[str], None] = print,
+                 policy: str = SCHEDULE_TICK, scheduler: Optional[TimerScheduler] = None,
+                 stats_interval: float = 0.0):
         """Tasklet is sample Round-Robin schedule is base on SwTimer(a threading)
         Add a Task to tasklet, when task timeout will schedule it once,
         if a Task is running, it could be deleted or reschedule.
@@ -272,24 +591,54 @@ class Tasklet(SwTimer):
         If max_workers is set, scheduler will automatically check each periodic task last running cost time,
         if a task last running cost time is to too long(be delayed) it will put the task to a thread pool worker
 
+        Schedule policy:
+            SCHEDULE_TICK: every `schedule_interval` tick all tasks timeout, then run timeout tasks, O(n) per tick
+            SCHEDULE_DEADLINE: tasks are ordered by absolute deadline in a min-heap,
+            scheduler sleep until the next task is due, `schedule_interval` only used as paused task poll interval
+
+        If attached to a shared TimerScheduler, tasklet will not create any thread,
+        delayed tasks are put to the scheduler worker pool instead of tasklet own workers(max_workers as a switch)
+
         :param schedule_interval: basic schedule interval unit is second
         :param max_workers: max worker thread, default only one thread
         :param name: Tasklet name just for debug and track
         :param dump: Tasklet dump output function
         :param err: Tasklet error log output
+        :param policy: Tasklet schedule policy, SCHEDULE_TICK or SCHEDULE_DEADLINE
+        :param scheduler: shared scheduler to attach, default is TimerScheduler.default()
+        :param stats_interval: periodic dump tasks statistic through `dump` callback, 0 means disabled
         """
         if not callable(err):
             raise TypeError('log must be callable')
 
+        if policy not in self.SCHEDULE_POLICIES:
+            raise ValueError(f'policy must be one of: {self.SCHEDULE_POLICIES}')
+
         self.__tasks = dict()
         self.__dump_callback = dump
         self.__error_callback = err
 
+        # Deadline policy: heap of (deadline, sequence, tid), armed maps tid to it's valid sequence
+        self.__heap = list()
+        self.__armed = dict()
+        self.__policy = policy
+        self.__heap_lock = threading.Lock()
+        self.__sequence = itertools.count()
+
+        self.__stats_interval = stats_interval
+        self.__stats_dump_ts = time.perf_counter()
+
         self.__queue = queue.Queue()
+        self.__offloaded = ThreadSafeInteger(0)
         self.__name = str(name) or str(id(self))
         self.__schedule_interval = schedule_interval
         self.__max_workers = max_workers if isinstance(max_workers, int) else 0
-        super(Tasklet, self).__init__(base=schedule_interval, callback=self.__schedule, auto_start=True)
+        super(Tasklet, self).__init__(base=schedule_interval, callback=self.__schedule, auto_start=True,
+                                      name=self.__name, scheduler=scheduler)
+
+        # Attached to shared scheduler, use scheduler worker pool
+        if self._scheduler is not None:
+            return
 
         for i in range(self.__max_workers):
             threading.Thread(target=self.__worker, daemon=True, name=f'Tasklet worker {i}').start()
@@ -316,9 +665,90 @@ class Tasklet(SwTimer):
                 self.__queue.put(task)
                 continue
 
-            self.__error_handle(task.run())
+            self.__run(task)
+
+    def __shared_worker(self, task: Task):
+        try:
+            # Paused, do not occupy shared worker, wait next schedule
+            if task.is_paused():
+                if self.__policy == self.SCHEDULE_DEADLINE:
+                    self.__arm(task, self.tick)
+                return
+
+            self.__run(task)
+        finally:
+            self.__offloaded.decrease()
+
+    def __offload(self, task: Task):
+        task.statistic.enqueue()
+        if self._scheduler is None:
+            self.__queue.put(task)
+        else:
+            self.__offloaded.increase()
+            self._scheduler.submit(self.__shared_worker, task, name=self.__name)
+
+    def __run(self, task: Task):
+        self.__error_handle(task.run())
+
+        # Periodic or rescheduled task will reload timeout, arm it again
+        if self.__policy == self.SCHEDULE_DEADLINE and not task.is_timeout():
+            self.__arm(task)
+
+    def __dispatch(self, task: Task):
+        if task.is_running():
+            # Deadline policy: still running periodic task re-arm it at next deadline, otherwise it never runs again
+            if self.__policy == self.SCHEDULE_DEADLINE and task.periodic:
+                self.__arm(task, task.timeout)
+            return
+
+        if task.is_delayed() and self.__max_workers:
+            self.__offload(task)
+        else:
+            self.__run(task)
+
+    def __arm(self, task: Task, delay: Optional[float] = None):
+        """Push task to deadline heap, previous armed deadline of the same task will be invalid"""
+        tid = task.id()
+        if self.__tasks.get(tid) is not task:
+            return
+
+        deadline = time.perf_counter() + (task.runtime.timeout if delay is None else delay)
+        with self.__heap_lock:
+            sequence = next(self.__sequence)
+            self.__armed[tid] = sequence
+            heapq.heappush(self.__heap, (deadline, sequence, tid))
+            earliest = self.__heap[0][1] == sequence
+
+        # Only the earliest deadline changed need interrupt scheduler sleep
+        if earliest:
+            self._wakeup()
+
+    def __disarm(self, tid: str):
+        with self.__heap_lock:
+            self.__armed.pop(tid, None)
+
+    def __pop_timeout_tasks(self) -> List[Task]:
+        tasks = list()
+        now = time.perf_counter()
+
+        with self.__heap_lock:
+            while self.__heap and self.__heap[0][0] <= now:
+                _, sequence, tid = heapq.heappop(self.__heap)
+                if self.__armed.get(tid) != sequence:
+                    continue
+
+                del self.__armed[tid]
+                task = self.__tasks.get(tid)
+                if task is not None:
+                    tasks.append(task)
+
+        return tasks
 
     def __schedule(self):
+        self.__dump_statistics()
+        if self.__policy == self.SCHEDULE_DEADLINE:
+            return self.__schedule_deadline()
+
         for task in self.__tasks.values():
             task.tick()
 
@@ -327,44 +757,85 @@ class Tasklet(SwTimer):
             if task.is_paused():
                 continue
 
-            if task.is_delayed() and self.__max_workers:
-                if not task.is_running():
-                    self.__queue.put(task)
-            else:
-                if not task.is_running():
-                    self.__error_handle(task.run())
+            self.__dispatch(task)
+
+    def __schedule_deadline(self):
+        for task in self.__pop_timeout_tasks():
+            # Paused task poll it at schedule interval until it resumed
+            if task.is_paused():
+                self.__arm(task, self.tick)
+                continue
+
+            # Do not clear a running task reloaded timeout, it will re-arm itself after finished
+            if not task.is_running():
+                task.runtime.timeout = 0.0
+
+            self.__dispatch(task)
+
+    def __dump_statistics(self):
+        if self.__stats_interval <= 0 or not callable(self.__dump_callback):
+            return
+
+        now = time.perf_counter()
+        if now - self.__stats_dump_ts >= self.__stats_interval:
+            self.__stats_dump_ts = now
+            self.__dump_callback(self.dump_statistics())
 
     def __error_handle(self, result):
         if result is not None:
             self.__error_callback(f'Tasklet: {self}, {result}')
 
+    def _next_timeout(self) -> Optional[float]:
+        if self.__policy != self.SCHEDULE_DEADLINE:
+            return super(Tasklet, self)._next_timeout()
+
+        # Statistic dump is enabled, should wakeup at dump time
+        stats_timeout = None
+        if self.__stats_interval > 0 and callable(self.__dump_callback):
+            stats_timeout = max(self.__stats_dump_ts + self.__stats_interval - time.perf_counter(), 0.0)
+
+        with self.__heap_lock:
+            if not self.__heap:
+                return stats_timeout
+
+            timeout = max(self.__heap[0][0] - time.perf_counter(), 0.0)
+            return timeout if stats_timeout is None else min(timeout, stats_timeout)
+
     @property
     def tick(self) -> float:
         return self._base
 
+    @property
+    def policy(self) -> str:
+        return self.__policy
+
     def destroy(self):
         # Detach all task in tasklet
         for task in self.__tasks.values():
             task.detach()
 
         # Destroy all worker thread
-        for _ in range(self.__max_workers):
+        for _ in range(self.__max_workers if self._scheduler is None else 0):
             self.__queue.put(None)
 
         self.__tasks.clear()
+        with self.__heap_lock:
+            self.__heap.clear()
+            self.__armed.clear()
 
         # Stop timer
         self.stop()
 
     def is_idle(self):
         """Check if tasklet is idle(no task in tasklet)"""
-        idle = len(self.__tasks) == 0, self.__queue.qsize() == 0
+        idle = len(self.__tasks) == 0, self.__queue.qsize() == 0 and self.__offloaded.data == 0
         return collections.namedtuple('TaskletIdle', ['tasklet', 'worker'])(*idle)
 
     def del_task(self, tid: str):
         """Delete a task from tasklet"""
         if tid in self.__tasks:
             task = self.__tasks.pop(tid)
+            self.__disarm(tid)
             task.detach()
             self.__dump()
 
@@ -396,9 +867,12 @@ class Tasklet(SwTimer):
         if paused:
             task.pause()
 
+        if self.__policy == self.SCHEDULE_DEADLINE:
+            self.__arm(task)
+
         # If immediate set will run immediately
         if (immediate or task.is_timeout()) and self.__max_workers:
-            self.__queue.put(task)
+            self.__offload(task)
             if not task.periodic:
                 self.del_task(task.id())
 
@@ -408,3 +882,14 @@ class Tasklet(SwTimer):
     def is_task_in_schedule(self, tid: str) -> bool:
         """Check if a task is in tasklet"""
         return tid in self.__tasks
+
+    def statistics(self) -> Dict[str, Dict[str, Any]]:
+        """Get each task statistic summary, key is task id"""
+        return {tid: task.statistic.summary() for tid, task in list(self.__tasks.items())}
+
+    def dump_statistics(self) -> str:
+        """Dump tasks statistic sorted by p99 run cost, unit is millisecond"""
+        statistics = sorted(self.statistics().items(), key=lambda x: x[1]['cost_p99'], reverse=True)
+        lines = [f'{tid}: ' + ', '.join(f'{k}={v * 1000:.2f}' if isinstance(v, float) else f'{k}={v}'
+                                        for k, v in summary.items()) for tid, summary in statistics]
+        return f'{type(self).__name__}, {self.__name}, statistics [\n\t' + '\n\t'.join(lines) + '\n]'
@@ -1,8 +1,48 @@
 # -*- coding: utf-8 -*-
 import inspect
+import weakref
 import itertools
+import threading
+import collections
 from typing import Callable, Tuple, List, Container, Dict, Any, Optional, Sequence
-__all__ = ['util_filter_parameters', 'util_check_arguments', 'util_auto_kwargs']
+__all__ = ['util_filter_parameters', 'util_check_arguments', 'util_auto_kwargs', 'util_get_parameters']
+
+# Function parameters plan: names(in order), names which has default value and auto kwargs plan cache
+ParameterPlan = collections.namedtuple('ParameterPlan', ['names', 'defaults', 'auto'])
+_parameters_cache = weakref.WeakKeyDictionary()
+_parameters_cache_lock = threading.Lock()
+
+
+def _inspect_parameters(func: Callable) -> ParameterPlan:
+    parameters = inspect.signature(func).parameters
+    names = tuple(parameters)
+    defaults = frozenset(k for k, v in parameters.items() if v.default != inspect.Parameter.empty)
+    return ParameterPlan(names, defaults, dict())
+
+
+def util_get_parameters(func: Callable) -> ParameterPlan:
+    """Get func parameters plan, result is cached(weak-keyed) on the callable
+
+    Bound method is cached on the underlying function, so each `obj.method` access shares the same plan
+    :param func: callable to inspect
+    :return: parameters plan
+    """
+    bound = inspect.ismethod(func)
+    target = func.__func__ if bound else func
+
+    try:
+        return _parameters_cache[target][bound]
+    except KeyError:
+        pass
+    except TypeError:
+        # Not weak referable or not hashable, do not cache
+        return _inspect_parameters(func)
+
+    plan = _inspect_parameters(func)
+    with _parameters_cache_lock:
+        _parameters_cache.setdefault(target, dict())[bound] = plan
+
+    return plan
 
 
 def util_filter_parameters(func: Callable, filter_args: Container) -> List[str]:
@@ -12,11 +52,12 @@ def util_filter_parameters(func: Callable, filter_args: Container) -> List[str]:
     :param filter_args: filter args name
     :return: return matched args name
     """
-    return [k for k in inspect.signature(func).parameters if k not in filter_args]
+    return [k for k in util_get_parameters(func).names if k not in filter_args]
 
 
 def util_default_parameters(func: Callable) -> List[str]:
-    return [k for k, v in inspect.signature(func).parameters.items() if v.default != inspect.Parameter.empty]
+    plan = util_get_parameters(func)
+    return [k for k in plan.names if k in plan.defaults]
 
 
 def util_check_arguments(func: Callable, args: Tuple, filter_args: Optional[Sequence] = None):
@@ -42,9 +83,17 @@ def util_check_arguments(func: Callable, args: Tuple, filter_args: Optional[Sequ
 
 
 def util_auto_kwargs(func: Callable, args: Tuple, auto_kwargs: Dict[str, Any]) -> Dict[str, Any]:
-    parameters = inspect.signature(func).parameters
-    normal_params = util_filter_parameters(func, auto_kwargs.keys())
+    plan = util_get_parameters(func)
+    auto_keys = tuple(auto_kwargs)
+
+    # Call plan: auto kwargs accepted by func and normal parameters name, computed once per auto kwargs keys
+    try:
+        accepted, normal_params = plan.auto[auto_keys]
+    except KeyError:
+        accepted = tuple(k for k in auto_keys if k in plan.names)
+        normal_params = tuple(k for k in plan.names if k not in auto_keys)
+        plan.auto[auto_keys] = accepted, normal_params
 
-    kwargs = {k: auto_kwargs.get(k) for k in auto_kwargs if k in parameters}
-    kwargs.update(dict(zip(normal_params, args)))
+    kwargs = {k: auto_kwargs[k] for k in accepted}
+    kwargs.update(zip(normal_params, args))
     return kwargs
@@ -1,5 +1,6 @@
 # -*- coding: utf-8 -*-
 import queue
+import struct
 import typing
 import collections
 from PySide2.QtCore import Qt
@@ -62,21 +63,18 @@ class ModbusAddressModel(AbstractTableModel):
             return index, self.getDisplay(index)
 
     def updateDisplay(self, response: ReadResponse):
-        row, address = self.getModbusAddressAndRow(response.request.start)
-        if not isinstance(address, DynamicObject):
+        # Bit table is updated by watch event
+        if self.table.type == DataType.Bit:
             return
 
-        if DataConvert.get_format_size(address.format) == 2:
-            value = self.dc.plc2python(response.data, address.format)
-            self.setDisplay(self.index(row, self.Column.Ctrl), value)
-            self.setDisplay(self.index(row, self.Column.State), value)
-        else:
-            for i in range(response.request.count):
-                try:
-                    self.setDisplay(self.index(row + i, self.Column.Ctrl), response.data[i])
-                    self.setDisplay(self.index(row + i, self.Column.State), response.data[i])
-                except (ValueError, IndexError, AttributeError):
-                    continue
+        # Response may contain over-read gaps, map data back to each address
+        for row, data in DataConvert.split_read_response(response, self._address_list):
+            try:
+                value = self.dc.plc2python(data, self._address_list[row].format)
+                self.setDisplay(self.index(row, self.Column.Ctrl), value)
+                self.setDisplay(self.index(row, self.Column.State), value)
+            except (ValueError, IndexError, AttributeError, struct.error):
+                continue
 
         # Flush whole table
         self.dataChanged.emit(self.index(-1, -1), self.index(-1, -1), Qt.DisplayRole)
@@ -265,4 +263,5 @@ class ModbusAddressView(QtWidgets.QTabWidget):
             if self._timer_cnt % model.table.auto_flush:
                 return
 
-            self.signalReadRequest.emit(name, model.fc.rd, DataConvert.merge_read_request(model.address_list))
+            requests = DataConvert.merge_read_request(model.address_list, model.table.read_gap, model.fc.rd)
+            self.signalReadRequest.emit(name, model.fc.rd, requests)
@@ -7,7 +7,7 @@ import collections
 from PySide2.QtCore import Qt
 from PySide2 import QtSql, QtCore, QtGui
 
-from ..core.database import DBTable, sqlite_create_tables
+from ..core.database import DBTable, sqlite_create_tables, sqlite_fts_name, sqlite_fts_condition
 __all__ = ['AbstractTableModel', 'SqliteQueryModel', 'Rect', 'q2r', 'r2q', 'create_or_open_sqlite_db']
 
 
@@ -242,13 +242,37 @@ class SqliteQueryModel(QtSql.QSqlQueryModel):
 
     def __init__(self, db_name: str, tbl: DBTable,
                  display_columns: typing.Sequence[str] = None, condition: str = '',
-                 rows_per_page: int = 20, verbose: bool = False, parent: QtCore.QObject = None):
+                 rows_per_page: int = 20, keyset_column: str = '', verbose: bool = False,
+                 parent: QtCore.QObject = None):
+        """Sqlite table query model, display table records page by page
+
+        Default pages are loaded with LIMIT/OFFSET, sqlite has to step over all the skipped rows, so loading
+        a page far from the beginning is slow on a large table. With `keyset_column` pages are loaded with
+        keyset(seek) pagination: `WHERE column >= page first key ORDER BY column LIMIT rows_per_page`, each
+        loaded page first key is cached, near pages first key is located from the nearest cached page(or table
+        head/tail) using a index only scan.
+
+        :param db_name: sqlite database name
+        :param tbl: table to display
+        :param display_columns: display columns name, default is table display columns
+        :param condition: query condition
+        :param rows_per_page: rows per page, 0 display all records
+        :param keyset_column: keyset pagination ordered column, must be unique and indexed(e.g. tbl.pk)
+        :param verbose: print sql sentence
+        :param parent: parent object
+        """
         self.tbl = tbl
         self._cur_page = 0
         self._verbose = verbose
         self._db_name = db_name
         self._rows_per_page = int(rows_per_page)
 
+        # Cached row count and keyset pagination page first key cache
+        self._row_count = None
+        self._page_keys = dict()
+        self._keyset_column = keyset_column
+        self._fts_columns = None
+
         self._columns = display_columns or self.tbl.display_columns()
         self._condition = condition
         super(SqliteQueryModel, self).__init__(parent)
@@ -298,7 +322,20 @@ class SqliteQueryModel(QtSql.QSqlQueryModel):
 
     @property
     def record_count(self) -> int:
-        return self.get_row_count(self.tbl.name)
+        if self._row_count is None:
+            self._row_count = self.get_row_count(self.tbl.name)
+
+        return self._row_count
+
+    @property
+    def keyset_column(self) -> str:
+        return self._keyset_column
+
+    @keyset_column.setter
+    def keyset_column(self, column: str):
+        self._keyset_column = column
+        self._page_keys.clear()
+        self.flush_page(self.cur_page, force=True)
 
     @property
     def query_condition(self) -> str:
@@ -307,6 +344,7 @@ class SqliteQueryModel(QtSql.QSqlQueryModel):
     @query_condition.setter
     def query_condition(self, condition: str):
         self._condition = condition
+        self._page_keys.clear()
         self.show_all()
 
     @property
@@ -340,6 +378,7 @@ class SqliteQueryModel(QtSql.QSqlQueryModel):
     @rows_per_page.setter
     def rows_per_page(self, rows_per_page: int):
         self._rows_per_page = int(rows_per_page)
+        self._page_keys.clear()
         self.flush_page(self.cur_page, force=True)
 
     @property
@@ -362,9 +401,35 @@ class SqliteQueryModel(QtSql.QSqlQueryModel):
     def format_blob_data(data: typing.Any) -> str:
         return f"'{json.dumps(data, ensure_ascii=False)}'"
 
+    @staticmethod
+    def format_key_value(value: typing.Any) -> str:
+        if isinstance(value, (int, float)):
+            return repr(value)
+
+        value = str(value).replace("'", "''")
+        return f"'{value}'"
+
+    def is_keyset_pagination(self) -> bool:
+        return bool(self._keyset_column and self._rows_per_page)
+
+    def invalidate_cache(self):
+        """Invalidate cached row count and page keys, should be called when table is modified outside the model"""
+        self._row_count = None
+        self._page_keys.clear()
+
     def is_support_fuzzy_search(self, key: str) -> bool:
         return self.tbl.get_column_index_from_name(key) in self.tbl.get_fuzzy_columns()
 
+    def is_support_fts_search(self, key: str) -> bool:
+        if self._fts_columns is None:
+            # Shadow FTS index may not exist, e.g. database is created before fts is enabled
+            query = QtSql.QSqlQuery()
+            fts = sqlite_fts_name(self.tbl_name)
+            exist = query.exec_(f"SELECT name FROM sqlite_master WHERE type='table' AND name='{fts}'") and query.first()
+            self._fts_columns = self.tbl.get_fts_columns() if exist else list()
+
+        return key in self._fts_columns
+
     def get_column_data(self, column: int) -> typing.Sequence:
         try:
             column_name = self._columns[column]
@@ -394,6 +459,14 @@ class SqliteQueryModel(QtSql.QSqlQueryModel):
         self.setQuery(query)
 
     def exec_query(self, query: str) -> typing.Tuple[bool, QtSql.QSqlQuery]:
+        result, query_obj = self._exec_query(query)
+        if result:
+            # Arbitrary sentence, can't tell how table is changed
+            self.invalidate_cache()
+
+        return result, query_obj
+
+    def _exec_query(self, query: str) -> typing.Tuple[bool, QtSql.QSqlQuery]:
         if self._verbose:
             print(query)
 
@@ -411,6 +484,8 @@ class SqliteQueryModel(QtSql.QSqlQueryModel):
     def clear_table(self) -> bool:
         query = QtSql.QSqlQuery()
         if query.exec_(f'DELETE FROM {self.tbl_name}'):
+            self._row_count = 0
+            self._page_keys.clear()
             self.signalDBDataChanged.emit(self.tbl.name)
 
             if query.exec_(f'UPDATE {self.SQLITE_SEQ_TBL_NAME} SET seq = 0 WHERE name = "{self.tbl_name}";'):
@@ -428,11 +503,68 @@ class SqliteQueryModel(QtSql.QSqlQueryModel):
 
             if not self._rows_per_page:
                 self.show_all()
+                return
+
+            key = self.__page_key(page) if self.is_keyset_pagination() else None
+            if key is not None:
+                column = self._keyset_column
+                condition = f'({self._condition}) AND ' if self._condition else ''
+                seek = f' WHERE {condition}{column} >= {self.format_key_value(key)} ORDER BY {column}'
+                self.set_query(f'SELECT {self.columns_str} FROM {self.tbl_name}{seek} LIMIT {self._rows_per_page};')
             else:
                 start = page * self._rows_per_page
                 limit = f' LIMIT {int(self._rows_per_page)} OFFSET {int(start)};'
                 condition = f' WHERE {self._condition}' if self._condition else ''
-                self.set_query(f'SELECT {self.columns_str} FROM {self.tbl_name}{condition}{limit}')
+                order = f' ORDER BY {self._keyset_column}' if self.is_keyset_pagination() else ''
+                self.set_query(f'SELECT {self.columns_str} FROM {self.tbl_name}{condition}{order}{limit}')
+
+    def __query_value(self, query: str) -> typing.Any:
+        if self._verbose:
+            print(query)
+
+        query_obj = QtSql.QSqlQuery()
+        query_obj.setForwardOnly(True)
+        return query_obj.value(0) if query_obj.exec_(query) and query_obj.first() else None
+
+    def __page_key(self, page: int) -> typing.Any:
+        """Get page first row keyset column value, locate from the nearest known position"""
+        try:
+            return self._page_keys[page]
+        except KeyError:
+            pass
+
+        column = self._keyset_column
+        condition = f'({self._condition}) AND ' if self._condition else ''
+        where = f' WHERE {self._condition}' if self._condition else ''
+
+        # Nearest cached page before and after requested page
+        before = max((x for x in self._page_keys if x < page), default=None)
+        after = min((x for x in self._page_keys if x > page), default=None)
+
+        # Candidates: (skipped rows, sentence without offset), start from table head
+        candidates = [(page * self._rows_per_page, f'{where} ORDER BY {column}')]
+        if before is not None:
+            key = self.format_key_value(self._page_keys[before])
+            candidates.append(((page - before) * self._rows_per_page,
+                               f' WHERE {condition}{column} >= {key} ORDER BY {column}'))
+
+        if after is not None:
+            key = self.format_key_value(self._page_keys[after])
+            candidates.append(((after - page) * self._rows_per_page - 1,
+                               f' WHERE {condition}{column} < {key} ORDER BY {column} DESC'))
+
+        # Row count ignore query condition, only could locate from table tail without condition
+        if not self._condition:
+            skip = self.record_count - page * self._rows_per_page - 1
+            if skip >= 0:
+                candidates.append((skip, f' ORDER BY {column} DESC'))
+
+        skip, sentence = min(candidates, key=lambda x: x[0])
+        key = self.__query_value(f'SELECT {column} FROM {self.tbl_name}{sentence} LIMIT 1 OFFSET {skip};')
+        if key is not None:
+            self._page_keys[page] = key
+
+        return key
 
     def select_record(self, condition: str):
         record_value = list()
@@ -449,7 +581,13 @@ class SqliteQueryModel(QtSql.QSqlQueryModel):
         return record_value
 
     def delete_record(self, pk: typing.Any) -> bool:
-        return self.exec_query(f'DELETE FROM {self.tbl_name} WHERE {self.tbl.pk} = {pk};')[0]
+        result, query = self._exec_query(f'DELETE FROM {self.tbl_name} WHERE {self.tbl.pk} = {pk};')
+        if result:
+            self._page_keys.clear()
+            if self._row_count is not None:
+                self._row_count = max(self._row_count - max(query.numRowsAffected(), 0), 0)
+
+        return result
 
     def search_record(self, key: str, value: str, like: bool = False):
         # Sql sentence select
@@ -457,15 +595,32 @@ class SqliteQueryModel(QtSql.QSqlQueryModel):
             self.set_query(value)
         else:
             q = f' and {self._condition}' if self._condition else ''
+            if like and len(value) >= self.tbl.FTS_MIN_LENGTH and self.is_support_fts_search(key):
+                condition = sqlite_fts_condition(self.tbl_name, key, value)
+                self.set_query(f'SELECT {self.columns_str} FROM {self.tbl_name} WHERE {condition}{q};')
+                if not self.lastError().isValid():
+                    return
+
+                # FTS5 or tokenizer is not supported by this sqlite, fallback to like
+                self._fts_columns = list()
+
             condition = f'{key} like "%{value}%"' if like else f'{key} = "{value}"'
             self.set_query(f'SELECT {self.columns_str} FROM {self.tbl_name} WHERE {condition}{q};')
 
     def insert_record(self, record: typing.Dict[str, typing.Any]) -> bool:
-        return self.exec_query(self.tbl.get_insert_sentence(record))[0]
+        result, _ = self._exec_query(self.tbl.get_insert_sentence(record))
+        if result:
+            self._page_keys.clear()
+            if self._row_count is not None:
+                self._row_count += 1
+
+        return result
 
     def update_record(self, pk: typing.Any, record: typing.Dict[str, typing.Any]) -> bool:
-        result, query = self.exec_query(self.tbl.get_update_sentence(record, f'{self.tbl.pk} = {pk}'))
+        result, query = self._exec_query(self.tbl.get_update_sentence(record, f'{self.tbl.pk} = {pk}'))
         if result:
+            # Row count is unchanged, keyset column value may changed
+            self._page_keys.clear()
             self.flush_page(self.cur_page, force=True)
             return True
 
@@ -521,7 +521,8 @@ class SqliteQueryView(BasicWidget):
                  precisely_search_columns: typing.Optional[typing.Sequence[int]] = None,
                  readonly: bool = False, without_search: bool = False, without_pt_ctrl: bool = False,
                  row_autoincrement_factor: float = 0.0, datetime_format: str = 'yyyy/MM/dd hh:mm:ss',
-                 search_box_min_width: int = 400, auto_init: bool = False, parent: QtWidgets.QWidget = None):
+                 search_box_min_width: int = 400, search_debounce: int = 0,
+                 auto_init: bool = False, parent: QtWidgets.QWidget = None):
         """SQliteQueryView
 
         :param model: SqliteQueryModel instance
@@ -535,6 +536,7 @@ class SqliteQueryView(BasicWidget):
         :param row_autoincrement_factor: row autoincrement factor
         :param datetime_format: datetime format date search using this
         :param search_box_min_width: search box minimum width
+        :param search_debounce: search while typing, search after input stopped for `search_debounce` ms, 0 disable
         :param auto_init: if set this stretch_factor/date_search_columns/precisely_search_columns will get from model
         :param parent: parent widget
         """
@@ -549,6 +551,7 @@ class SqliteQueryView(BasicWidget):
         self._without_pt_ctrl = without_pt_ctrl
 
         self._datetime_format = datetime_format
+        self._search_debounce = search_debounce
         self._search_box_min_width = search_box_min_width
         self._row_autoincrement_factor = row_autoincrement_factor
         self._custom_context_menu = collections.OrderedDict(custom_context_menu or dict())
@@ -575,6 +578,7 @@ class SqliteQueryView(BasicWidget):
         self.ui_next = QtWidgets.QPushButton(self.tr('Next'))
         self.ui_prev = QtWidgets.QPushButton(self.tr('Prev'))
         self.ui_search = QtWidgets.QPushButton(self.tr('Search'))
+        self.ui_search_timer = QtCore.QTimer(self)
         self.ui_page_num_label = QtWidgets.QLabel(self.tr('Page Num'))
         self.ui_clear_search = QtWidgets.QPushButton(self.tr('Clear Search'))
 
@@ -630,6 +634,9 @@ class SqliteQueryView(BasicWidget):
         self.ui_search_value.setEditable(True)
         self.ui_search_value.setMinimumWidth(self._search_box_min_width)
 
+        self.ui_search_timer.setSingleShot(True)
+        self.ui_search_timer.setInterval(self._search_debounce)
+
         self.ui_end_date.setCalendarPopup(True)
         self.ui_start_date.setCalendarPopup(True)
 
@@ -662,6 +669,9 @@ class SqliteQueryView(BasicWidget):
         self.ui_start_date.dateChanged.connect(self.slotUpdateDateRange)
         self.ui_search_key.currentIndexChanged.connect(self.slotSearchKeyChanged)
         self.ui_view.customContextMenuRequested.connect(self.slotCustomContextMenu)
+        self.ui_search_timer.timeout.connect(self.slotSearch)
+        if self._search_debounce:
+            self.ui_search_value.editTextChanged.connect(self.slotSearchTextChanged)
 
         self.ui_end.setShortcut(QtGui.QKeySequence(Qt.Key_End))
         self.ui_home.setShortcut(QtGui.QKeySequence(Qt.Key_Home))
@@ -737,6 +747,8 @@ class SqliteQueryView(BasicWidget):
             self.ui_page_num.setValue(self.ui_page_num.value() + 1)
 
     def slotFlush(self, scroll_to_end: bool = False):
+        # Records may be written by other connections or processes, row count and page keys are cached until refresh
+        self._model.invalidate_cache()
         if self._without_pt_ctrl:
             # Without page turn ctrl always show all records
             self._model.show_all()
@@ -784,6 +796,13 @@ class SqliteQueryView(BasicWidget):
             key = self.ui_search_key.currentData(QtCore.Qt.UserRole)
             self._model.search_record(key, value, self._enable_fuzzy_search(key))
 
+    def slotSearchTextChanged(self, text: str):
+        # Raw sql sentence is incomplete while typing, only search by search button
+        if 'select' in text.lower():
+            self.ui_search_timer.stop()
+        else:
+            self.ui_search_timer.start()
+
     def slotUpdateDateRange(self, _):
         k = self.ui_search_key.currentData(QtCore.Qt.UserRole)
         s = QtCore.QDateTime(self.ui_start_date.date(), QtCore.QTime(0, 0, 0)).toString(self._datetime_format)
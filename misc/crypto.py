@@ -1,12 +1,14 @@
 # -*- coding: utf-8 -*-
 import os
 import pyDes
+import struct
 import typing
 import Crypto
 import binascii
 from Crypto import Random
 from Crypto.Cipher import AES
 from Crypto.PublicKey import RSA
+from Crypto.Cipher import PKCS1_OAEP as OAEP_cipher
 from Crypto.Cipher import PKCS1_v1_5 as PKCS1_cipher
 from Crypto.Signature import PKCS1_v1_5 as PKCS1_signature
 from Crypto.Hash import SHA1, SHA, SHA224, SHA256, SHA384, SHA512, SHA3_224, SHA3_256, SHA3_384, SHA3_512, \
@@ -29,6 +31,11 @@ class RSAKeyPair(DynamicObject):
 
 class RSAKeyHandle(object):
     KEYWORDS = ('',)
+    ENVELOPE_MAGIC = b'RSAE'
+    ENVELOPE_VERSION = 1
+    ENVELOPE_KEY_SIZE = 32
+    ENVELOPE_HEADER_FMT = '>4sBH'
+    ENVELOPE_CHUNK_SIZE = 64 * 1024
     Protections = (
         'None',
         'PBKDF2WithHMAC-SHA1AndAES128-CBC',
@@ -70,28 +77,73 @@ class RSAKeyHandle(object):
         return all([kw in raw_key_str for kw in self.KEYWORDS])
 
     def encrypt(self, message: bytes) -> bytes:
-        result = bytes()
         cipher = PKCS1_cipher.new(self._key)
         max_length = self.get_max_length(True)
-
-        while message:
-            result += cipher.encrypt(message[:max_length])
-            message = message[max_length:]
-
-        return result
+        message = memoryview(message)
+        return b''.join(cipher.encrypt(message[i:i + max_length]) for i in range(0, len(message), max_length))
 
     def decrypt(self, message: bytes) -> bytes:
         try:
-            result = bytes()
             cipher = PKCS1_cipher.new(self._key)
             max_length = self.get_max_length(False)
+            message = memoryview(message)
+            return b''.join(cipher.decrypt(message[i:i + max_length], b'') for i in range(0, len(message), max_length))
+        except (binascii.Error, ValueError):
+            return bytes()
 
-            while message:
-                result += cipher.decrypt(message[:max_length], b'')
-                message = message[max_length:]
+    def envelope_encrypt_iter(self, src: typing.Union[typing.BinaryIO, typing.Iterable[bytes]],
+                              chunk_size: int = ENVELOPE_CHUNK_SIZE,
+                              progress: typing.Optional[typing.Callable[[int], None]] = None) -> typing.Iterator[bytes]:
+        """Hybrid envelope encrypt: random session key is encrypted by RSA(OAEP), data is encrypted by AES-GCM
+
+        Envelope: magic, version, wrapped key length, wrapped key, `AESCrypto.encrypt_iter` stream
+        :param src: plaintext bytes, file object or bytes iterator
+        :param chunk_size: AES stream chunk size
+        :param progress: called with processed plaintext size after each chunk
+        :return: envelope pieces
+        """
+        session_key = Random.get_random_bytes(self.ENVELOPE_KEY_SIZE)
+        wrapped_key = OAEP_cipher.new(self._key, hashAlgo=SHA256).encrypt(session_key)
+        yield struct.pack(self.ENVELOPE_HEADER_FMT, self.ENVELOPE_MAGIC, self.ENVELOPE_VERSION, len(wrapped_key))
+        yield wrapped_key
+
+        src = [src] if isinstance(src, (bytes, bytearray, memoryview)) else src
+        yield from AESCrypto(session_key, pad_key=False).encrypt_iter(src, chunk_size, progress)
+
+    def envelope_decrypt_iter(self, src: typing.Union[typing.BinaryIO, typing.Iterable[bytes]],
+                              progress: typing.Optional[typing.Callable[[int], None]] = None) -> typing.Iterator[bytes]:
+        """Hybrid envelope decrypt, requires private key
+
+        :param src: envelope bytes, file object or bytes iterator
+        :param progress: called with processed plaintext size after each chunk
+        :return: plaintext chunks, invalid envelope or authenticate failed raise ValueError
+        """
+        src = [src] if isinstance(src, (bytes, bytearray, memoryview)) else src
+        reader = AESStreamReader(src)
+        try:
+            magic, version, length = struct.unpack(
+                self.ENVELOPE_HEADER_FMT, reader.read(struct.calcsize(self.ENVELOPE_HEADER_FMT))
+            )
+        except struct.error:
+            raise ValueError('Invalid envelope header')
 
-            return result
-        except (binascii.Error, ValueError):
+        if magic != self.ENVELOPE_MAGIC or version != self.ENVELOPE_VERSION:
+            raise ValueError('Invalid envelope magic or version')
+
+        try:
+            session_key = OAEP_cipher.new(self._key, hashAlgo=SHA256).decrypt(reader.read(length))
+        except TypeError as e:
+            raise ValueError(f'Unwrap session key failed: {e}')
+
+        yield from AESCrypto(session_key, pad_key=False).decrypt_iter(reader, progress)
+
+    def envelope_encrypt(self, message: bytes) -> bytes:
+        return b''.join(self.envelope_encrypt_iter(message))
+
+    def envelope_decrypt(self, message: bytes) -> bytes:
+        try:
+            return b''.join(self.envelope_decrypt_iter(message))
+        except ValueError:
             return bytes()
 
     def get_max_length(self, encrypt: bool) -> int:
@@ -187,10 +239,47 @@ class DESCrypto(object):
         return self._des.decrypt(data)
 
 
+class AESStreamReader(object):
+    def __init__(self, src: typing.Union[typing.BinaryIO, typing.Iterable[bytes]]):
+        """Read exact size data from a file object or bytes iterator(pieces could be any size)"""
+        self._buffer = bytearray()
+        self._read = getattr(src, 'read', None)
+        self._iter = None if callable(self._read) else iter(src)
+
+    def read(self, size: int) -> bytes:
+        """Read `size` bytes, less only if source is exhausted"""
+        while len(self._buffer) < size:
+            if self._iter is None:
+                data = self._read(size - len(self._buffer))
+            else:
+                data = next(self._iter, b'')
+
+            if not data:
+                break
+
+            self._buffer += data
+
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
 class AESCrypto(object):
     BLOCK_SIZE = 16
     AES_CBC, AES_ECB, AES_GCM, AES_CTR = 'CBC', 'ECB', 'GCM', 'CTR'
 
+    # Streaming format: header | chunk ... | final chunk
+    # header: magic, version, chunk size, nonce prefix; chunk: final flag, length, ciphertext, tag
+    # each chunk is encrypted with AES-GCM, nonce is nonce prefix + chunk index,
+    # header, chunk index and final flag are authenticated, so chunks couldn't be reordered, dropped or truncated
+    STREAM_MAGIC = b'AESS'
+    STREAM_VERSION = 1
+    STREAM_TAG_SIZE = 16
+    STREAM_NONCE_PREFIX_SIZE = 8
+    STREAM_CHUNK_SIZE = 64 * 1024
+    STREAM_HEADER_FMT = '>4sBI8s'
+    STREAM_CHUNK_HEADER_FMT = '>BI'
+
     AES_MODE = {
         AES_CBC: AES.MODE_CBC,
         AES_ECB: AES.MODE_ECB,
@@ -239,15 +328,146 @@ class AESCrypto(object):
         plaintext = self.cipher().decrypt(data)
         return self.unpad(plaintext)
 
-    def encrypt_file(self, src: str, dest: str):
+    def __stream_cipher(self, nonce_prefix: bytes, index: int, header: bytes, final: bool):
+        cipher = AES.new(self.__key, AES.MODE_GCM, nonce=nonce_prefix + struct.pack('>I', index))
+        cipher.update(header + struct.pack('>IB', index, final))
+        return cipher
+
+    def encrypt_iter(self, src: typing.Union[typing.BinaryIO, typing.Iterable[bytes]],
+                     chunk_size: int = STREAM_CHUNK_SIZE,
+                     progress: typing.Optional[typing.Callable[[int], None]] = None) -> typing.Iterator[bytes]:
+        """Streaming encrypt, memory usage is bounded by `chunk_size` regardless of data size
+
+        Streaming always using AES-GCM with a random nonce, `mode` and `iv` are ignored
+        :param src: plaintext file object or bytes iterator
+        :param chunk_size: plaintext chunk size
+        :param progress: called with processed plaintext size after each chunk
+        :return: ciphertext pieces(header and chunks)
+        """
+        if not 0 < chunk_size < 2 ** 32:
+            raise ValueError(f'Invalid chunk size: {chunk_size}')
+
+        nonce_prefix = Random.get_random_bytes(self.STREAM_NONCE_PREFIX_SIZE)
+        header = struct.pack(self.STREAM_HEADER_FMT, self.STREAM_MAGIC, self.STREAM_VERSION, chunk_size, nonce_prefix)
+        yield header
+
+        index = 0
+        processed = 0
+        reader = AESStreamReader(src)
+        chunk = reader.read(chunk_size)
+        while True:
+            # Read ahead one chunk to know if current chunk is the final one
+            following = reader.read(chunk_size) if len(chunk) == chunk_size else b''
+            final = not following
+
+            ciphertext, tag = self.__stream_cipher(nonce_prefix, index, header, final).encrypt_and_digest(chunk)
+            yield struct.pack(self.STREAM_CHUNK_HEADER_FMT, final, len(ciphertext)) + ciphertext + tag
+
+            processed += len(chunk)
+            if callable(progress):
+                progress(processed)
+
+            if final:
+                break
+
+            index += 1
+            chunk = following
+
+    def decrypt_iter(self, src: typing.Union[typing.BinaryIO, typing.Iterable[bytes]],
+                     progress: typing.Optional[typing.Callable[[int], None]] = None) -> typing.Iterator[bytes]:
+        """Streaming decrypt, each chunk is authenticated before it's yielded
+
+        :param src: `encrypt_iter` output file object or bytes iterator
+        :param progress: called with processed plaintext size after each chunk
+        :return: plaintext chunks, authenticate failed or truncated raise ValueError
+        """
+        reader = AESStreamReader(src)
+        header = reader.read(struct.calcsize(self.STREAM_HEADER_FMT))
+        try:
+            magic, version, chunk_size, nonce_prefix = struct.unpack(self.STREAM_HEADER_FMT, header)
+        except struct.error:
+            raise ValueError('Invalid stream header')
+
+        if magic != self.STREAM_MAGIC or version != self.STREAM_VERSION:
+            raise ValueError('Invalid stream magic or version')
+
+        index = 0
+        processed = 0
+        chunk_header_size = struct.calcsize(self.STREAM_CHUNK_HEADER_FMT)
+        while True:
+            try:
+                final, length = struct.unpack(self.STREAM_CHUNK_HEADER_FMT, reader.read(chunk_header_size))
+            except struct.error:
+                raise ValueError('Stream truncated')
+
+            if length > chunk_size:
+                raise ValueError('Invalid chunk length')
+
+            data = reader.read(length + self.STREAM_TAG_SIZE)
+            if len(data) != length + self.STREAM_TAG_SIZE:
+                raise ValueError('Stream truncated')
+
+            cipher = self.__stream_cipher(nonce_prefix, index, header, bool(final))
+            chunk = cipher.decrypt_and_verify(data[:length], data[length:])
+
+            processed += len(chunk)
+            if callable(progress):
+                progress(processed)
+
+            yield chunk
+            if final:
+                break
+
+            index += 1
+
+    def encrypt_stream(self, src: typing.Union[typing.BinaryIO, typing.Iterable[bytes]], dest: typing.BinaryIO,
+                       chunk_size: int = STREAM_CHUNK_SIZE,
+                       progress: typing.Optional[typing.Callable[[int], None]] = None) -> int:
+        """Streaming encrypt `src` to file object `dest`, return ciphertext size"""
+        return sum(dest.write(x) for x in self.encrypt_iter(src, chunk_size, progress))
+
+    def decrypt_stream(self, src: typing.Union[typing.BinaryIO, typing.Iterable[bytes]], dest: typing.BinaryIO,
+                       progress: typing.Optional[typing.Callable[[int], None]] = None) -> int:
+        """Streaming decrypt `src` to file object `dest`, return plaintext size"""
+        return sum(dest.write(x) for x in self.decrypt_iter(src, progress))
+
+    def encrypt_file(self, src: str, dest: str, streaming: bool = False,
+                     progress: typing.Optional[typing.Callable[[int, int], None]] = None):
+        """Encrypt file
+
+        :param src: plaintext file path
+        :param dest: ciphertext file path
+        :param streaming: chunked streaming format(bounded memory), otherwise whole file is encrypted in one call
+        :param progress: streaming progress callback, called with (processed size, file size)
+        :return:
+        """
         with open(src, 'rb') as src_fp:
             with open(dest, 'wb') as dest_fp:
-                dest_fp.write(self.encrypt(src_fp.read()))
-
-    def decrypt_file(self, src: str, dest: str):
+                if not streaming:
+                    dest_fp.write(self.encrypt(src_fp.read()))
+                    return
+
+                size = os.fstat(src_fp.fileno()).st_size
+                self.encrypt_stream(src_fp, dest_fp, progress=lambda x: progress(x, size) if progress else None)
+
+    def decrypt_file(self, src: str, dest: str, streaming: bool = False,
+                     progress: typing.Optional[typing.Callable[[int, int], None]] = None):
+        """Decrypt file
+
+        :param src: ciphertext file path
+        :param dest: plaintext file path
+        :param streaming: `src` is encrypted in streaming format
+        :param progress: streaming progress callback, called with (processed ciphertext size, file size)
+        :return: streaming decrypt failed raise ValueError, `dest` may contains partial verified data
+        """
         with open(src, 'rb') as src_fp:
             with open(dest, 'wb') as dest_fp:
-                dest_fp.write(self.decrypt(src_fp.read()))
+                if not streaming:
+                    dest_fp.write(self.decrypt(src_fp.read()))
+                    return
+
+                size = os.fstat(src_fp.fileno()).st_size
+                self.decrypt_stream(src_fp, dest_fp, lambda _: progress(src_fp.tell(), size) if progress else None)
 
 
 class CryptoCommException(Exception):
@@ -267,7 +487,8 @@ class CryptoCommVerifyException(CryptoCommException):
 
 
 def crypto_decrypt_data(
-        public_key: RSAPublicKeyHandle, private_key: RSAPrivateKeyHandle, data: bytes, hash_algo: str = 'SHA256'
+        public_key: RSAPublicKeyHandle, private_key: RSAPrivateKeyHandle, data: bytes, hash_algo: str = 'SHA256',
+        envelope: bool = False
 ) -> bytes:
     sign_length = -384
     if len(data) <= sign_length:
@@ -278,7 +499,7 @@ def crypto_decrypt_data(
     if not public_key.verify(cipher, sign, hash_algo):
         raise CryptoCommVerifyException('verify request failed')
 
-    raw = private_key.decrypt(cipher)
+    raw = private_key.envelope_decrypt(cipher) if envelope else private_key.decrypt(cipher)
     if not raw:
         raise CryptoCommDecodeException('decrypt request failed')
 
@@ -286,16 +507,27 @@ def crypto_decrypt_data(
 
 
 def crypto_encrypt_data(
-        public_key: RSAPublicKeyHandle, private_key: RSAPrivateKeyHandle, data: bytes, hash_algo: str = 'SHA256'
+        public_key: RSAPublicKeyHandle, private_key: RSAPrivateKeyHandle, data: bytes, hash_algo: str = 'SHA256',
+        envelope: bool = False
 ) -> bytes:
-    cipher = public_key.encrypt(data)
+    cipher = public_key.envelope_encrypt(data) if envelope else public_key.encrypt(data)
     sign = private_key.sign(cipher, hash_algo)
     return cipher + sign
 
 
 def crypto_communication(
         public_key: RSAPublicKeyHandle, private_key: RSAPrivateKeyHandle,
-        data: bytes, comm_core: typing.Callable[[bytes], bytes], hash_algo: str = 'SHA256'
+        data: bytes, comm_core: typing.Callable[[bytes], bytes], hash_algo: str = 'SHA256', envelope: bool = False
 ) -> bytes:
-    data = crypto_encrypt_data(public_key, private_key, data, hash_algo)
-    return crypto_decrypt_data(public_key, private_key, comm_core(data), hash_algo)
+    """Encrypt and sign request, then verify and decrypt response
+
+    :param public_key: peer public key, encrypt request and verify response
+    :param private_key: self private key, sign request and decrypt response
+    :param data: request data
+    :param comm_core: send request and return response
+    :param hash_algo: signature hash algorithm
+    :param envelope: using hybrid envelope(RSA wrapped session key and AES) instead of RSA block by block
+    :return: response data, error raise CryptoCommException
+    """
+    data = crypto_encrypt_data(public_key, private_key, data, hash_algo, envelope)
+    return crypto_decrypt_data(public_key, private_key, comm_core(data), hash_algo, envelope)
@@ -3,13 +3,19 @@
 Tar package file manager, support package file/directory to tar, gz, bz2  or un-package file
 """
 import os
+import copy
+import json
 import shutil
+import hashlib
 import tarfile
 import typing
 import zipfile
 import lz4.frame
-from typing import Optional, Callable, List, Sequence, Tuple, Union
-__all__ = ['TarManager', 'TarManagerError', 'TarManagerCallback']
+import collections
+import concurrent.futures
+from typing import Optional, Callable, List, Sequence, Tuple, Union, Iterable, Iterator, BinaryIO, Container
+from ..core.datatype import DynamicObject, DynamicObjectDecodeError
+__all__ = ['TarManager', 'TarManagerError', 'TarManagerCallback', 'TarManifest', 'TarManifestEntry']
 
 # callback(processingFilename, processingFileIndex)
 TarManagerCallback = Callable[[str, int], None]
@@ -28,6 +34,9 @@ class Compress(object):
     def open(self, name: str, mode: str, fmt: str):
         pass
 
+    def get_path(self, name: str, fmt: str) -> str:
+        return name
+
     def close(self, obj):
         if not self.type_check(obj):
             return
@@ -52,18 +61,18 @@ class Compress(object):
         if hasattr(self._callback, "__call__"):
             self._callback(name, self._processing)
 
-    def _pack(self, obj, filename: str):
+    def _pack(self, obj, filename: str, arcname: Optional[str] = None):
         pass
 
-    def pack(self, obj, filename: str):
+    def pack(self, obj, filename: str, arcname: Optional[str] = None):
         if not self.type_check(obj) or not os.path.isfile(filename):
             return
 
         if self._simulate:
-            self.callback(filename)
+            self.callback(arcname or filename)
         else:
-            self.callback(filename)
-            self._pack(obj, filename)
+            self.callback(arcname or filename)
+            self._pack(obj, filename, arcname)
 
     def _extract(self, obj, filename: str, extract_path: str):
         pass
@@ -118,8 +127,8 @@ class TarCompress(Compress):
     def get_members(self, obj: TarObject) -> List[str]:
         return obj.getnames()
 
-    def _pack(self, obj: TarObject, filename: str):
-        obj.add(filename)
+    def _pack(self, obj: TarObject, filename: str, arcname: Optional[str] = None):
+        obj.add(filename, arcname)
 
     def _extractall(self, obj: TarObject, extract_path: str):
         obj.extractall(extract_path)
@@ -140,8 +149,10 @@ class ZipCompress(Compress):
     }
 
     def open(self, name: str, mode: str, fmt: str) -> ZipObject:
-        name = name.replace(fmt, "zip")
-        return zipfile.ZipFile(name, mode, self.support_format.get(fmt))
+        return zipfile.ZipFile(self.get_path(name, fmt), mode, self.support_format.get(fmt))
+
+    def get_path(self, name: str, fmt: str) -> str:
+        return name.replace(fmt, "zip")
 
     def type_check(self, obj: ZipObject):
         return isinstance(obj, zipfile.ZipFile)
@@ -155,8 +166,8 @@ class ZipCompress(Compress):
     def get_members(self, obj: ZipObject) -> List[str]:
         return obj.namelist()
 
-    def _pack(self, obj: ZipObject, filename: str):
-        obj.write(filename)
+    def _pack(self, obj: ZipObject, filename: str, arcname: Optional[str] = None):
+        obj.write(filename, arcname)
 
     def _extractall(self, obj: ZipObject, extract_path: str):
         obj.extractall(extract_path)
@@ -171,6 +182,11 @@ class Lz4Compress(TarCompress):
     }
     Lz4Object = TarCompress.TarObject
 
+    # Streaming: each file is split into blocks, blocks are compressed as independent lz4 frames in parallel,
+    # frames are concatenated in order as the `.lz4` member of the tar, so archive format is unchanged
+    STREAM_BLOCK_SIZE = 4 * 1024 * 1024
+    STREAM_READ_SIZE = 1024 * 1024
+
     @staticmethod
     def __get_lz4_filename(filename: str) -> str:
         return filename + '.lz4'
@@ -182,7 +198,161 @@ class Lz4Compress(TarCompress):
     def open(self, name: str, mode: str, fmt: str) -> Lz4Object:
         return tarfile.open(name, mode + self.support_format.get(fmt))
 
-    def _pack(self, obj: Lz4Object, filename: str):
+    @classmethod
+    def decompress_stream(cls, src: BinaryIO, dest: BinaryIO):
+        """Decompress lz4 frames(one or more concatenated) from `src` to `dest` chunk by chunk"""
+        decompressor = lz4.frame.LZ4FrameDecompressor()
+        while True:
+            data = src.read(cls.STREAM_READ_SIZE)
+            if not data:
+                break
+
+            while data:
+                dest.write(decompressor.decompress(data))
+                if not decompressor.eof:
+                    break
+
+                # Next frame
+                data = decompressor.unused_data
+                decompressor = lz4.frame.LZ4FrameDecompressor()
+
+    @staticmethod
+    def _compress_block(filename: str, offset: int, size: int) -> bytes:
+        with open(filename, 'rb') as fp:
+            fp.seek(offset)
+            return lz4.frame.compress(fp.read(size))
+
+    def __begin_member(self, obj: Lz4Object, arcname: str, filename: str) -> Tuple[tarfile.TarInfo, int, int]:
+        """Write member header with placeholder size, return member info, header offset, header size"""
+        info = obj.gettarinfo(filename, arcname=self.__get_lz4_filename(arcname))
+        info.size = 0
+
+        header = info.tobuf(obj.format, obj.encoding, obj.errors)
+        offset = obj.offset
+        obj.fileobj.write(header)
+        obj.offset += len(header)
+        return info, offset, len(header)
+
+    @staticmethod
+    def __end_member(obj: Lz4Object, info: tarfile.TarInfo, offset: int, header_size: int):
+        """Rewrite member header with real size, and pad member data to tar block"""
+        info.size = obj.offset - offset - header_size
+        header = info.tobuf(obj.format, obj.encoding, obj.errors)
+        if len(header) != header_size:
+            raise tarfile.TarError(f'{info.name} is too large to stream')
+
+        obj.fileobj.seek(offset)
+        obj.fileobj.write(header)
+        obj.fileobj.seek(obj.offset)
+
+        remainder = info.size % tarfile.BLOCKSIZE
+        if remainder:
+            obj.fileobj.write(tarfile.NUL * (tarfile.BLOCKSIZE - remainder))
+            obj.offset += tarfile.BLOCKSIZE - remainder
+
+        info.offset = offset
+        obj.members.append(info)
+
+    def stream_pack(self, obj: Lz4Object, path: str, files: Iterable[str],
+                    workers: int = 0, block_size: int = STREAM_BLOCK_SIZE,
+                    reuse: Optional[Lz4Object] = None, unchanged: Container[str] = ()):
+        """Compress files in parallel and write to tar directly, without temporary file or changing work dir
+
+        Memory usage is bounded by `workers * 2` blocks in flight, output file must be seekable
+        :param obj: tar object opened for writing
+        :param path: files root directory
+        :param files: files path relative to `path`, member name is the relative path
+        :param workers: compress threads number, 0 is cpu count
+        :param block_size: compress block size
+        :param reuse: previous package, `unchanged` files compressed member is copied from it without recompress
+        :param unchanged: files which content is not changed since `reuse` is packed
+        """
+        reusable = set(reuse.getnames()) if reuse is not None else set()
+
+        def blocks() -> Iterator[Tuple[str, str, int, int, bool, bool]]:
+            for arcname in files:
+                filename = os.path.join(path, arcname)
+                if not os.path.isfile(filename):
+                    continue
+
+                if arcname in unchanged and self.__get_lz4_filename(arcname) in reusable:
+                    yield arcname, filename, -1, 0, True, True
+                    continue
+
+                size = os.path.getsize(filename)
+                offsets = range(0, size, block_size) if size else [0]
+                for offset in offsets:
+                    yield arcname, filename, offset, min(block_size, size - offset), \
+                        offset == 0, offset + block_size >= size
+
+        workers = workers or os.cpu_count() or 1
+        member = None
+        pending = collections.deque()
+
+        def write(block: Tuple[str, str, int, int, bool, bool], future: concurrent.futures.Future):
+            nonlocal member
+            arcname, filename, offset, _, first, last = block
+            if first:
+                self.callback(arcname)
+                if not self._simulate and offset >= 0:
+                    member = self.__begin_member(obj, arcname, filename)
+
+            if self._simulate:
+                return
+
+            if offset < 0:
+                reused = reuse.getmember(self.__get_lz4_filename(arcname))
+                obj.addfile(copy.copy(reused), reuse.extractfile(reused))
+                return
+
+            data = future.result()
+            obj.fileobj.write(data)
+            obj.offset += len(data)
+
+            if last:
+                self.__end_member(obj, *member)
+
+        if self._simulate:
+            for task in blocks():
+                write(task, None)
+            return
+
+        with concurrent.futures.ThreadPoolExecutor(workers) as executor:
+            try:
+                for task in blocks():
+                    future = executor.submit(self._compress_block, *task[1:4]) if task[2] >= 0 else None
+                    pending.append((task, future))
+                    if len(pending) >= workers * 2:
+                        write(*pending.popleft())
+
+                while pending:
+                    write(*pending.popleft())
+            finally:
+                for _, future in pending:
+                    if future is not None:
+                        future.cancel()
+
+    def stream_extractall(self, obj: Lz4Object, extract_path: str):
+        """Decompress members from tar stream to `extract_path` directly, without temporary `.lz4` file"""
+        root = os.path.abspath(extract_path)
+        for member in obj:
+            filename = os.path.abspath(os.path.join(root, self.__get_org_filename(member.name)))
+            if os.path.commonpath([root, filename]) != root:
+                raise tarfile.TarError(f'{member.name} is outside extract path')
+
+            self.callback(member.name)
+            if self._simulate:
+                continue
+
+            if not member.isfile() or not member.name.endswith('.lz4'):
+                obj.extract(member, extract_path)
+                continue
+
+            os.makedirs(os.path.dirname(filename), exist_ok=True)
+            with open(filename, 'wb') as write_fp:
+                self.decompress_stream(obj.extractfile(member), write_fp)
+
+    def _pack(self, obj: Lz4Object, filename: str, arcname: Optional[str] = None):
         # Read original file
         with open(filename, 'rb') as read_fp:
             input_data = read_fp.read()
@@ -194,7 +364,7 @@ class Lz4Compress(TarCompress):
 
         try:
             # Add lz4 to tar
-            obj.add(lz4_file)
+            obj.add(lz4_file, self.__get_lz4_filename(arcname) if arcname else None)
         finally:
             if os.path.isfile(lz4_file):
                 os.unlink(lz4_file)
@@ -208,7 +378,7 @@ class Lz4Compress(TarCompress):
             try:
                 with open(os.path.join(extract_path, self.__get_org_filename(filename)), 'wb') as write_fp:
                     with open(lz4_file_path, 'rb') as read_fp:
-                        write_fp.write(lz4.frame.decompress(read_fp.read()))
+                        self.decompress_stream(read_fp, write_fp)
             finally:
                 if os.path.isfile(lz4_file_path):
                     os.unlink(lz4_file_path)
@@ -220,7 +390,7 @@ class Lz4Compress(TarCompress):
         try:
             with open(os.path.join(extract_path, self.__get_org_filename(filename)), 'wb') as write_fp:
                 with open(lz4_file_path, 'rb') as read_fp:
-                    write_fp.write(lz4.frame.decompress(read_fp.read()))
+                    self.decompress_stream(read_fp, write_fp)
         finally:
             if os.path.isfile(lz4_file_path):
                 os.unlink(lz4_file_path)
@@ -230,6 +400,121 @@ class TarManagerError(Exception):
     pass
 
 
+TarManifestEntry = collections.namedtuple('TarManifestEntry', 'size mtime hash')
+
+
+class TarManifest(DynamicObject):
+    VERSION = 1
+    EXTENSION = '.manifest'
+    HASH_BLOCK_SIZE = 1024 * 1024
+    _properties = {'version', 'base', 'files', 'removed'}
+    _json_dump_sequence = ('version', 'base', 'removed', 'files')
+
+    def __init__(self, **kwargs):
+        """Package manifest, each file size, modify time(ns) and content sha256
+
+        :param version: manifest version
+        :param base: delta package base package name, empty if package is a full package
+        :param files: file relative path -> (size, mtime, hash), files of the whole tree(even it's a delta package)
+        :param removed: delta package removed files since base package
+        """
+        kwargs.setdefault('base', '')
+        kwargs.setdefault('files', dict())
+        kwargs.setdefault('removed', list())
+        kwargs.setdefault('version', self.VERSION)
+        kwargs['files'] = {k: TarManifestEntry(*v) for k, v in kwargs['files'].items()}
+        super(TarManifest, self).__init__(**kwargs)
+
+    def __contains__(self, item: str):
+        return item in self.files
+
+    @staticmethod
+    def get_manifest_path(package: str) -> str:
+        return package + TarManifest.EXTENSION
+
+    @classmethod
+    def load(cls, filename: str):
+        try:
+            with open(filename, encoding='utf-8') as fp:
+                return cls(**json.load(fp))
+        except (OSError, ValueError, TypeError, DynamicObjectDecodeError) as e:
+            raise TarManagerError(f'Load manifest {filename!r} error: {e}')
+
+    def save(self, filename: str):
+        try:
+            with open(filename, 'w', encoding='utf-8') as fp:
+                json.dump(self.json, fp, indent=1)
+        except OSError as e:
+            raise TarManagerError(f'Save manifest {filename!r} error: {e}')
+
+    @staticmethod
+    def hash_file(filename: str) -> str:
+        sha256 = hashlib.sha256()
+        with open(filename, 'rb') as fp:
+            for data in iter(lambda: fp.read(TarManifest.HASH_BLOCK_SIZE), b''):
+                sha256.update(data)
+
+        return sha256.hexdigest()
+
+    @classmethod
+    def create(cls, path: str, files: Iterable[str], previous=None, workers: int = 0):
+        """Create manifest of `path`, files are hashed in parallel
+
+        :param path: files root directory
+        :param files: files path relative to `path`
+        :param previous: previous manifest, if file size and modify time is not changed reuse it's hash
+        :param workers: hash threads number, 0 is cpu count
+        :return: manifest
+        """
+        entries = dict()
+        hashing = dict()
+        with concurrent.futures.ThreadPoolExecutor(workers or os.cpu_count() or 1) as executor:
+            for name in files:
+                filename = os.path.join(path, name)
+                stat = os.stat(filename)
+                cached = previous.files.get(name) if isinstance(previous, TarManifest) else None
+                if cached and cached.size == stat.st_size and cached.mtime == stat.st_mtime_ns:
+                    entries[name] = cached
+                else:
+                    entries[name] = (stat.st_size, stat.st_mtime_ns)
+                    hashing[name] = executor.submit(cls.hash_file, filename)
+
+            for name, future in hashing.items():
+                entries[name] = TarManifestEntry(*entries[name], future.result())
+
+        return cls(files=entries)
+
+    def diff(self, previous) -> Tuple[List[str], List[str]]:
+        """Compare with previous manifest
+
+        :param previous: previous manifest
+        :return: changed(added or content changed) files, removed files
+        """
+        changed = [k for k, v in self.files.items() if k not in previous or previous.files[k].hash != v.hash]
+        removed = [k for k in previous.files if k not in self]
+        return changed, removed
+
+    def verify(self, path: str, workers: int = 0) -> List[str]:
+        """Verify files under `path` against manifest in parallel
+
+        :param path: extracted tree path
+        :param workers: hash threads number, 0 is cpu count
+        :return: missing or mismatched files, removed files which still exist
+        """
+        def check(name: str) -> bool:
+            filename = os.path.join(path, name)
+            try:
+                entry = self.files[name]
+                return os.path.getsize(filename) == entry.size and self.hash_file(filename) == entry.hash
+            except OSError:
+                return False
+
+        with concurrent.futures.ThreadPoolExecutor(workers or os.cpu_count() or 1) as executor:
+            failed = [name for name, ok in zip(self.files, executor.map(check, self.files)) if not ok]
+
+        return failed + [name for name in self.removed if os.path.exists(os.path.join(path, name))]
+
+
 class TarManager(object):
     support_formats = set(
         list(TarCompress.support_format.keys()) +
@@ -291,12 +576,42 @@ class TarManager(object):
 
         return compress, compress.open(file_path, TarManager.operateDict.get("read"), fmt)
 
+    @staticmethod
+    def walk(path: str, extensions: Optional[Sequence[str]] = None, filters: Optional[TarManagerFilterCallback] = None,
+             pre_filter: Optional[typing.Callable[[str], bool]] = None,
+             post_filter: Optional[typing.Callable[[str], bool]] = None) -> Iterator[str]:
+        """Walk `path` yield files which should be packed, same rules as `pack`, without changing work dir
+
+        :return: files path relative to `path`, starts with './'
+        """
+        filters = filters if hasattr(filters, "__call__") else None
+        extensions = extensions if isinstance(extensions, (list, tuple)) else list()
+
+        for root, dirs, files in os.walk(path):
+            root = os.path.join('.', os.path.relpath(root, path)) if root != path else '.'
+            if callable(pre_filter) and not pre_filter(root):
+                continue
+
+            for file_name in sorted(files):
+                extension_name = file_name.split(".")[-1]
+                full_path = os.path.join(root, file_name)
+
+                if len(extensions) and extension_name in extensions:
+                    yield full_path
+                elif filters and filters(extension_name):
+                    yield full_path
+                elif callable(post_filter) and post_filter(full_path):
+                    yield full_path
+                elif not len(extensions) and not filters:
+                    yield full_path
+
     @staticmethod
     def pack(path: str, name: str, fmt: Optional[str] = None,
              extensions: Optional[Sequence[str]] = None, filters: Optional[TarManagerFilterCallback] = None,
              verbose: bool = False, simulate: bool = False, callback: Optional[TarManagerCallback] = None,
              pre_filter: Optional[typing.Callable[[str], bool]] = None,
-             post_filter: Optional[typing.Callable[[str], bool]] = None):
+             post_filter: Optional[typing.Callable[[str], bool]] = None,
+             streaming: bool = False, workers: int = 0, incremental: bool = False):
         """Package directory to a tarfile
 
         :param path: directory path
@@ -309,7 +624,20 @@ class TarManager(object):
         :param callback: before pack every file will call this callback function
         :param pre_filter: if this filter set it will first call
         :param post_filter: if this filter set it will last call
+        :param streaming: lz4 only, compress in parallel and write to package directly, do not change work dir
+        :param workers: streaming compress threads number, 0 is cpu count
+        :param incremental: using `incremental_pack`, a manifest is saved next to package
         """
+        fmt = fmt if fmt in TarManager.get_support_format() else TarManager.get_file_format(name)
+        if incremental:
+            files = TarManager.walk(path, extensions, filters, pre_filter, post_filter)
+            TarManager.incremental_pack(path, name, files, fmt, verbose=verbose, simulate=simulate,
+                                        callback=callback, workers=workers)
+            return
+
+        if streaming and fmt in Lz4Compress.support_format:
+            files = TarManager.walk(path, extensions, filters, pre_filter, post_filter)
+            return TarManager.stream_pack(path, name, files, verbose, simulate, callback, workers)
 
         current_path = os.getcwd()
         filters = filters if hasattr(filters, "__call__") else None
@@ -383,9 +711,197 @@ class TarManager(object):
         finally:
             os.chdir(current_path)
 
+    @staticmethod
+    def stream_pack(path: str, name: str, files: Iterable[str], verbose: bool = False, simulate: bool = False,
+                    callback: Optional[TarManagerCallback] = None, workers: int = 0,
+                    block_size: int = Lz4Compress.STREAM_BLOCK_SIZE):
+        """Package files to a lz4 package in streaming mode
+
+        :param path: files root directory
+        :param name: package name
+        :param files: files path relative to `path`, e.g. `TarManager.walk` result
+        :param verbose: show verbose message
+        :param simulate: set simulate means not real pack only run process to get how many files it;s need to pack
+        :param callback: before pack every file will call this callback function
+        :param workers: compress threads number, 0 is cpu count
+        :param block_size: compress block size
+        """
+        if not os.path.isdir(path):
+            raise TarManagerError("Path: {0:s} is not a directory".format(path))
+
+        if verbose:
+            print("{0:s} -> {1:s}".format(os.path.abspath(path), name))
+
+        compress = Lz4Compress(simulate, callback)
+        try:
+            tar_file = compress.open(name, TarManager.operateDict.get("write"), 'lz4')
+            try:
+                compress.stream_pack(tar_file, path, files, workers, block_size)
+            finally:
+                compress.close(tar_file)
+        except OSError as e:
+            raise TarManagerError("Create package error:{}".format(e))
+        except TarCompress.exception as e:
+            raise TarManagerError("Create tar file error:{}".format(e))
+
+    @staticmethod
+    def pack_files(path: str, name: str, files: Iterable[str], fmt: Optional[str] = None,
+                   simulate: bool = False, callback: Optional[TarManagerCallback] = None, workers: int = 0,
+                   reuse: str = '', unchanged: Container[str] = ()) -> str:
+        """Package files to package without changing work dir, lz4 package is packed in streaming mode
+
+        :param path: files root directory
+        :param name: package name
+        :param files: files path relative to `path`, member name is the relative path
+        :param fmt: package format
+        :param simulate: set simulate means not real pack only run process to get how many files it;s need to pack
+        :param callback: before pack every file will call this callback function
+        :param workers: lz4 compress threads number, 0 is cpu count
+        :param reuse: lz4 only, previous package path, `unchanged` files are copied from it without recompress
+        :param unchanged: files which content is not changed since `reuse` is packed
+        :return: package path actually written, zip formats package is renamed to `.zip`
+        """
+        fmt = fmt if fmt in TarManager.get_support_format() else TarManager.get_file_format(name)
+        if fmt in Lz4Compress.support_format:
+            if simulate or not os.path.isfile(reuse):
+                TarManager.stream_pack(path, name, files, False, simulate, callback, workers)
+                return name
+
+            compress = Lz4Compress(simulate, callback)
+            try:
+                with compress.open(reuse, TarManager.operateDict.get("read"), fmt) as previous:
+                    with compress.open(name, TarManager.operateDict.get("write"), fmt) as tar_file:
+                        compress.stream_pack(tar_file, path, files, workers, reuse=previous, unchanged=unchanged)
+                return name
+            except OSError as e:
+                raise TarManagerError("Create package error:{}".format(e))
+            except TarCompress.exception as e:
+                raise TarManagerError("Create tar file error:{}".format(e))
+
+        compress = TarManager.create_compress_object(fmt, simulate, callback)
+        if not isinstance(compress, Compress):
+            raise TarManagerError("Unknown package format: {}".format(os.path.basename(name)))
+
+        try:
+            tar_file = compress.open(name, TarManager.operateDict.get("write"), fmt)
+            try:
+                for arcname in files:
+                    compress.pack(tar_file, os.path.join(path, arcname), arcname)
+            finally:
+                compress.close(tar_file)
+        except OSError as e:
+            raise TarManagerError("Create package error:{}".format(e))
+        except (ZipCompress.exception, TarCompress.exception) as e:
+            raise TarManagerError("Create tar file error:{}".format(e))
+
+        return compress.get_path(name, fmt)
+
+    @staticmethod
+    def incremental_pack(path: str, name: str, files: Iterable[str], fmt: Optional[str] = None,
+                         base: str = '', delta: bool = False, verbose: bool = False, simulate: bool = False,
+                         callback: Optional[TarManagerCallback] = None, workers: int = 0) -> TarManifest:
+        """Incremental package, manifest(file size, modify time and content hash) is saved next to package
+
+        Only changed files since `base` package are hashed(manifest cache), full package: lz4 unchanged files
+        compressed data is copied from base package, other formats are packed again. Delta package: only
+        changed files are packed, removed files are recorded in manifest, see `apply_delta`.
+
+        :param path: directory path
+        :param name: package name
+        :param files: files path relative to `path`, e.g. `TarManager.walk` result
+        :param fmt: package format
+        :param base: base package path(has manifest next to it), default is `name`(previous package)
+        :param delta: create a delta package instead of a full package
+        :param verbose: show verbose message
+        :param simulate: set simulate means not real pack only run process to get how many files it;s need to pack
+        :param callback: before pack every file will call this callback function
+        :param workers: hash and lz4 compress threads number, 0 is cpu count
+        :return: package manifest
+        """
+        if not os.path.isdir(path):
+            raise TarManagerError("Path: {0:s} is not a directory".format(path))
+
+        # Zip formats package is written as `.zip`, manifest is saved next to it
+        fmt = fmt if fmt in TarManager.get_support_format() else TarManager.get_file_format(name)
+        compress = TarManager.create_compress_object(fmt)
+        if not isinstance(compress, Compress):
+            raise TarManagerError("Unknown package format: {}".format(os.path.basename(name)))
+
+        name = compress.get_path(name, fmt)
+        base = base or name
+        base_manifest = TarManifest.get_manifest_path(base)
+        previous = TarManifest.load(base_manifest) if os.path.isfile(base_manifest) else None
+        if delta and previous is None:
+            raise TarManagerError(f'Delta package base manifest {base_manifest!r} is not exist')
+
+        manifest = TarManifest.create(path, list(files), previous, workers)
+        changed, removed = manifest.diff(previous) if previous else (list(manifest.files), list())
+        if verbose:
+            print(f'{os.path.abspath(path)} -> {name}: {len(changed)} changed, {len(removed)} removed')
+
+        if delta:
+            manifest.base = os.path.basename(base)
+            manifest.removed = removed
+
+        # Package may be the base package, write to a temporary package first
+        temp = f'{name}.tmp'
+        unchanged = set(manifest.files) - set(changed)
+        packed = changed if delta else list(manifest.files)
+        try:
+            temp = TarManager.pack_files(path, temp, packed, fmt, simulate, callback, workers,
+                                         reuse=base, unchanged=unchanged)
+            if simulate:
+                return manifest
+
+            os.replace(temp, name)
+        except OSError as e:
+            raise TarManagerError("Replace package error:{}".format(e))
+        finally:
+            # Replaced temporary package is not exist, otherwise packing or replacing failed
+            if os.path.isfile(temp):
+                os.unlink(temp)
+
+        manifest.save(TarManifest.get_manifest_path(name))
+        return manifest
+
+    @staticmethod
+    def apply_delta(file_path: str, unpack_path: str, fmt: Optional[str] = None, streaming: bool = False,
+                    callback: Optional[TarManagerCallback] = None) -> TarManifest:
+        """Unpack delta package to base package unpacked tree, and delete removed files
+
+        :param file_path: delta package path, has manifest next to it
+        :param unpack_path: base package unpacked path
+        :param fmt: package format
+        :param streaming: lz4 only, decompress from package directly without temporary files
+        :param callback: before unpack every file will call this callback function
+        :return: delta package manifest, could be used to verify the tree
+        """
+        manifest = TarManifest.load(TarManifest.get_manifest_path(file_path))
+        TarManager.unpack(file_path, unpack_path, fmt, callback=callback, streaming=streaming)
+        for name in manifest.removed:
+            filename = os.path.join(unpack_path, name)
+            if os.path.isfile(filename):
+                os.unlink(filename)
+
+        return manifest
+
+    @staticmethod
+    def verify(path: str, manifest: Union[str, TarManifest], workers: int = 0) -> List[str]:
+        """Verify unpacked tree against package manifest
+
+        :param path: unpacked tree path
+        :param manifest: manifest or package path(manifest is next to it)
+        :param workers: hash threads number, 0 is cpu count
+        :return: missing or mismatched files
+        """
+        if not isinstance(manifest, TarManifest):
+            manifest = TarManifest.load(TarManifest.get_manifest_path(manifest))
+
+        return manifest.verify(path, workers)
+
     @staticmethod
     def unpack(file_path: str, unpack_path: str = "", fmt: Optional[str] = None,
-               simulate: bool = False, callback: Optional[TarManagerCallback] = None):
+               simulate: bool = False, callback: Optional[TarManagerCallback] = None, streaming: bool = False):
         """Unpack file_path specified file to unpack_path
 
         :return:
@@ -394,6 +910,7 @@ class TarManager(object):
         :param fmt: package format
         :param simulate: set simulate means not real unpack only run process to get how many files it;s need to unpack
         :param callback: before unpack every file will call this callback function
+        :param streaming: lz4 only, decompress from package directly without temporary files
         """
         try:
             # Check unpack directory
@@ -405,8 +922,11 @@ class TarManager(object):
 
             # Open as tarfile and extractall and close finally
             compress, tar_file = TarManager.check_and_open_compress_object(file_path, fmt, simulate, callback)
-            for member in compress.get_members(tar_file):
-                compress.extract(tar_file, member, unpack_path)
+            if streaming and isinstance(compress, Lz4Compress):
+                compress.stream_extractall(tar_file, unpack_path)
+            else:
+                for member in compress.get_members(tar_file):
+                    compress.extract(tar_file, member, unpack_path)
             compress.close(tar_file)
         except (IOError, OSError, ZipCompress.exception, TarCompress.exception, shutil.Error) as e:
             raise TarManagerError('Extract failed：IOError, {}'.format(e))
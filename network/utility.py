@@ -21,7 +21,7 @@ __all__ = ['get_system_nic', 'get_address_source_network', 'get_default_network'
            'set_keepalive', 'enable_broadcast', 'set_linger_option',
            'enable_multicast', 'join_multicast', 'leave_multicast',
            'create_socket_and_connect', 'wait_device_reboot',
-           'tcp_socket_send_data', 'tcp_socket_recv_data', 'tcp_t_section',
+           'tcp_socket_send_data', 'tcp_socket_recv_data', 'tcp_socket_recv_into', 'tcp_t_section',
            'SocketSingleInstanceLock', 'NicInfo']
 
 
@@ -270,58 +270,96 @@ def scan_lan_alive(network: Union[ipaddress.IPv4Network, str] = "",
 def tcp_socket_send_data(tcp_socket: socket.socket, data: bytes, header: str = '') -> List[int]:
     """Send data to peer
 
+    Header and data are sent by scatter-gather(sendmsg) without concatenating, if not supported fallback to send
+
     :param tcp_socket: tcp socket to send data
     :param data: data to send
     :param header: send data with length header
     :return: send data length list
     """
-    total_send = 0
     send_length = list()
-    data = struct.pack(header, len(data)) + data if header else data
+    buffers = [memoryview(x) for x in ((struct.pack(header, len(data)), data) if header else (data,)) if len(x)]
+
+    if not hasattr(tcp_socket, 'sendmsg'):
+        buffers = [memoryview(b''.join(buffers))] if buffers else buffers
 
-    while total_send < len(data):
-        send = tcp_socket.send(data[total_send:])
+    while buffers:
+        send = tcp_socket.sendmsg(buffers) if hasattr(tcp_socket, 'sendmsg') else tcp_socket.send(buffers[0])
         if send == 0:
             raise ConnectionError('peer closed')
 
-        total_send += send
         send_length.append(send)
 
+        # Drop sent buffers, partial sent buffer is sliced without copy
+        while buffers and send >= len(buffers[0]):
+            send -= len(buffers.pop(0))
+
+        if send:
+            buffers[0] = buffers[0][send:]
+
     return send_length
 
 
-def tcp_socket_recv_data(tcp_socket: socket.socket, length: int, header: str = '') -> bytes:
+def tcp_socket_recv_into(tcp_socket: socket.socket, buffer: memoryview) -> int:
+    """Receive data into buffer until buffer is filled or timeout, peer closed raise BrokenPipeError
+
+    :param tcp_socket: tcp socket to receive data
+    :param buffer: buffer to fill
+    :return: receive data length
+    """
+    received = 0
+    while received < len(buffer):
+        try:
+            size = tcp_socket.recv_into(buffer[received:])
+        except socket.timeout:
+            break
+
+        if not size:
+            raise BrokenPipeError('peer closed')
+
+        received += size
+
+    return received
+
+
+def tcp_socket_recv_data(tcp_socket: socket.socket, length: int,
+                         header: str = '', zero_copy: bool = False) -> Union[bytes, memoryview]:
     """Receive #length specified bytes data until to timeout or peer closed (raise BrokenPipeError)
 
+    Data is received into a preallocated buffer of the announced length
+
     :param tcp_socket: tcp socket to receive data
     :param length: expect receive data length
     :param header: receive data with length header
+    :param zero_copy: return a memoryview of the receive buffer instead of bytes
     :return: receive data
     """
-    recv_data = bytes()
-
     # Specified header fmt or length is zero means read length from header
     if header:
+        header_data = bytearray(struct.calcsize(header))
+        view = memoryview(header_data)
+
         try:
-            length = struct.unpack(header, tcp_socket.recv(struct.calcsize(header)))[0]
-        except (struct.error, IndexError) as e:
+            received = tcp_socket.recv_into(view)
+            if received:
+                # Short read, receive the remaining header
+                received += tcp_socket_recv_into(tcp_socket, view[received:])
+
+            length = struct.unpack(header, header_data[:received])[0]
+        except (struct.error, BrokenPipeError) as e:
             print(f'tcp_socket_recv_data: {e}(header: {header}, len: {length})')
             return bytes()
 
-    while len(recv_data) < length:
-        try:
-            data = tcp_socket.recv(length - len(recv_data))
-        except socket.timeout:
-            return recv_data
-        except (MemoryError, OverflowError):
-            return recv_data
-
-        if not data:
-            raise BrokenPipeError('peer closed')
+    try:
+        buffer = memoryview(bytearray(length))
+    except (MemoryError, OverflowError, ValueError):
+        return bytes()
 
-        recv_data += data
+    received = tcp_socket_recv_into(tcp_socket, buffer)
+    if zero_copy:
+        return buffer[:received]
 
-    return recv_data
+    return buffer[:received].tobytes()
 
 
 def create_socket_and_connect(address: str, port: int, timeout: Union[float, None] = None,
@@ -0,0 +1,415 @@
+# -*- coding: utf-8 -*-
+import abc
+import socket
+import struct
+import typing
+import asyncio
+import collections
+import concurrent.futures
+from typing import Callable, Awaitable, Optional
+
+from .framer import LengthPrefixFramer
+from ..network.utility import set_keepalive
+from .transmit import Transmit, TransmitWarning, TransmitException
+__all__ = ['AsyncTransmit', 'AsyncLengthPrefixFramer',
+           'AsyncTCPSocketTransmit', 'AsyncTCPClientTransmit', 'AsyncTCPServer', 'AsyncTransmitAdapter']
+
+
+class AsyncLengthPrefixFramer(object):
+    READ_CHUNK_SIZE = 4096
+
+    def __init__(self, length_fmt: str, max_size: int = LengthPrefixFramer.DEFAULT_MAX_SIZE):
+        """Length prefixed frame reader for asyncio stream, header is `length_fmt` packed payload length
+
+        Stream is read by chunk, one read may get several frames, extra frames are kept for next `read`
+        :param length_fmt: msg header length struct pack format
+        :param max_size: max payload size
+        """
+        self.__frames = collections.deque()
+        self.__framer = LengthPrefixFramer(length_fmt, max_size)
+
+    def reset(self):
+        self.__frames.clear()
+        self.__framer.reset()
+
+    async def read(self, reader: asyncio.StreamReader) -> Optional[bytes]:
+        """Read a frame, return None if peer closed"""
+        while not self.__frames:
+            data = await reader.read(self.READ_CHUNK_SIZE)
+            if not data:
+                return None
+
+            self.__frames.extend(self.__framer.feed(data))
+
+        return self.__frames.popleft()
+
+
+class AsyncTransmit(abc.ABC):
+    DEFAULT_TIMEOUT = 0.1
+    Address = Transmit.Address
+
+    def __init__(self):
+        self._timeout = 0.0
+        self._address = ('', 0)
+        self._connected = False
+
+    def __repr__(self):
+        return str(
+            dict(name=type(self).__name__, address=self._address, timeout=self._timeout, connected=self._connected)
+        )
+
+    @property
+    def timeout(self) -> float:
+        return self._timeout
+
+    @property
+    def address(self) -> Address:
+        return self._address
+
+    @property
+    def connected(self) -> bool:
+        return self._connected
+
+    def set_timeout(self, timeout: float):
+        self._timeout = timeout
+
+    @abc.abstractmethod
+    async def tx(self, data: bytes) -> bool:
+        pass
+
+    @abc.abstractmethod
+    async def rx(self, size: int, timeout: float = 0.0) -> bytes:
+        pass
+
+    @abc.abstractmethod
+    async def flush(self):
+        pass
+
+    @abc.abstractmethod
+    async def disconnect(self):
+        pass
+
+    @abc.abstractmethod
+    async def connect(self, address: Address, timeout: float) -> bool:
+        pass
+
+    def _update(self, address: Address, timeout: float, connected: bool = False) -> bool:
+        self._address = address
+        self._timeout = timeout
+        self._connected = connected
+        return self._connected
+
+
+class AsyncTCPSocketTransmit(AsyncTransmit):
+    def __init__(self, reader: Optional[asyncio.StreamReader] = None, writer: Optional[asyncio.StreamWriter] = None,
+                 address: AsyncTransmit.Address = ('', -1), length_fmt: str = '',
+                 disconnect_callback: Optional[Callable] = None):
+        """
+        AsyncTCPSocketTransmit, asyncio version of TCPSocketTransmit
+        :param reader: stream reader
+        :param writer: stream writer
+        :param address: self address
+        :param length_fmt: msg header length struct pack format
+        :param disconnect_callback: disconnect callback
+        """
+        super(AsyncTCPSocketTransmit, self).__init__()
+        self._reader = reader
+        self._writer = writer
+        self._address = address
+        self._length_fmt = length_fmt
+        self._disconnect_callback = disconnect_callback
+        self._framer = AsyncLengthPrefixFramer(length_fmt) if length_fmt else None
+
+    def attach(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        if self._framer is not None:
+            self._framer.reset()
+
+    @property
+    def raw_socket(self) -> Optional[socket.socket]:
+        return self._writer.get_extra_info('socket') if self._writer is not None else None
+
+    async def tx(self, data: bytes) -> bool:
+        try:
+            msg = struct.pack(self._length_fmt, len(data)) + data if self._length_fmt else data
+            self._writer.write(msg)
+            await asyncio.wait_for(self._writer.drain(), self._timeout or None)
+            return True
+        except asyncio.TimeoutError:
+            raise TransmitWarning('tx timeout')
+        except (struct.error, AttributeError, OSError) as err:
+            raise TransmitException(err)
+
+    async def rx(self, size: int, timeout: float = 0.0) -> bytes:
+        timeout = timeout or self.timeout or None
+
+        try:
+            if self._framer is not None:
+                data = await asyncio.wait_for(self._framer.read(self._reader), timeout)
+                # Peer closed
+                if data is None:
+                    await self.disconnect()
+                    return bytes()
+
+                return data
+
+            # Read payload data, return received data if timeout, nothing received is rx timeout
+            data = bytearray()
+            loop = asyncio.get_running_loop()
+            deadline = loop.time() + timeout if timeout else None
+            while len(data) < size:
+                try:
+                    chunk = await asyncio.wait_for(
+                        self._reader.read(size - len(data)), deadline - loop.time() if deadline else None
+                    )
+                except asyncio.TimeoutError:
+                    if not data:
+                        raise
+                    break
+
+                # Peer closed
+                if not chunk:
+                    await self.disconnect()
+                    break
+
+                data += chunk
+
+            return bytes(data)
+        except asyncio.TimeoutError:
+            raise TransmitWarning('rx timeout')
+        except (AttributeError, MemoryError, OSError) as err:
+            raise TransmitException(err)
+
+    async def flush(self):
+        try:
+            while True:
+                if not await asyncio.wait_for(self._reader.read(1500), self.timeout or self.DEFAULT_TIMEOUT):
+                    break
+        except asyncio.TimeoutError:
+            pass
+        except (AttributeError, OSError) as e:
+            print(f'{e}')
+
+        if self._framer is not None:
+            self._framer.reset()
+
+    async def disconnect(self):
+        if callable(self._disconnect_callback):
+            self._disconnect_callback()
+
+        self._connected = False
+        if self._writer is None or self._writer.is_closing():
+            return
+
+        try:
+            self._writer.close()
+            await self._writer.wait_closed()
+        except OSError:
+            pass
+
+    async def connect(self, address: AsyncTransmit.Address, timeout: float) -> bool:
+        return self._update(address, timeout, True)
+
+
+class AsyncTCPClientTransmit(AsyncTransmit):
+    DEFAULT_TIMEOUT = 0.1
+
+    def __init__(self, length_fmt: str = ''):
+        super(AsyncTCPClientTransmit, self).__init__()
+        self._server_address = ('', -1)
+        self._socket = AsyncTCPSocketTransmit(length_fmt=length_fmt)
+
+    async def flush(self):
+        await self._socket.flush()
+
+    async def tx(self, data: bytes) -> bool:
+        return await self._socket.tx(data)
+
+    async def rx(self, size: int, timeout: float = 0) -> bytes:
+        return await self._socket.rx(size, timeout)
+
+    async def disconnect(self):
+        self._connected = False
+        await self._socket.disconnect()
+
+    @property
+    def server(self) -> AsyncTransmit.Address:
+        return self._server_address
+
+    @property
+    def timeout(self) -> float:
+        return self._socket.timeout
+
+    def set_timeout(self, timeout: float):
+        self._socket.set_timeout(timeout)
+
+    async def connect(self, address: AsyncTransmit.Address, timeout: float = DEFAULT_TIMEOUT) -> bool:
+        """
+        Connect tcp server
+        :param address: (host, port)
+        :param timeout: socket timeout in seconds
+        :return:
+        """
+        try:
+            self._server_address = address
+            timeout = timeout or self.DEFAULT_TIMEOUT
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(address[0], address[1]), timeout)
+            self._socket.attach(reader, writer)
+            await self._socket.connect(writer.get_extra_info('sockname'), timeout)
+            return self._update(writer.get_extra_info('sockname'), timeout, True)
+        except (asyncio.TimeoutError, OSError) as err:
+            raise TransmitException(err)
+
+
+class AsyncTCPServer(object):
+    def __init__(self, new_connection_callback: Callable[..., Awaitable[None]],
+                 length_fmt: str = '', timeout: float = 0.0, verbose: bool = False):
+        """
+        AsyncTCPServer, asyncio version of TCPServerTransmitHandle, all connections are served in one event loop
+        :param new_connection_callback: coroutine function called with AsyncTCPSocketTransmit and custom kwargs
+        :param length_fmt: msg header length struct pack format
+        :param timeout: connection transmit timeout
+        :param verbose: print verbose message
+        """
+        self._server = None
+        self._handles = set()
+        self._timeout = timeout
+        self._verbose = verbose
+        self._length_fmt = length_fmt
+        self._new_connection_callback = new_connection_callback
+
+    @property
+    def address(self) -> AsyncTransmit.Address:
+        return self._server.sockets[0].getsockname()[:2] if self._server else ('', -1)
+
+    def is_running(self) -> bool:
+        return self._server is not None and self._server.is_serving()
+
+    def print_debug_msg(self, msg: str, force: bool = False):
+        if self._verbose or force:
+            print(f'{self.__class__.__name__}: {msg}')
+
+    async def start(self, address: AsyncTransmit.Address, backlog: int = 100, kwargs: dict = None):
+        async def accept_handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+            client_address = writer.get_extra_info('peername')
+            self.print_debug_msg(f'New connection: {client_address}')
+
+            # Set keepalive to detect client lost connection
+            set_keepalive(writer.get_extra_info('socket'), after_idle_sec=1, interval_sec=1, max_fails=3)
+
+            transmit = AsyncTCPSocketTransmit(reader, writer, client_address, length_fmt=self._length_fmt)
+            await transmit.connect(client_address, self._timeout)
+
+            handle = asyncio.current_task()
+            self._handles.add(handle)
+            try:
+                await self._new_connection_callback(transmit, **(kwargs or dict()))
+            except asyncio.CancelledError:
+                self.print_debug_msg(f'Connection cancelled: {client_address}')
+            finally:
+                self._handles.discard(handle)
+                await transmit.disconnect()
+
+        try:
+            self._server = await asyncio.start_server(accept_handle, address[0], address[1], backlog=backlog)
+        except OSError as e:
+            raise TransmitException(f'{self.__class__.__name__}.start error: {e}')
+
+    async def stop(self):
+        if self._server is None:
+            return
+
+        self._server.close()
+        await self._server.wait_closed()
+
+        # Cancel connections still in serving
+        for handle in self._handles:
+            handle.cancel()
+
+        await asyncio.gather(*self._handles, return_exceptions=True)
+        self.print_debug_msg('Sopped, exit')
+
+    async def wait_stop(self):
+        if self._server is not None:
+            await self._server.wait_closed()
+
+
+class AsyncTransmitAdapter(Transmit):
+    def __init__(self, transmit: AsyncTransmit, loop: asyncio.AbstractEventLoop):
+        """Blocking `Transmit` interface of an `AsyncTransmit` which runs on `loop`
+
+        Used by `CommunicationController`, if transmit is an adapter, controller communicates with
+        device in `loop` instead of a thread, blocking methods must not be called inside `loop`
+        :param transmit: async transmit
+        :param loop: event loop which is running in another thread
+        """
+        if not isinstance(transmit, AsyncTransmit):
+            raise TypeError(f"'transmit' must be a instance of {AsyncTransmit.__name__}")
+
+        self.__loop = loop
+        self.__transmit = transmit
+        super(AsyncTransmitAdapter, self).__init__()
+
+    def __repr__(self):
+        return repr(self.__transmit)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self.__loop
+
+    @property
+    def transmit(self) -> AsyncTransmit:
+        return self.__transmit
+
+    @property
+    def timeout(self) -> float:
+        return self.__transmit.timeout
+
+    @property
+    def address(self) -> Transmit.Address:
+        return self.__transmit.address
+
+    @property
+    def connected(self) -> bool:
+        return self.__transmit.connected
+
+    def __in_loop(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is self.__loop
+        except RuntimeError:
+            return False
+
+    def __run(self, coro: typing.Coroutine) -> typing.Any:
+        if self.__in_loop():
+            coro.close()
+            raise TransmitException('blocking transmit call inside event loop')
+
+        try:
+            return asyncio.run_coroutine_threadsafe(coro, self.__loop).result()
+        except concurrent.futures.CancelledError as err:
+            raise TransmitException(err)
+
+    def tx(self, data: bytes) -> bool:
+        return self.__run(self.__transmit.tx(data))
+
+    def rx(self, size: int, timeout: float = 0.0) -> bytes:
+        return self.__run(self.__transmit.rx(size, timeout))
+
+    def flush(self):
+        self.__run(self.__transmit.flush())
+
+    def disconnect(self):
+        if self.__loop.is_closed() or not self.__loop.is_running():
+            return
+
+        if self.__in_loop():
+            self.__loop.create_task(self.__transmit.disconnect())
+        else:
+            self.__run(self.__transmit.disconnect())
+
+    def set_timeout(self, timeout: float):
+        self.__transmit.set_timeout(timeout)
+
+    def connect(self, address: Transmit.Address, timeout: float) -> bool:
+        return self.__run(self.__transmit.connect(address, timeout))
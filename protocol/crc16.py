@@ -1,6 +1,14 @@
 # -*- coding: utf-8 -*-
-from typing import Sequence
-__all__ = ['crc16', 'crc16IBM']
+from typing import Sequence, Optional
+
+try:
+    from crcmod.predefined import mkPredefinedCrcFun
+    from crcmod.crcmod import _usingExtension as crcmod_c_extension
+except ImportError:
+    mkPredefinedCrcFun = None
+    crcmod_c_extension = False
+
+__all__ = ['crc16', 'crc16IBM', 'crc16_fast', 'crc16IBM_fast', 'CRC16']
 
 
 __CRC_TABLE_HI = [
@@ -137,3 +145,131 @@ def crc16IBM(data: Sequence[int]) -> int:
             byte = byte >> 1
 
     return crc
+
+
+def _crc16_update_py(crc: int, data: Sequence[int]) -> int:
+    """Table driven crc16 update, modbus and IBM(ARC) crc16 share the same polynomial(reflected 0xA001)"""
+    crc_hi = crc >> 8
+    crc_low = crc & 0xff
+    table_hi = __CRC_TABLE_HI
+    table_low = __CRC_TABLE_LOW
+
+    for byte in data:
+        index = crc_low ^ byte
+        crc_low = crc_hi ^ table_hi[index]
+        crc_hi = table_low[index]
+
+    return (crc_hi << 8 | crc_low) & 0xffff
+
+
+# Alias for class scope, module level double underscore names will be mangled in class
+_CRC16_TABLE_HI = __CRC_TABLE_HI
+_CRC16_TABLE_LOW = __CRC_TABLE_LOW
+
+# C-backed crc16 update function(data, crc) if crcmod extension is available
+_crc16_update_c = mkPredefinedCrcFun('modbus') if crcmod_c_extension else None
+
+
+def _crc16_check_type(data) -> Sequence[int]:
+    if isinstance(data, (bytes, bytearray)):
+        return data
+
+    if isinstance(data, (str, int)):
+        raise TypeError(f'crc16 require bytes-like object or sequence of int not {type(data).__name__!r}')
+
+    try:
+        return memoryview(data).cast('B')
+    except TypeError:
+        return bytes(data)
+
+
+def _crc16_update(crc: int, data: Sequence[int]) -> int:
+    data = _crc16_check_type(data)
+    if _crc16_update_c is not None:
+        return _crc16_update_c(data, crc)
+
+    return _crc16_update_py(crc, data)
+
+
+def crc16_fast(data: Sequence[int]) -> int:
+    """Calculate data crc16(modbus), result is same as `crc16`
+
+    Using crcmod C extension if available, otherwise using table driven pure python implementation
+    :param data: bytes-like object or sequence of int
+    :return: data crc16
+    """
+    return _crc16_update(CRC16.MODBUS, data)
+
+
+# noinspection PyPep8Naming
+def crc16IBM_fast(data: Sequence[int]) -> int:
+    """Calculate data crc16(IBM), result is same as `crc16IBM`, table driven instead of bit by bit
+
+    :param data: bytes-like object or sequence of int
+    :return: data crc16
+    """
+    return _crc16_update(CRC16.IBM, data)
+
+
+class CRC16(object):
+    MODBUS = 0xffff
+    IBM = 0x0000
+
+    def __init__(self, data: Optional[Sequence[int]] = None, init: int = MODBUS):
+        """Incremental crc16 calculator
+
+        Modbus frame with crc appended, crc of the whole frame is zero, so a receiver could
+        update it with each received chunk, and check if `value` is zero instead of calculate the whole frame again
+
+        :param data: initial data
+        :param init: crc initial value, CRC16.MODBUS or CRC16.IBM
+        """
+        self.__init = init & 0xffff
+        self.__crc = self.__init
+        if data:
+            self.update(data)
+
+    def __repr__(self):
+        return f'{type(self).__name__}(0x{self.__crc:04x})'
+
+    @property
+    def value(self) -> int:
+        return self.__crc
+
+    def update(self, data: Sequence[int]) -> 'CRC16':
+        self.__crc = _crc16_update(self.__crc, data)
+        return self
+
+    def reset(self):
+        self.__crc = self.__init
+
+    def copy(self) -> 'CRC16':
+        crc = CRC16(init=self.__init)
+        crc.__crc = self.__crc
+        return crc
+
+    def find_zero(self, data: Sequence[int]) -> int:
+        """Update crc byte by byte until crc is zero
+
+        :param data: data to update
+        :return: consumed data length when crc is zero, -1 if not found(all data is consumed)
+        """
+        crc_hi = self.__crc >> 8
+        crc_low = self.__crc & 0xff
+        table_hi = _CRC16_TABLE_HI
+        table_low = _CRC16_TABLE_LOW
+
+        for length, byte in enumerate(data, 1):
+            index = crc_low ^ byte
+            crc_low = crc_hi ^ table_hi[index]
+            crc_hi = table_low[index]
+            if not crc_hi and not crc_low:
+                self.__crc = 0
+                return length
+
+        self.__crc = crc_hi << 8 | crc_low
+        return -1
+
+    def digest(self) -> bytes:
+        """Crc in transmit order(low byte first)"""
+        return self.__crc.to_bytes(2, 'little')
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*-
+import abc
+import struct
+from typing import List, Optional, Callable, Tuple
+from .crc16 import CRC16
+__all__ = ['Framer', 'LengthPrefixFramer', 'CRC16Framer', 'VarintLengthFramer', 'MBAPFramer']
+
+
+class Framer(abc.ABC):
+    DEFAULT_MAX_SIZE = 65536
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        """Streaming framer, consumes bytes incrementally and emits complete frames
+
+        Received bytes are appended to a buffer, complete frames are cut from the buffer head,
+        leftover bytes are kept for the next frame, buffer is compacted once per `feed`
+
+        :param max_size: max pending bytes, if exceeded pending bytes are dropped to resync
+        """
+        self._offset = 0
+        self._dropped = 0
+        self._max_size = max_size
+        self._buffer = bytearray()
+
+    def __len__(self):
+        return len(self._buffer) - self._offset
+
+    def __repr__(self):
+        return f'{type(self).__name__}(pending: {len(self)}, dropped: {self._dropped})'
+
+    @property
+    def dropped(self) -> int:
+        """Dropped bytes count"""
+        return self._dropped
+
+    def pending(self) -> bytes:
+        """Bytes received but not form a complete frame yet"""
+        return bytes(self._buffer[self._offset:])
+
+    def drop(self):
+        """Drop pending bytes, e.g. receive timeout with a incomplete frame"""
+        self._dropped += len(self)
+        self.reset()
+
+    def reset(self):
+        self._offset = 0
+        self._buffer.clear()
+
+    def feed(self, data: bytes) -> List[bytes]:
+        """Feed received bytes
+
+        :param data: received bytes
+        :return: complete frames
+        """
+        frames = list()
+        self._buffer += data
+
+        while True:
+            frame = self._extract()
+            if frame is None:
+                break
+
+            frames.append(frame)
+
+        # Compact, only leftover bytes are moved
+        if self._offset:
+            del self._buffer[:self._offset]
+            self._offset = 0
+
+        if len(self) > self._max_size:
+            self.drop()
+
+        return frames
+
+    def _consume(self, size: int) -> bytes:
+        frame = bytes(self._buffer[self._offset:self._offset + size])
+        self._offset += size
+        return frame
+
+    def _discard(self, size: int):
+        self._dropped += size
+        self._offset += size
+
+    @abc.abstractmethod
+    def _extract(self) -> Optional[bytes]:
+        """Extract a frame from buffer head(from self._offset), return None if frame is not complete"""
+        pass
+
+
+class LengthPrefixFramer(Framer):
+    def __init__(self, length_fmt: str, max_size: int = Framer.DEFAULT_MAX_SIZE):
+        """Length prefixed framer, header is `length_fmt` packed payload length, emitted frame without header
+
+        :param length_fmt: msg header length struct pack format
+        :param max_size: max payload size
+        """
+        super(LengthPrefixFramer, self).__init__(max_size)
+        self._length_fmt = length_fmt
+        self._header_size = struct.calcsize(length_fmt)
+
+    def _extract(self) -> Optional[bytes]:
+        if len(self) < self._header_size:
+            return None
+
+        size = struct.unpack_from(self._length_fmt, self._buffer, self._offset)[0]
+        if size > self._max_size:
+            self._discard(len(self))
+            return None
+
+        if len(self) < self._header_size + size:
+            return None
+
+        self._offset += self._header_size
+        return self._consume(size)
+
+
+class CRC16Framer(Framer):
+    def __init__(self, min_size: int = 4, init: int = CRC16.MODBUS,
+                 check: Optional[Callable[[bytes], bool]] = None, max_size: int = 256):
+        """Crc16 terminated framer(modbus rtu), frame is complete when crc of the frame(with crc appended) is zero
+
+        Crc is updated only with new received bytes, instead of calculate the whole buffer again
+        :param min_size: min frame size(crc included)
+        :param init: crc initial value
+        :param check: optional frame check, if check failed will keep receiving
+        :param max_size: max frame size
+        """
+        super(CRC16Framer, self).__init__(max_size)
+        self._check = check
+        self._scanned = 0
+        self._min_size = min_size
+        self._crc = CRC16(init=init)
+
+    def reset(self):
+        super(CRC16Framer, self).reset()
+        self._scanned = 0
+        self._crc.reset()
+
+    def _extract(self) -> Optional[bytes]:
+        while self._scanned < len(self):
+            start = self._offset + self._scanned
+            length = self._crc.find_zero(self._buffer[start:])
+            if length < 0:
+                self._scanned = len(self)
+                return None
+
+            self._scanned += length
+            if self._scanned < self._min_size:
+                continue
+
+            frame = bytes(self._buffer[self._offset:self._offset + self._scanned])
+            if callable(self._check) and not self._check(frame):
+                continue
+
+            self._offset += self._scanned
+            self._scanned = 0
+            self._crc.reset()
+            return frame
+
+        return None
+
+
+class VarintLengthFramer(Framer):
+    MAX_VARINT_SIZE = 10
+
+    def _extract(self) -> Optional[bytes]:
+        """Protobuf delimited message, header is payload length encoded as base 128 varint"""
+        size = 0
+        for index in range(min(len(self), self.MAX_VARINT_SIZE)):
+            byte = self._buffer[self._offset + index]
+            size |= (byte & 0x7f) << (7 * index)
+            if byte & 0x80:
+                continue
+
+            if size > self._max_size:
+                self._discard(len(self))
+                return None
+
+            if len(self) < index + 1 + size:
+                return None
+
+            self._offset += index + 1
+            return self._consume(size)
+
+        # Invalid varint, too long
+        if len(self) >= self.MAX_VARINT_SIZE:
+            self._discard(len(self))
+
+        return None
+
+    @staticmethod
+    def encode(data: bytes) -> bytes:
+        """Encode data as protobuf delimited message"""
+        size = len(data)
+        header = bytearray()
+        while True:
+            byte = size & 0x7f
+            size >>= 7
+            if size:
+                header.append(byte | 0x80)
+            else:
+                header.append(byte)
+                return bytes(header) + data
+
+
+class MBAPFramer(Framer):
+    HEADER_FMT = '>3HB'
+    LENGTH_OFFSET = 4
+    MAX_ADU_SIZE = 260
+    HEADER_SIZE = struct.calcsize(HEADER_FMT)
+
+    def __init__(self, max_size: int = MAX_ADU_SIZE):
+        """Modbus TCP framer, header(MBAP) is transaction id, protocol id, length and unit id, emitted frame with header
+
+        Length is the byte count of unit id and pdu, it's at offset 4 of the header
+        :param max_size: max frame size
+        """
+        super(MBAPFramer, self).__init__(max_size)
+
+    def _extract(self) -> Optional[bytes]:
+        if len(self) < self.LENGTH_OFFSET + 2:
+            return None
+
+        size = struct.unpack_from('>H', self._buffer, self._offset + self.LENGTH_OFFSET)[0]
+        if not 2 <= size <= self._max_size - self.LENGTH_OFFSET - 2:
+            self._discard(len(self))
+            return None
+
+        if len(self) < self.LENGTH_OFFSET + 2 + size:
+            return None
+
+        return self._consume(self.LENGTH_OFFSET + 2 + size)
+
+    @staticmethod
+    def encode(tid: int, unit: int, pdu: bytes) -> bytes:
+        """Encode pdu as modbus tcp frame"""
+        return struct.pack(MBAPFramer.HEADER_FMT, tid, 0, len(pdu) + 1, unit) + pdu
+
+    @staticmethod
+    def decode(frame: bytes) -> Tuple[int, int, bytes]:
+        """Decode modbus tcp frame to transaction id, unit id and pdu"""
+        tid, _, _, unit = struct.unpack_from(MBAPFramer.HEADER_FMT, frame)
+        return tid, unit, frame[MBAPFramer.HEADER_SIZE:]
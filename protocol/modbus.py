@@ -2,24 +2,29 @@
 import time
 import ping3
 import queue
+import bisect
 import struct
+import asyncio
 import typing
+import itertools
 import threading
 import collections
 import pyModbusTCP.client as modbus_client
 
-from .crc16 import crc16
+from .crc16 import crc16_fast
+from .framer import CRC16Framer, MBAPFramer
 from ..core.timer import Task, Tasklet
 from .template import CommunicationEvent, CommunicationSection
-from ..core.threading import ThreadSafeBool, ThreadLockAndDataWrap
+from ..core.threading import ThreadSafeBool
 from .transmit import UARTTransmit, TransmitWarning, TransmitException
 from ..core.datatype import DynamicObject, CustomEvent, enum_property, str2number
 __all__ = ['FuncCode', 'ExceptionCode', 'DataTypeFuncCode',
-           'Region', 'Address', 'Table',
+           'Region', 'RegionIndex', 'Address', 'Table',
            'WriteRequest', 'ReadRequest', 'ReadResponse',
-           'WatchEventRequest', 'WatchEventResponse',
+           'WatchEventRequest', 'WatchEventResponse', 'WatchEventRegistry',
            'DataType', 'DataFormat', 'DataPresent', 'DataConvert',
            'ModbusServer', 'ModbusTCPClientEvent', 'ModbusTCPClient', 'helper_is_contains_address',
+           'ModbusException', 'ModbusTCPDevice', 'ModbusDeviceHealth', 'ModbusDeviceStatistic', 'ModbusTCPPoller',
            'helper_data2bits', 'helper_bits2data', 'helper_get_bytesize', 'helper_get_func_code']
 
 FuncCode = collections.namedtuple(
@@ -50,15 +55,21 @@ ReadRequest = collections.namedtuple('ReadRequest', 'start count event')
 # Read response: read request, response data
 ReadResponse = collections.namedtuple('ReadResponse', 'request data')
 
+# Modbus tcp device health: online, degraded(error rate or response time is high), offline
+ModbusDeviceHealth = collections.namedtuple('ModbusDeviceHealth', 'Online Degraded Offline')(
+    *'online degraded offline'.split()
+)
+
 # Read data watch: name, type, read request
 WatchEventResponse = collections.namedtuple('ReadDataWatchResponse', 'name type address data event')
 
 
 class Table(DynamicObject):
-    _properties = {'name', 'type', 'endian', 'auto_flush', 'base_reg', 'address_list'}
+    _properties = {'name', 'type', 'endian', 'auto_flush', 'base_reg', 'address_list', 'read_gap'}
 
     def __init__(self, **kwargs):
         kwargs.setdefault('endian', '>>')
+        kwargs.setdefault('read_gap', 0)
         kwargs.setdefault('auto_flush', 0)
         kwargs.setdefault('base_reg', None)
         kwargs.setdefault('address_list', collections.OrderedDict())
@@ -127,6 +138,38 @@ class Region(DynamicObject):
         callable(self.callback) and self.callback(self, address, data)
         return True
 
+    def get_range(self, start: int, count: int) -> typing.List[int]:
+        """Get `count` continuous address values, lock is acquired once
+
+        :param start: start address
+        :param count: address count
+        :return: values, raise KeyError if any address is not in region
+        """
+        with self.__lock:
+            return [self.getter(self.list[address]) for address in range(start, start + count)]
+
+    def set_range(self, start: int, values: typing.Sequence[int]):
+        """Set continuous address values, lock is acquired once, callback is called for each address
+
+        :param start: start address
+        :param values: values to set, raise KeyError if any address is not in region(nothing is set)
+        """
+        addresses = range(start, start + len(values))
+        missing = [address for address in addresses if address not in self.list]
+        if missing:
+            raise KeyError(missing[0])
+
+        with self.__lock:
+            data = [self.setter(value) for value in values]
+            self.list.update(zip(addresses, data))
+
+        if self.type == DataType.Coil:
+            data = [self.is_on(x) for x in data]
+
+        if callable(self.callback):
+            for address, value in zip(addresses, data):
+                self.callback(self, address, value)
+
     @classmethod
     def create_regs(cls, **kwargs):
         kwargs.setdefault('type', DataType.Register)
@@ -146,6 +189,75 @@ class Region(DynamicObject):
         return state == Region.CoilState.OFF
 
 
+class RegionIndex(object):
+    def __init__(self, regions: typing.Sequence[Region] = ()):
+        """Sorted interval table of regions addresses, resolve a address range to continuous region slices
+
+        Each region addresses are split to continuous intervals(start, end, region), intervals are sorted by start,
+        address lookup is a binary search instead of scanning every region, if regions overlap the first one wins
+
+        :param regions: same type regions
+        """
+        self.__starts = list()
+        self.__intervals = list()
+        self.update(regions)
+
+    def __len__(self):
+        return len(self.__intervals)
+
+    def update(self, regions: typing.Sequence[Region]):
+        """Rebuild index, call it after regions or regions address list is changed"""
+        owner = dict()
+        for region in regions:
+            for address in region.list:
+                owner.setdefault(address, region)
+
+        intervals = list()
+        for address in sorted(owner):
+            region = owner[address]
+            if intervals and intervals[-1][1] == address and intervals[-1][2] is region:
+                intervals[-1][1] += 1
+            else:
+                intervals.append([address, address + 1, region])
+
+        self.__intervals = [tuple(x) for x in intervals]
+        self.__starts = [x[0] for x in self.__intervals]
+
+    def find(self, address: int) -> typing.Optional[Region]:
+        index = bisect.bisect_right(self.__starts, address) - 1
+        if index < 0:
+            return None
+
+        start, end, region = self.__intervals[index]
+        return region if address < end else None
+
+    def resolve(self, start: int, count: int) -> typing.List[typing.Tuple[Region, int, int]]:
+        """Resolve address range to continuous region slices
+
+        :param start: start address
+        :param count: address count
+        :return: [(region, slice start, slice count)...], raise KeyError if any address is not in index
+        """
+        slices = list()
+        address, stop = start, start + count
+        index = bisect.bisect_right(self.__starts, address) - 1
+
+        while address < stop:
+            if index < 0 or index >= len(self.__intervals):
+                raise KeyError(address)
+
+            begin, end, region = self.__intervals[index]
+            if not begin <= address < end:
+                raise KeyError(address)
+
+            size = min(end, stop) - address
+            slices.append((region, address, size))
+            address += size
+            index += 1
+
+        return slices
+
+
 class ModbusEvent(CustomEvent):
     Type = collections.namedtuple('Type', 'DataChanged Logging')(*range(2))
 
@@ -181,25 +293,34 @@ def helper_get_bytesize(count: int) -> int:
     return count // 8 + (1 if count % 8 else 0)
 
 
+# Byte value -> '0'/'1' of it's lowest bit, and byte -> 8 bits(msb first, lsb first) lookup tables
+_BIT_CHAR_TABLE = bytes(0x30 | (x & 0x1) for x in range(256))
+_BYTE_BITS_TABLE = {
+    True: [tuple(bool(x & (1 << (7 - i))) for i in range(8)) for x in range(256)],
+    False: [tuple(bool(x & (1 << i)) for i in range(8)) for x in range(256)],
+}
+
+
 def helper_data2bits(data: typing.Sequence[int], msb_first: bool = True) -> bytes:
-    array = bytearray(helper_get_bytesize(len(data)))
+    if not data:
+        return bytes()
 
-    for index, value in enumerate(data):
-        byte_offset = index // 8
-        bit_offset = 7 - index % 8 if msb_first else index % 8
-        array[byte_offset] |= (value & 0x1) << bit_offset
+    # Values to b'0101...' then convert at once, instead of shift and or each bit
+    try:
+        chars = bytes(data).translate(_BIT_CHAR_TABLE)
+    except (ValueError, TypeError):
+        chars = bytes(value & 0x1 for value in data).translate(_BIT_CHAR_TABLE)
 
-    return bytes(array)
+    size = helper_get_bytesize(len(data))
+    if msb_first:
+        return int(chars.ljust(size * 8, b'0'), 2).to_bytes(size, 'big')
+    else:
+        return int(chars[::-1], 2).to_bytes(size, 'little')
 
 
 def helper_bits2data(bits: bytes, msb_first: bool = True) -> typing.Sequence[int]:
-    data = list()
-    for value in bits:
-        for index in range(8):
-            offset = 7 - index if msb_first else index
-            data.append(True if (value & (1 << offset)) else False)
-
-    return data
+    table = _BYTE_BITS_TABLE[bool(msb_first)]
+    return list(itertools.chain.from_iterable(map(table.__getitem__, bits)))
 
 
 def helper_is_contains_address(request: ReadRequest, address: int) -> typing.Tuple[bool, int]:
@@ -208,6 +329,9 @@ def helper_is_contains_address(request: ReadRequest, address: int) -> typing.Tup
 
 
 class DataConvert:
+    # Max read quantity of a request
+    MAX_READ_COUNT = {FuncCode.ReadCoils: 2000, FuncCode.ReadRegs: 125}
+
     def __init__(self, endian: str):
         if not isinstance(endian, str):
             raise TypeError(f"endian required 'str' not {endian.__class__.__name__!r}")
@@ -261,35 +385,91 @@ class DataConvert:
         }.get(fmt, 1)
 
     @classmethod
-    def merge_read_request(cls, address_list: typing.Sequence[DynamicObject]) -> typing.List[ReadRequest]:
-        start = 0
-        count = 0
-        latest = 0
+    def get_address_range(cls, address: DynamicObject) -> typing.Tuple[int, int]:
+        """Address start and occupied address count, bit address(reg/bit) occupies it's register"""
+        if isinstance(address.ma, str):
+            return Address.unpack_bit_address(address.ma)[0], 1
+
+        return address.ma, cls.get_format_size(address.format)
+
+    @classmethod
+    def merge_read_request(cls, address_list: typing.Sequence[DynamicObject],
+                           max_gap: int = 0, fc: int = FuncCode.ReadRegs) -> typing.List[ReadRequest]:
+        """Plan read requests of address list with minimal requests number
+
+        Addresses are sorted, if unread addresses between two addresses is not greater than `max_gap`, they could be
+        read in one request(gap is over-read), a request never exceeds `fc` max read count, a address is never split.
+        Result has the minimal requests number, and then the minimal read addresses number
+
+        :param address_list: address list(ma, format), needn't be sorted
+        :param max_gap: max over-read addresses to merge two addresses, 0 only merge continuous addresses
+        :param fc: read function code, decides max read count of a request
+        :return: read requests, using `split_read_response` map response data back to address list
+        """
+        ranges = sorted({cls.get_address_range(x) for x in address_list})
+        max_count = cls.MAX_READ_COUNT.get(fc, cls.MAX_READ_COUNT[FuncCode.ReadRegs])
+        ends = [start + count for start, count in ranges]
+        tail = list(itertools.accumulate(ends, max))
+
+        # best[i]: (requests, read addresses) of ranges[:i], ranges[group[i]:i] is the last request
+        best = [(0, 0)] + [(len(ranges) + 1, 0)] * len(ranges)
+        group = [0] * (len(ranges) + 1)
+        for i in range(1, len(ranges) + 1):
+            j = i - 1
+            end = ends[j]
+            while True:
+                count = end - ranges[j][0]
+                if count > max_count:
+                    break
+
+                cost = (best[j][0] + 1, best[j][1] + count)
+                if cost < best[i]:
+                    best[i], group[i] = cost, j
+
+                if j == 0 or ranges[j][0] - tail[j - 1] > max_gap:
+                    break
+
+                j -= 1
+                end = max(end, ends[j])
+
         request_list = list()
-        for address in address_list:
-            if not count:
-                start = address.ma
-                count = cls.get_format_size(address.format)
-            elif latest + 1 == address.ma:
-                count += cls.get_format_size(address.format)
-            else:
-                request_list.append(ReadRequest(start=start, count=count, event=None))
-                start = address.ma
-                count = cls.get_format_size(address.format)
+        i = len(ranges)
+        while i:
+            j = group[i]
+            request_list.append(ReadRequest(start=ranges[j][0], count=max(ends[j:i]) - ranges[j][0], event=None))
+            i = j
 
-            latest = address.ma
+        return request_list[::-1]
+
+    @classmethod
+    def split_read_response(cls, response: ReadResponse,
+                            address_list: typing.Sequence[DynamicObject]) -> typing.List[typing.Tuple[int, tuple]]:
+        """Map read response data(of a `merge_read_request` request) back to address list
 
-        request_list.append(ReadRequest(start=start, count=count, event=None))
-        return request_list
+        :param response: read response
+        :param address_list: address list
+        :return: [(address index in address list, address data)...], address not in response is skipped
+        """
+        result = list()
+        size = min(response.request.count, len(response.data))
+        for index, address in enumerate(address_list):
+            start, count = cls.get_address_range(address)
+            offset = start - response.request.start
+            if 0 <= offset and offset + count <= size:
+                result.append((index, tuple(response.data[offset:offset + count])))
+
+        return result
 
 
 class ModbusServer:
     def __init__(self, dev_id: int, callback: typing.Callable[[Region, int, typing.Any], None], verbose: bool = False):
         self.dev_id = dev_id
         self.regions = list()
+        self.indexes = dict()
         self.verbose = verbose
         self.callback = callback
-        self.transmit = UARTTransmit(ending_check=lambda x: crc16(x) == 0, checksum=crc16)
+        framer = CRC16Framer(min_size=4, check=self.check_request_frame)
+        self.transmit = UARTTransmit(framer=framer, checksum=crc16_fast)
 
         self.fc_handle = {
             FuncCode.ReadRegs: self.handleReadRegs,
@@ -314,6 +494,22 @@ class ModbusServer:
 
         return self.transmit.connect((port, baudrate), timeout)
 
+    @staticmethod
+    def check_request_frame(frame: bytes) -> bool:
+        """Check request frame length by function code, a frame prefix may also has a zero crc
+
+        :param frame: dev id, function code, payload and crc16
+        :return: unknown function code is always true
+        """
+        if len(frame) < 2:
+            return False
+
+        if frame[1] in (FuncCode.WriteMultipleCoils, FuncCode.WriteMultipleRegs):
+            # dev id, fc, address, quantity, byte count, data, crc16
+            return len(frame) >= 9 and len(frame) == 9 + frame[6]
+
+        return len(frame) == 8 if frame[1] in FuncCode else True
+
     def find_reg(self, address: int) -> typing.Optional[Region]:
         return self.find_region(DataType.Register, address)
 
@@ -321,21 +517,45 @@ class ModbusServer:
         return self.find_region(DataType.Coil, address)
 
     def find_region(self, t: DataType, address: int) -> typing.Optional[Region]:
-        for region in self.regions:
-            if region.type == t and region.contains(address):
-                return region
-
-        return None
+        index = self.indexes.get(t)
+        return index.find(address) if index else None
 
     def register_region(self, regions: typing.Sequence[Region]):
         for region in regions:
             region.callback = self.callback
             self.regions.append(region)
 
+        self.update_index()
+
+    def update_index(self):
+        """Rebuild address index, call it if `regions` or region address list is modified directly"""
+        self.indexes = {t: RegionIndex([x for x in self.regions if x.type == t]) for t in DataType}
+
+    def read_range(self, t: DataType, start: int, count: int) -> typing.List[int]:
+        """Read continuous address values, each region slice is read at once
+
+        :param t: region data type
+        :param start: start address
+        :param count: address count
+        :return: values, raise KeyError if any address is not registered
+        """
+        data = list()
+        for region, address, size in self.indexes[t].resolve(start, count):
+            data.extend(region.get_range(address, size))
+
+        return data
+
+    def write_range(self, t: DataType, start: int, values: typing.Sequence[int]):
+        """Write continuous address values, raise KeyError if any address is not registered(nothing is written)"""
+        slices = self.indexes[t].resolve(start, len(values))
+        for region, address, size in slices:
+            offset = address - start
+            region.set_range(address, values[offset:offset + size])
+
     def handleReadRegs(self, payload: bytes) -> bytes:
         addr, count = struct.unpack('>2H', payload)
-        data = [self.find_reg(addr + idx).get(addr) for idx in range(count)]
-        return bytes([count * 2]) + struct.pack(f'>{count}H', *tuple(data))
+        data = self.read_range(DataType.Register, addr, count)
+        return bytes([count * 2]) + struct.pack(f'>{count}H', *data)
 
     def handleWriteSingleReg(self, payload: bytes) -> bytes:
         addr, value = struct.unpack('>2H', payload)
@@ -353,9 +573,7 @@ class ModbusServer:
 
         # Get data and process
         data = struct.unpack(f'>{count}H', payload[header_len: header_len + size])
-        for offset in range(count):
-            address = start_addr + offset
-            self.find_reg(address).set(address, data[offset])
+        self.write_range(DataType.Register, start_addr, data)
 
         return struct.pack('>HH', start_addr, count)
 
@@ -363,8 +581,7 @@ class ModbusServer:
         header_fmt = '>2H'
         header_len = struct.calcsize(header_fmt)
         start_addr, count = struct.unpack(header_fmt, payload[:header_len])
-        data = [self.find_coil(start_addr + offset).get(start_addr + offset) for offset in range(count)]
-        return helper_data2bits(data)
+        return helper_data2bits(self.read_range(DataType.Coil, start_addr, count))
 
     def handleWriteSingleCoil(self, payload: bytes) -> bytes:
         addr, state = struct.unpack('>HH', payload)
@@ -381,11 +598,8 @@ class ModbusServer:
             raise IndexError('byte size mismatch')
 
         # Get coils and convert to int
-        data = helper_bits2data(payload[header_len: header_len + size])
-
-        for offset in range(count):
-            address = start_addr + offset
-            self.find_coil(address).set(address, Region.CoilState.ON if data[offset] else Region.CoilState.OFF)
+        data = helper_bits2data(payload[header_len: header_len + size])[:count]
+        self.write_range(DataType.Coil, start_addr, [Region.CoilState.ON if x else Region.CoilState.OFF for x in data])
 
         return struct.pack('>HH', start_addr, count)
 
@@ -413,7 +627,7 @@ class ModbusServer:
                     response = bytes([self.dev_id, func_code]) + handle(bytes(payload))
                 except (struct.error, IndexError):
                     raise ModbusException(dev_id, func_code, ExceptionCode.IllegalDataValue)
-                except AttributeError:
+                except (AttributeError, KeyError):
                     raise ModbusException(dev_id, func_code, ExceptionCode.IllegalDataAddress)
 
                 self.transmit.tx(response)
@@ -436,30 +650,148 @@ class WatchEventRequest(DynamicObject):
     _fc_filter = {DataType.Coil: FuncCode.ReadCoils, DataType.Register: FuncCode.ReadRegs}
 
     def __hash__(self):
-        return sum(self.read_request_to_set(self.rd))
+        return hash((self.name, self.type, self.rd.start, self.rd.count))
+
+    @property
+    def fc(self) -> typing.Optional[int]:
+        return self._fc_filter.get(self.type)
 
     @staticmethod
     def read_request_to_set(req: ReadRequest) -> typing.Set[int]:
         return {x for x in range(req.start, req.start + req.count)}
 
     def is_matched(self, fc: FuncCode, request: ReadRequest) -> typing.Tuple[int, int]:
-        if self._fc_filter.get(self.type) != fc:
-            return -1, 0
+        """Get overlapped addresses of watched and read request
 
-        needle = self.read_request_to_set(self.rd)
-        haystack = self.read_request_to_set(request)
-        found = haystack.intersection(needle)
-        if not found:
+        :param fc: read request function code
+        :param request: read request
+        :return: overlap first address index in read request and overlapped addresses count, (-1, 0) if not matched
+        """
+        if self.fc != fc:
             return -1, 0
 
-        count = len(found)
-        first = found.pop()
-        return list(haystack).index(first), count
+        start = max(self.rd.start, request.start)
+        count = min(self.rd.start + self.rd.count, request.start + request.count) - start
+        return (start - request.start, count) if count > 0 else (-1, 0)
 
     def gen_response(self, address: int, data: typing.Sequence[int]) -> WatchEventResponse:
         return WatchEventResponse(name=self.name, type=self.type, address=address, data=data, event=self.rd.event)
 
 
+class WatchEventRegistry(object):
+    def __init__(self):
+        """Address indexed watch registry, a read result is dispatched only to watches of changed addresses
+
+        Latest read value of each watched address is cached, a watch is triggered only when it's addresses value
+        changed, and if it has a deadband, only when a value changed more than deadband since it's last reported
+        """
+        self.__lock = threading.Lock()
+        self.__values = dict()
+        self.__deadband = dict()
+        self.__reported = dict()
+        self.__index = collections.defaultdict(lambda: collections.defaultdict(list))
+
+    def __len__(self):
+        return len(self.__deadband)
+
+    def __contains__(self, watch: WatchEventRequest):
+        return watch in self.__deadband
+
+    def __iter__(self):
+        with self.__lock:
+            return iter(list(self.__deadband))
+
+    def add(self, watch: WatchEventRequest, deadband: float = 0):
+        """Add watch, it will be triggered by the next read result of it's addresses
+
+        :param watch: watch request
+        :param deadband: numeric value change less than or equal to deadband is ignored
+        """
+        with self.__lock:
+            if watch in self.__deadband:
+                self.__deadband[watch] = deadband
+                return
+
+            self.__deadband[watch] = deadband
+            self.__reported[watch] = dict()
+            values = self.__values.setdefault(watch.fc, dict())
+            for address in range(watch.rd.start, watch.rd.start + watch.rd.count):
+                self.__index[watch.fc][address].append(watch)
+                values.pop(address, None)
+
+    def remove(self, watch: WatchEventRequest):
+        with self.__lock:
+            if self.__deadband.pop(watch, None) is None:
+                return
+
+            self.__reported.pop(watch)
+            index = self.__index[watch.fc]
+            for address in range(watch.rd.start, watch.rd.start + watch.rd.count):
+                index[address].remove(watch)
+                if not index[address]:
+                    del index[address]
+                    self.__values[watch.fc].pop(address, None)
+
+    def clear(self):
+        with self.__lock:
+            self.__index.clear()
+            self.__values.clear()
+            self.__deadband.clear()
+            self.__reported.clear()
+
+    @staticmethod
+    def is_exceeded(previous: typing.Any, current: typing.Any, deadband: float) -> bool:
+        if previous is None:
+            return True
+
+        if deadband and isinstance(previous, (int, float)) and isinstance(current, (int, float)):
+            return abs(current - previous) > deadband
+
+        return current != previous
+
+    def dispatch(self, fc: int, request: ReadRequest, data: typing.Sequence[int]) -> typing.List[WatchEventResponse]:
+        """Dispatch read result to watches
+
+        :param fc: read function code
+        :param request: read request
+        :param data: read result
+        :return: triggered watches response, data is the changed watch overlapped with read request
+        """
+        responses = list()
+        with self.__lock:
+            index = self.__index.get(fc)
+            if not index:
+                return responses
+
+            # Find changed watched addresses, and watches of them
+            affected = dict()
+            values = self.__values[fc]
+            for address, value in zip(range(request.start, request.start + request.count), data):
+                watches = index.get(address)
+                if not watches or address in values and values[address] == value:
+                    continue
+
+                values[address] = value
+                affected.update(dict.fromkeys(watches))
+
+            end = request.start + min(request.count, len(data))
+            for watch in affected:
+                start = max(watch.rd.start, request.start)
+                stop = min(watch.rd.start + watch.rd.count, end)
+                current = data[start - request.start:stop - request.start]
+
+                reported = self.__reported[watch]
+                deadband = self.__deadband[watch]
+                if not any(self.is_exceeded(reported.get(address), value, deadband)
+                           for address, value in zip(range(start, stop), current)):
+                    continue
+
+                reported.update(zip(range(start, stop), current))
+                responses.append(watch.gen_response(start, current))
+
+        return responses
+
+
 class ModbusTCPClientEvent(CommunicationEvent):
     ExtendType = collections.namedtuple('ExtendType', 'WatchEventOccurred')(*'watch_event_occurred'.split())
     type = enum_property('type', CommunicationEvent.Type + ExtendType)
@@ -475,7 +807,7 @@ class ModbusTCPClient:
         self.event_callback = event_callback
         self.is_alive = ThreadSafeBool(False)
         self.tasklet = Tasklet(schedule_interval=1)
-        self.rd_watch_list = ThreadLockAndDataWrap(set())
+        self.rd_watch_list = WatchEventRegistry()
         self.modbus_client = modbus_client.ModbusClient(host=host, **kwargs)
         threading.Thread(target=self.thread_comm_with_plc, daemon=True).start()
         self.tasklet.add_task(Task(self.task_check_connection, timeout=1.0, periodic=True))
@@ -491,8 +823,11 @@ class ModbusTCPClient:
         if fc not in (FuncCode.ReadCoils, FuncCode.ReadRegs):
             self.event_callback(ModbusTCPClientEvent.debug(f'TX:[{name}] >>> {requests}'))
 
-    def request_watch(self, watch: WatchEventRequest):
-        self.rd_watch_list.data.add(watch)
+    def request_watch(self, watch: WatchEventRequest, deadband: float = 0):
+        self.rd_watch_list.add(watch, deadband)
+
+    def cancel_watch(self, watch: WatchEventRequest):
+        self.rd_watch_list.remove(watch)
 
     def task_check_connection(self):
         host = self.modbus_client.host
@@ -543,11 +878,390 @@ class ModbusTCPClient:
                     if data is None:
                         continue
 
-                    for watch in self.rd_watch_list.data:
-                        index, length = watch.is_matched(fc, req)
-                        if 0 <= index < len(data) and length:
-                            response = watch.gen_response(req.start + index, data[index: index + length])
-                            self.event_callback(ModbusTCPClientEvent.watch_event_occurred(response))
+                    for response in self.rd_watch_list.dispatch(fc, req, data):
+                        self.event_callback(ModbusTCPClientEvent.watch_event_occurred(response))
 
                     section = CommunicationSection(req, data)
                     self.event_callback(ModbusTCPClientEvent.section_end(name, section))
+
+
+class ModbusTCPDevice(DynamicObject):
+    _properties = {'name', 'host', 'port', 'unit', 'cycle', 'timeout', 'window', 'requests'}
+    _check = {
+        'cycle': lambda x: isinstance(x, (int, float)) and x > 0,
+        'timeout': lambda x: isinstance(x, (int, float)) and x > 0,
+        'window': lambda x: isinstance(x, int) and x >= 1,
+    }
+
+    def __init__(self, **kwargs):
+        """Modbus tcp device of `ModbusTCPPoller`
+
+        :param name: device name, event name
+        :param host: device host
+        :param port: device port
+        :param unit: device unit id
+        :param cycle: poll cycle time in second
+        :param timeout: transaction timeout in second
+        :param window: max outstanding transactions, matched by transaction id, 1 is stop-and-wait
+        :param requests: poll requests, [(read function code, ReadRequest)...]
+        """
+        kwargs.setdefault('port', 502)
+        kwargs.setdefault('unit', 1)
+        kwargs.setdefault('cycle', 1.0)
+        kwargs.setdefault('window', 1)
+        kwargs.setdefault('timeout', 1.0)
+        kwargs.setdefault('requests', list())
+        super(ModbusTCPDevice, self).__init__(**kwargs)
+
+
+class ModbusDeviceStatistic(DynamicObject):
+    _properties = {'name', 'health', 'connected', 'cycles', 'transactions', 'errors', 'timeouts', 'reconnects',
+                   'error_rate', 'cycle_latency', 'cycle_latency_max', 'response_time'}
+
+    def __repr__(self):
+        return '{}'.format({k: format(v, '.4f') if isinstance(v, float) else v for k, v in self.dict.items()})
+
+
+class ModbusTCPSession(object):
+    HISTORY_SIZE = 100
+    READ_CHUNK_SIZE = 4096
+    OFFLINE_FAILURES = 3
+    DEGRADED_ERROR_RATE = 0.1
+    DEGRADED_RESPONSE_RATIO = 0.5
+
+    def __init__(self, device: ModbusTCPDevice, event_callback: typing.Callable[[ModbusTCPClientEvent], None]):
+        """A modbus tcp device connection and it's poll loop, all coroutines should run in the same event loop
+
+        Transactions are matched by transaction id, at most `device.window` transactions are outstanding.
+        Health is based on connection state, consecutive failures, error rate and response time, after
+        `OFFLINE_FAILURES` consecutive timeouts the connection is considered stale and reconnected.
+
+        :param device: device
+        :param event_callback: event callback, called in event loop
+        """
+        self.__tid = 0
+        self.__device = device
+        self.__pending = dict()
+        self.__window = None
+        self.__writer = None
+        self.__receiver = None
+        self.__callback = event_callback
+        self.__watches = WatchEventRegistry()
+
+        self.__lock = threading.Lock()
+        self.__history = collections.deque(maxlen=self.HISTORY_SIZE)
+        self.__stats = dict(cycles=0, transactions=0, errors=0, timeouts=0, reconnects=-1, failures=0,
+                            cycle_latency=0.0, cycle_latency_max=0.0, response_time=0.0)
+
+    @property
+    def device(self) -> ModbusTCPDevice:
+        return self.__device
+
+    @property
+    def connected(self) -> bool:
+        return self.__writer is not None and not self.__writer.is_closing()
+
+    @property
+    def watches(self) -> WatchEventRegistry:
+        return self.__watches
+
+    def __record(self, success: bool, response_time: float = 0.0, timeout: bool = False):
+        with self.__lock:
+            self.__history.append(success)
+            self.__stats['transactions'] += 1
+            if success:
+                self.__stats['failures'] = 0
+                # Exponential moving average
+                average = self.__stats['response_time']
+                self.__stats['response_time'] = response_time if not average else average * 0.9 + response_time * 0.1
+            else:
+                self.__stats['errors'] += 1
+                self.__stats['failures'] += 1
+                self.__stats['timeouts'] += 1 if timeout else 0
+
+    def health(self) -> str:
+        with self.__lock:
+            failures = self.__stats['failures']
+            response_time = self.__stats['response_time']
+            error_rate = self.__history.count(False) / len(self.__history) if self.__history else 0.0
+
+        if not self.connected or failures >= self.OFFLINE_FAILURES:
+            return ModbusDeviceHealth.Offline
+
+        if error_rate > self.DEGRADED_ERROR_RATE or \
+                response_time > self.__device.timeout * self.DEGRADED_RESPONSE_RATIO:
+            return ModbusDeviceHealth.Degraded
+
+        return ModbusDeviceHealth.Online
+
+    def statistic(self) -> ModbusDeviceStatistic:
+        health = self.health()
+        with self.__lock:
+            stats = {k: v for k, v in self.__stats.items() if k != 'failures'}
+            error_rate = self.__history.count(False) / len(self.__history) if self.__history else 0.0
+
+        stats['reconnects'] = max(stats['reconnects'], 0)
+        return ModbusDeviceStatistic(name=self.__device.name, health=health, connected=self.connected,
+                                     error_rate=error_rate, **stats)
+
+    async def connect(self):
+        reader, self.__writer = await asyncio.wait_for(
+            asyncio.open_connection(self.__device.host, self.__device.port), self.__device.timeout
+        )
+        self.__window = asyncio.Semaphore(self.__device.window)
+        self.__receiver = asyncio.ensure_future(self.__receive(reader, self.__writer))
+        with self.__lock:
+            self.__stats['failures'] = 0
+            self.__stats['reconnects'] += 1
+
+        self.__callback(ModbusTCPClientEvent.connected((self.__device.host, self.__device.port), self.__device.timeout))
+
+    async def close(self, reason: str = 'closed'):
+        writer, self.__writer = self.__writer, None
+        if self.__receiver is not None:
+            self.__receiver.cancel()
+            self.__receiver = None
+
+        if writer is not None:
+            writer.close()
+            self.__fail_pending(ConnectionError(reason))
+            self.__callback(ModbusTCPClientEvent.disconnected(f'{self.__device.name}: {reason}'))
+
+    def __fail_pending(self, error: Exception):
+        pending, self.__pending = self.__pending, dict()
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+    async def __receive(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        framer = MBAPFramer()
+        try:
+            while True:
+                data = await reader.read(self.READ_CHUNK_SIZE)
+                if not data:
+                    break
+
+                for frame in framer.feed(data):
+                    tid, _, pdu = MBAPFramer.decode(frame)
+                    future = self.__pending.pop(tid, None)
+                    if future is not None and not future.done():
+                        future.set_result(pdu)
+        except OSError:
+            pass
+
+        # Peer closed, current connection is not replaced
+        if writer is self.__writer:
+            self.__receiver = None
+            await self.close('connection closed by peer')
+
+    async def transaction(self, pdu: bytes, check: typing.Optional[typing.Callable[[bytes], bool]] = None) -> bytes:
+        """Send request pdu and wait it's response pdu
+
+        :param pdu: request pdu
+        :param check: response pdu check, malformed response raise ModbusException(IllegalDataValue)
+        :return: response pdu, raise ModbusException if device response exception,
+        ConnectionError if not connected or disconnected, asyncio.TimeoutError if timeout
+        """
+        if not self.connected:
+            raise ConnectionError(f'{self.__device.name} is not connected')
+
+        async with self.__window:
+            self.__tid = (self.__tid + 1) & 0xffff
+            tid = self.__tid
+            start = time.perf_counter()
+            future = asyncio.get_running_loop().create_future()
+            self.__pending[tid] = future
+
+            try:
+                self.__writer.write(MBAPFramer.encode(tid, self.__device.unit, pdu))
+                response = await asyncio.wait_for(future, self.__device.timeout)
+            except asyncio.TimeoutError:
+                self.__record(False, timeout=True)
+                raise
+            except (ConnectionError, OSError, AttributeError) as e:
+                self.__record(False)
+                raise ConnectionError(e)
+            finally:
+                self.__pending.pop(tid, None)
+
+        if not response or response[0] != pdu[0]:
+            self.__record(False)
+            code = response[1] if len(response) > 1 else ExceptionCode.SlaveDeviceFailure
+            raise ModbusException(self.__device.unit, pdu[0], code)
+
+        if check is not None and not check(response):
+            self.__record(False)
+            raise ModbusException(self.__device.unit, pdu[0], ExceptionCode.IllegalDataValue)
+
+        self.__record(True, time.perf_counter() - start)
+        return response
+
+    async def read(self, fc: int, start: int, count: int) -> typing.List[int]:
+        # Byte count must match request count, and data must be complete
+        size = helper_get_bytesize(count) if fc == FuncCode.ReadCoils else count * 2
+        response = await self.transaction(struct.pack('>BHH', fc, start, count),
+                                          lambda x: len(x) >= 2 + size and x[1] == size)
+        if fc == FuncCode.ReadCoils:
+            return [int(x) for x in helper_bits2data(response[2:2 + size], msb_first=False)[:count]]
+
+        return list(struct.unpack_from(f'>{count}H', response, 2))
+
+    async def write(self, fc: int, address: int, data: typing.Union[int, bool, typing.Sequence[int]]) -> bool:
+        if fc == FuncCode.WriteSingleCoil:
+            pdu = struct.pack('>BHH', fc, address, Region.CoilState.ON if data else Region.CoilState.OFF)
+        elif fc == FuncCode.WriteSingleReg:
+            pdu = struct.pack('>BHH', fc, address, data)
+        elif fc == FuncCode.WriteMultipleCoils:
+            bits = helper_data2bits([1 if x else 0 for x in data], msb_first=False)
+            pdu = struct.pack('>BHHB', fc, address, len(data), len(bits)) + bits
+        elif fc == FuncCode.WriteMultipleRegs:
+            pdu = struct.pack(f'>BHHB{len(data)}H', fc, address, len(data), len(data) * 2, *data)
+        else:
+            raise ModbusException(self.__device.unit, fc, ExceptionCode.IllegalFunction)
+
+        response = await self.transaction(pdu)
+        return response[1:5] == pdu[1:5]
+
+    async def __poll(self, fc: int, request: ReadRequest):
+        try:
+            data = await self.read(fc, request.start, request.count)
+        except asyncio.TimeoutError:
+            self.__callback(ModbusTCPClientEvent.error(f'{self.__device.name}: {request} timeout'))
+        except (ConnectionError, ModbusException) as e:
+            self.__callback(ModbusTCPClientEvent.error(f'{self.__device.name}: {request} error: {e!r}'))
+        except Exception as e:
+            # Unexpected error only fails this request, poll loop keeps running
+            self.__record(False)
+            self.__callback(ModbusTCPClientEvent.error(f'{self.__device.name}: {request} unexpected error: {e!r}'))
+        else:
+            section = CommunicationSection(request, data)
+            self.__callback(ModbusTCPClientEvent.section_end(self.__device.name, section))
+            for response in self.__watches.dispatch(fc, request, data):
+                self.__callback(ModbusTCPClientEvent.watch_event_occurred(response))
+
+    async def run(self):
+        """Poll device every `device.cycle` second, connect or reconnect if disconnected"""
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                start = loop.time()
+                if not self.connected:
+                    try:
+                        await self.connect()
+                    except (OSError, asyncio.TimeoutError) as e:
+                        self.__callback(ModbusTCPClientEvent.disconnected(f'{self.__device.name}: {e!r}'))
+                        await asyncio.sleep(self.__device.cycle)
+                        continue
+
+                await asyncio.gather(*[self.__poll(fc, request) for fc, request in self.__device.requests])
+
+                latency = loop.time() - start
+                with self.__lock:
+                    self.__stats['cycles'] += 1
+                    self.__stats['cycle_latency'] = latency
+                    self.__stats['cycle_latency_max'] = max(latency, self.__stats['cycle_latency_max'])
+
+                # Stale connection, reconnect in next cycle
+                if self.health() == ModbusDeviceHealth.Offline:
+                    await self.close('too many failures')
+
+                await asyncio.sleep(max(start + self.__device.cycle - loop.time(), 0))
+        finally:
+            await self.close()
+
+
+class ModbusTCPPoller(object):
+    def __init__(self, event_callback: typing.Callable[[ModbusTCPClientEvent], None],
+                 loop: typing.Optional[asyncio.AbstractEventLoop] = None):
+        """Poll many modbus tcp devices concurrently in one event loop
+
+        Each device has it's own connection, poll cycle and outstanding transactions window,
+        read result is reported as section end event(name is device name), blocking `read` and `write`
+        must not be called inside the event loop
+
+        :param event_callback: event callback, called in event loop
+        :param loop: event loop which is running in another thread, if not set create a loop thread
+        """
+        self.__sessions = dict()
+        self.__callback = event_callback
+
+        if loop is None:
+            self.__loop = asyncio.new_event_loop()
+            threading.Thread(target=self.__loop.run_forever, name='ModbusTCPPoller', daemon=True).start()
+        else:
+            self.__loop = loop
+
+        self.__own_loop = loop is None
+
+    def __run(self, coro: typing.Coroutine) -> typing.Any:
+        return asyncio.run_coroutine_threadsafe(coro, self.__loop).result()
+
+    @staticmethod
+    async def __start_session(session: ModbusTCPSession) -> asyncio.Task:
+        return asyncio.ensure_future(session.run())
+
+    @staticmethod
+    async def __stop_session(task: asyncio.Task):
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    def __session(self, name: str) -> ModbusTCPSession:
+        try:
+            return self.__sessions[name][0]
+        except KeyError:
+            raise ValueError(f'unknown device: {name!r}')
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        return self.__loop
+
+    @property
+    def devices(self) -> typing.List[str]:
+        return list(self.__sessions)
+
+    def add_device(self, device: ModbusTCPDevice):
+        if not isinstance(device, ModbusTCPDevice):
+            raise TypeError(f"'device' must be a instance of {ModbusTCPDevice.__name__}")
+
+        if device.name in self.__sessions:
+            raise ValueError(f'device: {device.name!r} is already added')
+
+        session = ModbusTCPSession(device, self.__callback)
+        self.__sessions[device.name] = session, self.__run(self.__start_session(session))
+
+    def remove_device(self, name: str):
+        """Stop polling device and close it's connection"""
+        _, task = self.__sessions.pop(name, (None, None))
+        if task is not None:
+            self.__run(self.__stop_session(task))
+
+    def stop(self):
+        for name in self.devices:
+            self.remove_device(name)
+
+        if self.__own_loop:
+            self.__loop.call_soon_threadsafe(self.__loop.stop)
+
+    def statistic(self, name: str) -> ModbusDeviceStatistic:
+        return self.__session(name).statistic()
+
+    def statistics(self) -> typing.Dict[str, ModbusDeviceStatistic]:
+        return {name: session.statistic() for name, (session, _) in self.__sessions.items()}
+
+    def request_watch(self, name: str, watch: WatchEventRequest, deadband: float = 0):
+        """Watch device poll result, watch event is occurred when watched values changed"""
+        self.__session(name).watches.add(watch, deadband)
+
+    def cancel_watch(self, name: str, watch: WatchEventRequest):
+        self.__session(name).watches.remove(watch)
+
+    def read(self, name: str, fc: int, request: ReadRequest) -> typing.List[int]:
+        """Read device immediately(besides poll requests), raise exception as `ModbusTCPSession.transaction`"""
+        return self.__run(self.__session(name).read(fc, request.start, request.count))
+
+    def write(self, name: str, fc: int, request: WriteRequest) -> bool:
+        """Write device, raise exception as `ModbusTCPSession.transaction`"""
+        return self.__run(self.__session(name).write(fc, request.address, request.data))
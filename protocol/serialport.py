@@ -13,7 +13,8 @@ from raspi_io.utility import scan_server
 from typing import Callable, Optional, Union, Tuple, List, Any
 from raspi_io import Serial as WebsocketSerial, RaspiSocketError, Query
 
-from .crc16 import crc16
+from .framer import Framer
+from .crc16 import crc16_fast
 from ..core.datatype import BasicTypeLE, ip4_check
 
 
@@ -54,7 +55,7 @@ class ErrorCode(object):
 
 class BasicMsg(BasicTypeLE):
     def calc_crc(self) -> int:
-        return crc16(self.cdata()[1:ctypes.sizeof(self) - 2])
+        return crc16_fast(self.cdata()[1:ctypes.sizeof(self) - 2])
 
     def calc_len(self) -> int:
         return ctypes.sizeof(self) - 1
@@ -70,7 +71,7 @@ class BasicMsg(BasicTypeLE):
             return False, ErrorCode.get_desc(ErrorCode.E_LEN)
 
         # Crc check
-        if crc16(self.cdata()[1:]):
+        if crc16_fast(self.cdata()[1:]):
             return False, ErrorCode.get_desc(ErrorCode.E_CRC)
 
         return True, ""
@@ -364,7 +365,8 @@ class SerialTransferProtocol(object):
 class SerialPort(object):
     def __init__(self, port: str, baudrate: int,
                  bytesize: int = 8, parity: str = 'N', stopbits: int = 1,
-                 timeout: float = 0, ending_check: Optional[Callable[[bytes], bool]] = None):
+                 timeout: float = 0, ending_check: Optional[Callable[[bytes], bool]] = None,
+                 framer: Optional[Framer] = None):
         """Serial port
 
         :param port: local serial port("COM1" , "/dev/ttyS1"), or WebsocketSerial("xxx.xxx.xxx.xxx", "/dev/ttyS1")
@@ -374,7 +376,10 @@ class SerialPort(object):
         :param stopbits: number of stop bits. Possible values: 1, 2
         :param timeout: serial port timeout
         :param ending_check: dynamic check if receive is ending or not
+        :param framer: streaming framer, using `read_frame` to receive a complete frame
         """
+        self.__frames = collections.deque()
+        self.__framer = framer
         self.__timeout = timeout
         self.__ending_check = ending_check
 
@@ -388,7 +393,7 @@ class SerialPort(object):
 
             self.__port = serial.Serial(port=port, baudrate=baudrate,
                                         bytesize=bytesize, parity=parity, stopbits=stopbits,
-                                        timeout=0.01 if hasattr(ending_check, "__call__") else timeout)
+                                        timeout=0.01 if hasattr(ending_check, "__call__") or framer else timeout)
         except (AttributeError, ValueError, TypeError):
             try:
                 self.__port = WebsocketSerial(host=port[0], port=port[1], baudrate=baudrate,
@@ -417,6 +422,10 @@ class SerialPort(object):
         self.__port.close()
 
     def flush(self):
+        self.__frames.clear()
+        if self.__framer is not None:
+            self.__framer.reset()
+
         try:
             self.__port.flushInput()
             self.__port.flushOutput()
@@ -457,20 +466,99 @@ class SerialPort(object):
         if not self.__port.isOpen():
             raise serial.SerialException("Serial port: {} is not opened".format(self.__port.port))
 
-        data = bytes()
+        data = bytearray()
         while len(data) < size and time.time() - start < timeout:
             try:
                 data += self.__port.read(size - len(data))
             except (TypeError, AttributeError):
                 break
 
-            if data and callable(self.__ending_check) and self.__ending_check(data):
+            if data and callable(self.__ending_check) and self.__ending_check(bytes(data)):
+                break
+
+        if not data:
+            raise serial.SerialTimeoutException("Receive data timeout!")
+
+        return bytes(data)
+
+    def read_frame(self, timeout: Optional[float] = None) -> bytes:
+        """Receive a complete frame through framer
+
+        Only new received bytes are fed to framer, bytes after a complete frame are kept for the next frame
+        :param timeout: receive frame timeout(s)
+        :return: received frame or timeout exception
+        """
+        start = time.time()
+        timeout = timeout if timeout else self.__timeout
+
+        if self.__framer is None:
+            raise serial.SerialException("Framer is not set")
+
+        if not self.__port.isOpen():
+            raise serial.SerialException("Serial port: {} is not opened".format(self.__port.port))
+
+        while not self.__frames and time.time() - start < timeout:
+            try:
+                data = self.__port.read(getattr(self.__port, 'in_waiting', 0) or 1)
+            except (TypeError, AttributeError):
+                break
+
+            if data:
+                self.__frames.extend(self.__framer.feed(data))
+
+        if not self.__frames:
+            # Incomplete frame is timeout, drop it to resync
+            self.__framer.drop()
+            raise serial.SerialTimeoutException("Receive frame timeout!")
+
+        return self.__frames.popleft()
+
+    def read_burst(self, idle: float, size: int = 4096, timeout: Optional[float] = None) -> bytes:
+        """Receive all available bytes, until no byte is received in `idle` time(frame boundary)
+
+        Unlike `read` it's not waiting for `size` bytes, first byte is waited by raw port blocking read,
+        then bytes waiting in driver are read at once, returns as soon as the line is idle
+        :param idle: inter byte idle timeout(s), e.g. 3.5 chars time
+        :param size: max receive data size
+        :param timeout: wait first byte timeout(s)
+        :return: received data or timeout exception
+        """
+        start = time.time()
+        timeout = timeout if timeout else self.__timeout
+
+        if size == 0:
+            raise serial.SerialException("Receive data length error")
+
+        if not self.__port.isOpen():
+            raise serial.SerialException("Serial port: {} is not opened".format(self.__port.port))
+
+        last = start
+        data = bytearray()
+        while len(data) < size:
+            try:
+                waiting = getattr(self.__port, 'in_waiting', 0)
+                if not waiting and data:
+                    if time.time() - last >= idle:
+                        break
+
+                    time.sleep(idle / 4)
+                    continue
+
+                if not waiting and time.time() - start >= timeout:
+                    break
+
+                received = self.__port.read(min(waiting or 1, size - len(data)))
+            except (TypeError, AttributeError):
                 break
 
+            if received:
+                data += received
+                last = time.time()
+
         if not data:
             raise serial.SerialTimeoutException("Receive data timeout!")
 
-        return data
+        return bytes(data)
 
     @staticmethod
     def get_serial_list(timeout: float = 0.04) -> List[str]:
@@ -1,21 +1,16 @@
 # -*- coding: utf-8 -*-
 import os
-import sys
-import time
-import struct
 import typing
 
 import serial
-import selectors
 import collections
-from threading import Thread
+from threading import Thread, RLock
 from .serialport import SerialPort
 from ..core.timer import Task, Tasklet
 from ..misc.settings import UiLogMessage
 from ..core.datatype import DynamicObject
 from ..core.threading import ThreadSafeBool
 from ..misc.debug import JsonSettingsWithDebugCode, LoggerWrap
-from .transmit import TransmitException, TransmitWarning, TCPServerTransmitHandle, TCPClientTransmit, TCPSocketTransmit
 __all__ = ['SerialPortSwitch', 'SerialPortSwitchSettings']
 
 
@@ -45,31 +40,34 @@ class SerialPortSwitchSettings(JsonSettingsWithDebugCode):
 
 
 class SerialPortSwitch:
-    Port = 56789
+    # Frame boundary: no byte is received in 3.5 chars time(at least MIN_IDLE_TIMEOUT)
+    IDLE_CHARS = 3.5
+    MIN_IDLE_TIMEOUT = 0.001
+    MAX_BURST_SIZE = 4096
     # src_port, dest_port, dest_serial, payload
     ProcessFunc = typing.Callable[[int, int, SerialPort, bytes], None]
 
     def __init__(self):
         self._rules = dict()
-        self._cached_msg = bytes()
+        self._routes = dict()
+        # Guards cached message and its source port, re-entered by `relay` flushing cached message
+        self._relay_lock = RLock()
+        self._cached_msg = bytearray()
         self._previous_port = -1
         self._msg_interval = 0.05
+        self._idle_timeout = self.MIN_IDLE_TIMEOUT
         self._serial_list = list()
-        self._client_list = list()
         self._exit = ThreadSafeBool(False)
-        self._selector = selectors.DefaultSelector()
         self._tasklet = Tasklet(schedule_interval=0.01)
         self._log = LoggerWrap(f'{self.__class__.__name__}.log')
-        self._server = TCPServerTransmitHandle(self.handle, length_fmt=TCPSocketTransmit.DefaultLengthFormat)
 
     def stop(self):
         self._exit.set()
 
-    def start(self, port: int = Port) -> bool:
-        settings = SerialPortSwitchSettings.get()
-        self._server.start(('127.0.0.1', port))
+    def start(self, settings: typing.Optional[SerialPortSwitchSettings] = None) -> bool:
+        settings = settings or SerialPortSwitchSettings.get()
         self._msg_interval = settings.msg_interval
-        Thread(target=self.thread_switch, daemon=True).start()
+        self._idle_timeout = self.get_idle_timeout(settings.comm_params.get('baudrate', 115200))
         self._log.logging(UiLogMessage.genDefaultDebugMessage(f'{settings.dict}'))
 
         for index, name in enumerate(f'{settings.up_stream}, {settings.down_stream}'.split(',')):
@@ -82,88 +80,82 @@ class SerialPortSwitch:
             else:
                 self._serial_list.append(ser)
                 self._rules[index] = settings.get_rule(name)
-                Thread(target=self.thread_rx_serial, args=(ser, index), daemon=True).start()
+
+        # Routes are ready before receiving
+        self._routes = self.build_routes(self._rules, len(self._serial_list))
+        for index, ser in enumerate(self._serial_list):
+            Thread(target=self.thread_rx_serial, args=(ser, index), daemon=True).start()
 
         return True
 
-    def handle(self, transmit: TCPSocketTransmit):
-        self._client_list.append(transmit)
-        port = struct.unpack('>L', transmit.rx(0))[0]
-        self._selector.register(transmit.raw_socket, selectors.EVENT_READ, data=port)
+    @classmethod
+    def get_idle_timeout(cls, baudrate: int) -> float:
+        # 1 start bit, 8 data bits, 1 parity bit, 1 stop bit
+        return max(cls.IDLE_CHARS * 11 / baudrate, cls.MIN_IDLE_TIMEOUT)
+
+    @staticmethod
+    def build_routes(rules: typing.Dict[int, SerialPortSwitchSettings.Rule],
+                     number: int) -> typing.Dict[int, typing.Tuple[int, ...]]:
+        """Precompute routing table from rules, source port -> destination ports
+
+        Source data is relayed to a destination, if source tx destination mask has the destination port,
+        and destination rx mask has the source port
+        """
+        routes = dict()
+        for src_port, src_rule in rules.items():
+            routes[src_port] = tuple(
+                dest_port for dest_port in range(number)
+                if src_rule.tx_dest & (1 << dest_port) and rules.get(dest_port) and
+                rules[dest_port].rx_mask & (1 << src_port)
+            )
+
+        return routes
 
     def get_port_name(self, port: int) -> str:
         return self._serial_list[port].raw_port.port
 
     def rule_process(self, src_port: int, payload: bytes, process: ProcessFunc):
-        tx_mask = (1 << src_port)
-        src_rule = self._rules.get(src_port)
-        if not src_rule:
-            return
-
-        for dest_port, ser in enumerate(self._serial_list):
-            dest_rule = self._rules.get(dest_port)
-            if src_rule.tx_dest & (1 << dest_port):
-                if dest_rule.rx_mask & tx_mask:
-                    process(src_port, dest_port, ser, payload)
+        for dest_port in self._routes.get(src_port, ()):
+            process(src_port, dest_port, self._serial_list[dest_port], payload)
 
-    def relay(self, client: TCPSocketTransmit, port: int):
-        try:
-            payload = client.rx(0)
-        except TransmitWarning:
+    def relay(self, port: int, payload: bytes):
+        if not payload:
             return
-        except (BrokenPipeError, ConnectionResetError, TransmitException) as e:
-            print(client.raw_socket.getsockname(), f'{e}')
-            payload = b''
 
-        if payload:
+        with self._relay_lock:
             # Source changed, write cached to log
             if self._previous_port != port and self._cached_msg:
                 self.task_write_log()
 
             self._previous_port = port
             self._cached_msg += payload
+
             # Match rule and process relay data
             self.rule_process(port, payload, lambda _s, d_, ser, data: ser.write(data))
-            self._tasklet.add_task(Task(func=self.task_write_log, timeout=self._msg_interval))
 
-    def thread_switch(self):
-        while not self._exit:
-            if not self._selector.get_map():
-                time.sleep(0.01)
-                continue
-
-            for key, mask in self._selector.select():
-                for client in self._client_list:
-                    if client.raw_socket == key.fileobj:
-                        self.relay(client, key.data)
+        self._tasklet.add_task(Task(func=self.task_write_log, timeout=self._msg_interval))
 
     def task_write_log(self):
-        if self._previous_port < 0 or not self._cached_msg:
-            return
+        # Take cached message and its source port at once, rx threads keep relaying while logging
+        with self._relay_lock:
+            if self._previous_port < 0 or not self._cached_msg:
+                return
+
+            port, payload = self._previous_port, bytes(self._cached_msg)
+            self._cached_msg = bytearray()
 
         self.rule_process(
-            self._previous_port, self._cached_msg,
+            port, payload,
             lambda s, d, _, data: self._log.logging(UiLogMessage.genDefaultInfoMessage(
                 f'{self.get_port_name(s)} ==> {self.get_port_name(d)}: {data.hex()}'
             ))
         )
 
-        self._cached_msg = bytes()
-
     def thread_rx_serial(self, ser: SerialPort, index: int):
-        client = TCPClientTransmit(TCPSocketTransmit.DefaultLengthFormat)
-
-        try:
-            client.connect(('127.0.0.1', self.Port))
-        except TransmitException as e:
-            print(f'Connect server error: {e}')
-            sys.exit(-2)
-        else:
-            client.tx(struct.pack('>L', index))
-
         while not self._exit:
             try:
-                client.tx(ser.read(1, timeout=0.001))
+                # Read bytes as they are available, until a frame boundary(idle timeout)
+                self.relay(index, ser.read_burst(self._idle_timeout, self.MAX_BURST_SIZE))
             except serial.SerialException:
                 continue
 
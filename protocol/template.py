@@ -1,6 +1,7 @@
 # -*- coding: utf-8 -*-
 import abc
 import time
+import asyncio
 import queue
 import typing
 import logging
@@ -11,6 +12,7 @@ from ..core.timer import Tasklet, Task
 from ..misc.settings import UiLogMessage
 from ..misc.debug import get_debug_timestamp
 from ..core.datatype import CustomEvent, enum_property, DynamicObject
+from .aiotransmit import AsyncTransmitAdapter
 from .transmit import Transmit, TransmitException, TransmitWarning, TCPClientTransmit
 from ..core.threading import ThreadSafeBool, ThreadSafeInteger, ThreadConditionWrap, ThreadLockAndDataWrap
 
@@ -19,6 +21,7 @@ __all__ = ['CommunicationEvent', 'CommunicationEventHandle',
            'CommunicationObject', 'CommunicationObjectDecodeError', 'CommunicationSection']
 
 CommunicationSection = collections.namedtuple('CommunicationSection', 'request response')
+CommunicationInflight = collections.namedtuple('CommunicationInflight', 'priority request sid start deadline retry')
 
 
 class CommunicationEvent(CustomEvent):
@@ -123,13 +126,48 @@ class CommunicationEventHandle(abc.ABC):
 class CommunicationObject(abc.ABC):
     def __init__(self, msg: typing.Any):
         self.raw = msg
+        self.superseded = False
+        self._followers = list()
         self._cond = ThreadConditionWrap()
 
     def is_periodic(self) -> bool:
         return False
 
+    def is_write(self) -> bool:
+        """Write request, pending write to the same target will be replaced by the latest one when coalescing"""
+        return False
+
+    def coalesce_key(self) -> typing.Optional[typing.Hashable]:
+        """Request identity(e.g. function code and target address), None means do not coalescing"""
+        return None
+
+    def coalesce(self, other) -> bool:
+        """Try to absorb another pending read request(e.g. adjacent registers read) into self
+
+        If absorbed, self is responsible to answer other: other's response is set by `set_response`
+        with self's response, override `set_response` if the response of other need to be sliced
+        :param other: new read request
+        :return: true if absorbed
+        """
+        return False
+
+    def add_follower(self, request):
+        """Request coalesced into self, will get response when self gets response"""
+        self._followers.append(request)
+
     def set_response(self, response):
         self._cond.finished(response)
+        for follower in self._followers:
+            follower.set_response(response)
+
+    def correlation_id(self) -> typing.Optional[typing.Hashable]:
+        """Request tag used to match response in pipelined mode, None means do not support"""
+        return None
+
+    @classmethod
+    def correlation_id_from_bytes(cls, data: bytes) -> typing.Optional[typing.Hashable]:
+        """Get response tag from raw data without decoding it, used to find the matched request in pipelined mode"""
+        return None
 
     def wait_response(self, timeout: float):
         return self._cond.wait(timeout)
@@ -165,7 +203,27 @@ class CommunicationController(abc.ABC):
                  response_max_length: int,
                  fetch_state_period: float,
                  event_callback: typing.Callable[[CommunicationEvent], None],
-                 print_ts: bool = False, retry: int = 3, tasklet_interval: float = 0.05, debug_mode: bool = False):
+                 print_ts: bool = False, retry: int = 3, tasklet_interval: float = 0.05, debug_mode: bool = False,
+                 pipeline_window: int = 1, coalescing: bool = False):
+        """Communication controller
+
+        Default is stop-and-wait: send a request, wait it's response then send next request.
+        If `pipeline_window` is greater than 1, pipelined mode is enabled, at most `pipeline_window`
+        requests could be in-flight, responses are matched to requests by `CommunicationObject.correlation_id`,
+        each in-flight request has it own timeout(transmit timeout) and will be retried independently.
+        Request without correlation id will wait all in-flight requests finished before send.
+
+        If `transmit` is an `AsyncTransmitAdapter`, controller communicates with device in the adapter's
+        event loop(stop-and-wait) instead of a thread, so many controllers could share one event loop.
+
+        If `coalescing` is enabled, request with `CommunicationObject.coalesce_key` is coalesced with pending
+        requests: duplicate read is dropped, adjacent reads are merged(`CommunicationObject.coalesce`),
+        write to the same target is replaced by the latest one, dropped or replaced request gets the response
+        of the request it's coalesced into.
+
+        :param pipeline_window: max in-flight requests
+        :param coalescing: enable pending request coalescing
+        """
         if not isinstance(transmit, Transmit):
             raise TypeError(f"'transmit' must be a instance of {Transmit.__name__}")
 
@@ -181,6 +239,9 @@ class CommunicationController(abc.ABC):
         if not callable(event_callback):
             raise TypeError("'event_callback must be callable'")
 
+        if not isinstance(pipeline_window, int) or pipeline_window < 1:
+            raise ValueError("'pipeline_window' must be a positive integer")
+
         self._transmit = transmit
         self._print_ts = print_ts
         self._retry_times = retry
@@ -192,6 +253,21 @@ class CommunicationController(abc.ABC):
         self._section_seq = ThreadSafeInteger(0)
         self._latest_section = CommunicationSection(None, None)
 
+        # Pipelined mode, in-flight requests key is correlation id
+        self._inflight = dict()
+        self._inflight_retry = dict()
+        self._pipeline_window = pipeline_window
+        self._inflight_cond = threading.Condition()
+
+        # Coalescing, pending(in queue) requests key is (is_write, coalesce_key)
+        self._pending = dict()
+        self._coalescing = coalescing
+        self._pending_lock = threading.Lock()
+
+        # Async mode, wakeup event of async_comm_with_device
+        self._async_wakeup = None
+        self._coalesce_statistic = DynamicObject(merged=0, dropped=0, replaced=0)
+
         self._cur_state = ThreadLockAndDataWrap(None)
         self._prev_state = ThreadLockAndDataWrap(None)
         self._fetch_state_period = fetch_state_period
@@ -236,7 +312,16 @@ class CommunicationController(abc.ABC):
         return self._timeout.is_set()
 
     def is_comm_idle(self, remain: int = 1) -> bool:
-        return self._queue.qsize() <= remain
+        return self._queue.qsize() + len(self._inflight) + len(self._inflight_retry) <= remain
+
+    def is_pipelined(self) -> bool:
+        return self._pipeline_window > 1
+
+    @property
+    def coalesce_statistic(self) -> DynamicObject:
+        """Coalesced requests count: merged(adjacent reads), dropped(duplicate reads), replaced(writes)"""
+        with self._pending_lock:
+            return DynamicObject(**self._coalesce_statistic.dict)
 
     def wait_comm_idle(self, interval: float = 0.01, remain: int = 1,
                        condition: typing.Callable[[], bool] = lambda: True) -> bool:
@@ -266,6 +351,9 @@ class CommunicationController(abc.ABC):
         while self._queue.qsize():
             self._queue.get()
 
+        with self._pending_lock:
+            self._pending.clear()
+
         self._cur_state.assign(None)
         self._prev_state.assign(None)
         self._tasklet.add_task(Task(self.task_disconnect, args=(send_event,), timeout=self._fetch_state_period))
@@ -284,7 +372,16 @@ class CommunicationController(abc.ABC):
             self._timeout.clear()
             self._timeout_cnt.reset()
             self._section_seq.reset()
-            threading.Thread(target=self.thread_comm_with_device, daemon=True).start()
+            if isinstance(self._transmit, AsyncTransmitAdapter):
+                asyncio.run_coroutine_threadsafe(self.async_comm_with_device(), self._transmit.loop)
+            elif self.is_pipelined():
+                with self._inflight_cond:
+                    self._inflight.clear()
+                    self._inflight_retry.clear()
+                threading.Thread(target=self.thread_pipeline_tx, daemon=True).start()
+                threading.Thread(target=self.thread_pipeline_rx, daemon=True).start()
+            else:
+                threading.Thread(target=self.thread_comm_with_device, daemon=True).start()
             self._connect_callback()
             self.pause_fetch_state(False)
             self.info_msg(f'Connected: {address}, timeout:{timeout}')
@@ -356,6 +453,9 @@ class CommunicationController(abc.ABC):
         if not isinstance(request, CommunicationObject):
             return False
 
+        if self._coalescing and self._coalesce_request(request):
+            return True
+
         try:
             priority = time.perf_counter() if priority is None else priority
             self._queue.put((priority, request))
@@ -363,6 +463,64 @@ class CommunicationController(abc.ABC):
             self.error_msg(f'Send request exception: {e}')
             return False
         else:
+            wakeup = self._async_wakeup
+            if wakeup is not None:
+                self._transmit.loop.call_soon_threadsafe(wakeup.set)
+            return True
+
+    def _coalesce_request(self, request: CommunicationObject) -> bool:
+        """Coalesce request with pending requests, return true if request is coalesced and do not need send"""
+        key = request.coalesce_key()
+        if key is None:
+            return False
+
+        # Pending is ordered by enqueue time, entry is moved to the end when it's replaced
+        with self._pending_lock:
+            if request.is_write():
+                # Read issued after pending write must see it, do not replace the write across that read
+                pending = self._pending.pop((True, key), None)
+                if pending is not None and (False, key) not in self._pending:
+                    pending.superseded = True
+                    request.add_follower(pending)
+                    self._coalesce_statistic.replaced += 1
+
+                # Pending read runs before this write, later read can not share it's response
+                self._pending.pop((False, key), None)
+                self._pending[(True, key)] = request
+                return False
+
+            pending = self._pending.get((False, key))
+            if pending is not None:
+                pending.add_follower(request)
+                self._coalesce_statistic.dropped += 1
+                return True
+
+            # Only merge into read newer than all pending writes, older one may miss the write
+            for (is_write, _), pending in reversed(list(self._pending.items())):
+                if is_write:
+                    break
+
+                if pending.coalesce(request):
+                    pending.add_follower(request)
+                    self._coalesce_statistic.merged += 1
+                    return True
+
+            self._pending[(False, key)] = request
+            return False
+
+    def _dequeue_request(self, request: CommunicationObject) -> bool:
+        """Request is going to send, after this it can not be coalesced, return false if it's superseded"""
+        if not self._coalescing:
+            return True
+
+        with self._pending_lock:
+            if request.superseded:
+                return False
+
+            key = request.coalesce_key()
+            if key is not None and self._pending.get((request.is_write(), key)) is request:
+                del self._pending[(request.is_write(), key)]
+
             return True
 
     def _format_log(self, msg: str) -> str:
@@ -415,6 +573,61 @@ class CommunicationController(abc.ABC):
             self.log_msg_by_request(request, '>>>\r\n')
             self._section_seq.increase()
 
+    def _comm_response(self, request: CommunicationObject, data: bytes, cost_time: float) -> bool:
+        """Decode and check response, return false if response is invalid, transmit should be flushed and retry"""
+        try:
+            response = self._response_cls.from_bytes(request, data)
+        except CommunicationObjectDecodeError as e:
+            raw = ' '.join([f'{x:02X}' for x in data])
+            self.error_msg(f'Decode {request} response error: {e}, (Raw: {raw})')
+            return False
+
+        self.log_msg_by_request(request, f'RX <{"=" * 16}: {response}')
+        if not self._section_check(request, response, cost_time):
+            self.error_msg(f'Section check failed: {request!r} {response!r}')
+            return False
+
+        # Communication restored
+        self._communication_restored()
+        self._response_handle(request, response)
+        self._latest_section = CommunicationSection(request, response)
+        return True
+
+    def _comm_warning(self, request: CommunicationObject, e: TransmitWarning,
+                      retry: int, max_retry_times: int) -> typing.Tuple[bool, bool]:
+        """Handle transmit warning, transmit should be flushed after it
+
+        :return: (backoff, stop), backoff: wait `retry * 0.3` then retry, stop: stop communicate with request
+        """
+        type_ = CommunicationEvent.Type.Warning
+
+        if e.is_timeout():
+            if retry < max_retry_times or request.is_periodic():
+                self.warn_msg(f'[{self.__class__.__name__}] retry[{retry}]: {e}({request})')
+                return True, False
+            else:
+                self._timeout.set()
+                self._timeout_cnt.increase()
+                type_ = CommunicationEvent.Type.Timeout
+                self._latest_section = CommunicationSection(request, e)
+
+        self.send_event(self._event_cls(type_=type_, data=f'{e}'))
+        self.error_msg(f'[{self.__class__.__name__}] Communication warning: {e}({request})')
+
+        if self._timeout_cnt.great(3, equal=True):
+            msg = 'The number of timeouts exceeds the upper limit'
+            self.error_msg(msg)
+            self.send_event(self._event_cls.disconnected(msg))
+            return False, True
+
+        return False, False
+
+    def _comm_exception(self, request: typing.Optional[CommunicationObject], e: Exception):
+        self.disconnect(send_event=True)
+        self.error_msg(f'[{self.__class__.__name__}] Communication exception: {e}({request})')
+        self._latest_section = CommunicationSection(request, e)
+        self.send_event(self._event_cls.exception(f'Communication exception：{e}'))
+
     def thread_comm_with_device(self):
         while not self._exit:
             try:
@@ -424,7 +637,7 @@ class CommunicationController(abc.ABC):
                     self.send_event(CommunicationEvent.exception(f'{e}'))
                 continue
 
-            if not isinstance(request, CommunicationObject):
+            if not isinstance(request, CommunicationObject) or not self._dequeue_request(request):
                 continue
 
             if self._enable_sim and self._simulate_handle(request):
@@ -446,61 +659,261 @@ class CommunicationController(abc.ABC):
                         cost_time = time.perf_counter() - start_time
 
                         # Decode and check response
-                        try:
-                            response = self._response_cls.from_bytes(request, data)
-                        except CommunicationObjectDecodeError as e:
-                            raw = ' '.join([f'{x:02X}' for x in data])
-                            self.error_msg(f'Decode {request} response error: {e}, (Raw: {raw})')
-                            self._transmit.flush()
-                            continue
-                        else:
-                            self.log_msg_by_request(request, f'RX <{"=" * 16}: {response}')
-
-                            if not self._section_check(request, response, cost_time):
-                                self.error_msg(f'Section check failed: {request!r} {response!r}')
-                                self._transmit.flush()
-                                self._transmit.flush()
-                                continue
-
-                        # Communication restored
-                        self._timeout.clear()
-                        self._timeout_cnt.reset()
-                        if self._timeout.is_falling_edge():
-                            self.send_event(self._event_cls(type_=CommunicationEvent.Type.Restore))
-
-                        self._response_handle(request, response)
-                        self._latest_section = CommunicationSection(request, response)
-                        break
-                    except TransmitWarning as e:
-                        type_ = CommunicationEvent.Type.Warning
+                        if self._comm_response(request, data, cost_time):
+                            break
 
+                        self._transmit.flush()
+                    except TransmitWarning as e:
                         if e.is_timeout():
                             retry += 1
-                            if retry < max_retry_times or request.is_periodic():
-                                self.warn_msg(f'[{self.__class__.__name__}] retry[{retry}]: {e}({request})')
-                                time.sleep(retry * 0.3)
-                                self._transmit.flush()
-                                continue
-                            else:
-                                self._timeout.set()
-                                self._timeout_cnt.increase()
-                                type_ = CommunicationEvent.Type.Timeout
-                                self._latest_section = CommunicationSection(request, e)
-
-                        self.send_event(self._event_cls(type_=type_, data=f'{e}'))
-                        self.error_msg(f'[{self.__class__.__name__}] Communication warning: {e}({request})')
-                        self._transmit.flush()
 
-                        if self._timeout_cnt.great(3, equal=True):
-                            msg = 'The number of timeouts exceeds the upper limit'
-                            self.error_msg(msg)
-                            self.send_event(self._event_cls.disconnected(msg))
+                        backoff, stop = self._comm_warning(request, e, retry, max_retry_times)
+                        if backoff:
+                            time.sleep(retry * 0.3)
+
+                        self._transmit.flush()
+                        if stop:
                             break
                     except self._catch_exception as e:
-                        self.disconnect(send_event=True)
-                        self.error_msg(f'[{self.__class__.__name__}] Communication exception: {e}({request})')
-                        self._latest_section = CommunicationSection(request, e)
-                        self.send_event(self._event_cls.exception(f'Communication exception：{e}'))
+                        self._comm_exception(request, e)
                         break
 
         print(f'[{self.__class__.__name__}]: thread_comm_with_device exit({self._exit.is_set()})!!!')
+
+    async def async_comm_with_device(self):
+        """Communicate with device in event loop, transmit is an AsyncTransmitAdapter"""
+        transmit = self._transmit.transmit
+        self._async_wakeup = asyncio.Event()
+
+        while not self._exit:
+            try:
+                self._async_wakeup.clear()
+                _, request = self._queue.get_nowait()
+            except (queue.Empty, TypeError) as e:
+                if not isinstance(e, queue.Empty):
+                    self.send_event(CommunicationEvent.exception(f'{e}'))
+                    continue
+
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._async_wakeup.wait(), 0.1)
+                continue
+
+            if not isinstance(request, CommunicationObject) or not self._dequeue_request(request):
+                continue
+
+            if self._enable_sim and self._simulate_handle(request):
+                continue
+
+            retry = 0
+            max_retry_times = 1 if request.is_periodic() else self._retry_times
+            with self.section(request):
+                while retry < max_retry_times and not self._exit:
+                    try:
+                        # Send request
+                        start_time = time.perf_counter()
+                        await transmit.tx(request.to_bytes())
+
+                        self.log_msg_by_request(request, f'TX {"=" * 16}>: {request}')
+
+                        # Receive response
+                        data = await transmit.rx(self._response_max_length)
+                        cost_time = time.perf_counter() - start_time
+
+                        # Decode and check response
+                        if self._comm_response(request, data, cost_time):
+                            break
+
+                        await transmit.flush()
+                    except TransmitWarning as e:
+                        if e.is_timeout():
+                            retry += 1
+
+                        backoff, stop = self._comm_warning(request, e, retry, max_retry_times)
+                        if backoff:
+                            await asyncio.sleep(retry * 0.3)
+
+                        await transmit.flush()
+                        if stop:
+                            break
+                    except self._catch_exception as e:
+                        self._comm_exception(request, e)
+                        break
+
+        self._async_wakeup = None
+        print(f'[{self.__class__.__name__}]: async_comm_with_device exit({self._exit.is_set()})!!!')
+
+    def _communication_restored(self):
+        self._timeout.clear()
+        self._timeout_cnt.reset()
+        if self._timeout.is_falling_edge():
+            self.send_event(self._event_cls(type_=CommunicationEvent.Type.Restore))
+
+    def _pipeline_finish(self, inflight: CommunicationInflight, section: CommunicationSection):
+        self._latest_section = section
+        self.send_event(self._event_cls.section_end(inflight.sid, section))
+        self.log_msg_by_request(inflight.request, '>>>\r\n')
+
+    def _pipeline_retry(self, inflight: CommunicationInflight, error: Exception):
+        """Retry in-flight request with the same priority, if retry times is exceeded send timeout event"""
+        retry = inflight.retry + 1
+        max_retry_times = 1 if inflight.request.is_periodic() else self._retry_times
+        if retry < max_retry_times:
+            # Section keeps open across retries, re-queue after the same backoff as stop-and-wait mode
+            self.warn_msg(f'[{self.__class__.__name__}] retry[{retry}]: {error}({inflight.request})')
+            self._inflight_retry[id(inflight.request)] = (retry, inflight.sid)
+            timer = threading.Timer(retry * 0.3, self._pipeline_requeue, args=(inflight.priority, inflight.request))
+            timer.daemon = True
+            timer.start()
+            return
+
+        self._timeout.set()
+        self._timeout_cnt.increase()
+        self._pipeline_finish(inflight, CommunicationSection(inflight.request, error))
+        self.send_event(self._event_cls(type_=CommunicationEvent.Type.Timeout, data=f'{error}'))
+        self.error_msg(f'[{self.__class__.__name__}] Communication warning: {error}({inflight.request})')
+
+        if self._timeout_cnt.great(3, equal=True):
+            msg = 'The number of timeouts exceeds the upper limit'
+            self.error_msg(msg)
+            self.send_event(self._event_cls.disconnected(msg))
+
+    def _pipeline_requeue(self, priority: float, request: CommunicationObject):
+        # Connection is reset during backoff, drop it
+        if not self._exit and id(request) in self._inflight_retry:
+            self._queue.put((priority, request))
+
+    def _pipeline_check_timeout(self):
+        now = time.perf_counter()
+        with self._inflight_cond:
+            expired = [(k, v) for k, v in self._inflight.items() if v.deadline <= now]
+            for key, _ in expired:
+                del self._inflight[key]
+            if expired:
+                self._inflight_cond.notify_all()
+
+        for _, inflight in expired:
+            self._pipeline_retry(inflight, TransmitWarning(f'timeout({now - inflight.start:.3f}s)'))
+
+    def _pipeline_exception(self, request: CommunicationObject, e: Exception):
+        self._comm_exception(request, e)
+
+        with self._inflight_cond:
+            self._inflight.clear()
+            self._inflight_retry.clear()
+            self._inflight_cond.notify_all()
+
+    def thread_pipeline_tx(self):
+        while not self._exit:
+            try:
+                priority, request = self._queue.get(timeout=0.01)
+            except (queue.Empty, TypeError) as e:
+                if not isinstance(e, queue.Empty):
+                    self.send_event(CommunicationEvent.exception(f'{e}'))
+                continue
+
+            # Retried request reuses it's section
+            retry, sid = self._inflight_retry.pop(id(request), (0, None))
+            if not isinstance(request, CommunicationObject) or not self._dequeue_request(request):
+                continue
+
+            if self._enable_sim and self._simulate_handle(request):
+                continue
+
+            # Wait a free window slot, request without correlation id must wait all in-flight requests finished
+            tag = request.correlation_id()
+            with self._inflight_cond:
+                while not self._exit:
+                    if tag is None and not self._inflight:
+                        break
+
+                    if tag is not None and None not in self._inflight and \
+                            tag not in self._inflight and len(self._inflight) < self._pipeline_window:
+                        break
+
+                    self._inflight_cond.wait(0.01)
+                else:
+                    break
+
+                start = time.perf_counter()
+                if sid is None:
+                    sid = self._section_seq.data
+                    self._section_seq.increase()
+
+                self._inflight[tag] = CommunicationInflight(
+                    priority=priority, request=request, sid=sid,
+                    start=start, deadline=start + (self.timeout or Transmit.DEFAULT_TIMEOUT), retry=retry
+                )
+                self._inflight_cond.notify_all()
+
+            if not retry:
+                self.send_event(self._event_cls.section_start(sid))
+                self.log_msg_by_request(request, f'[Section: {sid: 07d}]')
+
+            try:
+                self._transmit.tx(request.to_bytes())
+                self.log_msg_by_request(request, f'TX {"=" * 16}>: {request}')
+            except TransmitWarning as e:
+                with self._inflight_cond:
+                    inflight = self._inflight.pop(tag, None)
+                    self._inflight_cond.notify_all()
+
+                if inflight is not None:
+                    self._pipeline_retry(inflight, e)
+            except self._catch_exception as e:
+                self._pipeline_exception(request, e)
+
+        print(f'[{self.__class__.__name__}]: thread_pipeline_tx exit({self._exit.is_set()})!!!')
+
+    def thread_pipeline_rx(self):
+        while not self._exit:
+            self._pipeline_check_timeout()
+
+            with self._inflight_cond:
+                if not self._inflight:
+                    self._inflight_cond.wait(0.01)
+                    continue
+
+            try:
+                data = self._transmit.rx(self._response_max_length)
+            except TransmitWarning as e:
+                if not e.is_timeout():
+                    self.send_event(self._event_cls(type_=CommunicationEvent.Type.Warning, data=f'{e}'))
+                    self.error_msg(f'[{self.__class__.__name__}] Communication warning: {e}')
+                continue
+            except self._catch_exception as e:
+                self._pipeline_exception(None, e)
+                continue
+
+            # Find matched request, response without correlation id matches request without it
+            tag = self._response_cls.correlation_id_from_bytes(data)
+            with self._inflight_cond:
+                inflight = self._inflight.pop(tag, None)
+                self._inflight_cond.notify_all()
+
+            if inflight is None:
+                raw = ' '.join([f'{x:02X}' for x in data])
+                self.warn_msg(f'[{self.__class__.__name__}] Unmatched response: {tag!r}, (Raw: {raw})')
+                continue
+
+            request = inflight.request
+            cost_time = time.perf_counter() - inflight.start
+
+            try:
+                response = self._response_cls.from_bytes(request, data)
+            except CommunicationObjectDecodeError as e:
+                raw = ' '.join([f'{x:02X}' for x in data])
+                self.error_msg(f'Decode {request} response error: {e}, (Raw: {raw})')
+                self._pipeline_retry(inflight, e)
+                continue
+
+            self.log_msg_by_request(request, f'RX <{"=" * 16}: {response}')
+            if not self._section_check(request, response, cost_time):
+                self.error_msg(f'Section check failed: {request!r} {response!r}')
+                self._pipeline_retry(inflight, CommunicationObjectDecodeError('section check failed'))
+                continue
+
+            self._communication_restored()
+            self._response_handle(request, response)
+            self._pipeline_finish(inflight, CommunicationSection(request, response))
+
+        print(f'[{self.__class__.__name__}]: thread_pipeline_rx exit({self._exit.is_set()})!!!')
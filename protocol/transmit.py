@@ -11,10 +11,12 @@ from typing import Callable, List, Optional
 from google.protobuf.message import Message, DecodeError
 
 
+from .framer import Framer
 from .serialport import SerialPort
 from ..misc.debug import get_stack_info
 from ..core.threading import ThreadSafeBool
-from ..network.utility import create_socket_and_connect, set_keepalive, tcp_socket_recv_data, tcp_socket_send_data
+from ..network.utility import create_socket_and_connect, set_keepalive, \
+    tcp_socket_recv_data, tcp_socket_recv_into, tcp_socket_send_data
 __all__ = ['Transmit', 'TransmitWarning', 'TransmitException',
            'UARTTransmit', 'UartTransmitCustomize', 'UartTransmitWithProtobufEndingCheck',
            'TCPClientTransmit', 'TCPServerTransmit', 'TCPSocketTransmit', 'TCPServerTransmitHandle']
@@ -99,15 +101,17 @@ class UARTTransmit(Transmit):
     def __init__(self, length_fmt: str = '',
                  checksum: Optional[Callable[[bytes], int]] = None,
                  ending_check: Optional[Callable[[bytes], bool]] = None,
-                 verbose: bool = False, processing: bool = False):
+                 verbose: bool = False, processing: bool = False, framer: Optional[Framer] = None):
         """
         UARTTransmit
         :param length_fmt: msg header length struct pack format
         :param checksum: msg tail checksum algo
         :param ending_check: msg ending check
         :param verbose:  print verbose message
+        :param framer: streaming framer, if set `length_fmt` and `ending_check` are ignored when receiving
         """
         self.__serial = None
+        self.__framer = framer
         self.__checksum = checksum
         self.__length_fmt = length_fmt
         self.__ending_check = ending_check
@@ -132,6 +136,10 @@ class UARTTransmit(Transmit):
 
     def rx(self, size: int, timeout: float = None) -> bytes:
         try:
+            # Framer keeps leftover bytes, only new received bytes will be processed
+            if self.__framer is not None:
+                return self.__check_rx_data(self.__serial.read_frame(timeout))
+
             # Receive length first, without ending check
             if self.__length_fmt:
                 header = self.__serial.read(struct.calcsize(self.__length_fmt), timeout)
@@ -141,24 +149,26 @@ class UARTTransmit(Transmit):
                 # Get length from header
                 size = struct.unpack(self.__length_fmt, header)[0]
 
-            data = self.__serial.read(size, timeout)
-            self.print_msg(('rx: {0:03d} {1}'.format(len(data), self.hex_convert(data))))
-
-            # Check received data length
-            if len(data) < self.RESPONSE_MIN_LEN:
-                raise TransmitWarning("Too short:{}".format(len(data)))
-
-            # Check data checksum
-            if callable(self.__checksum) and self.__checksum(data):
-                raise TransmitWarning("Crc16 verify failed")
-
-            # Return payload
-            return data[0:-2] if callable(self.__checksum) else data
+            return self.__check_rx_data(self.__serial.read(size, timeout))
         except serial.SerialTimeoutException as err:
             raise TransmitWarning(err)
         except (struct.error, serial.SerialException, MemoryError) as err:
             raise TransmitException(err)
 
+    def __check_rx_data(self, data: bytes) -> bytes:
+        self.print_msg(('rx: {0:03d} {1}'.format(len(data), self.hex_convert(data))))
+
+        # Check received data length
+        if len(data) < self.RESPONSE_MIN_LEN:
+            raise TransmitWarning("Too short:{}".format(len(data)))
+
+        # Check data checksum
+        if callable(self.__checksum) and self.__checksum(data):
+            raise TransmitWarning("Crc16 verify failed")
+
+        # Return payload
+        return data[0:-2] if callable(self.__checksum) else data
+
     def flush(self):
         self.__serial.flush()
 
@@ -187,8 +197,8 @@ class UARTTransmit(Transmit):
         """
         try:
             self._timeout = timeout or self.DEFAULT_TIMEOUT
-            self.__serial = SerialPort(port=address[0], baudrate=address[1],
-                                       timeout=self._timeout, ending_check=self.__ending_check)
+            self.__serial = SerialPort(port=address[0], baudrate=address[1], timeout=self._timeout,
+                                       ending_check=self.__ending_check, framer=self.__framer)
             self.__serial.flush()
             return self._update(address, timeout, True)
         except serial.SerialException as err:
@@ -205,7 +215,8 @@ class TCPSocketTransmit(Transmit):
     DefaultLengthFormat = '>L'
 
     def __init__(self, sock: socket.socket, address: Transmit.Address = ('', -1),
-                 length_fmt: str = '', processing: bool = False, disconnect_callback: Optional[Callable] = None):
+                 length_fmt: str = '', processing: bool = False, disconnect_callback: Optional[Callable] = None,
+                 zero_copy: bool = False):
         """
         TCPSocketTransmit
         :param sock: socket instance
@@ -213,10 +224,12 @@ class TCPSocketTransmit(Transmit):
         :param length_fmt: msg header length struct pack format
         :param processing: is multiple processing env
         :param disconnect_callback: disconnect callback
+        :param zero_copy: rx return memoryview of the receive buffer instead of bytes
         """
         super(TCPSocketTransmit, self).__init__(processing)
         self._socket = sock
         self._address = address
+        self._zero_copy = zero_copy
         self._length_fmt = length_fmt
         self._disconnect_callback = disconnect_callback
 
@@ -231,8 +244,8 @@ class TCPSocketTransmit(Transmit):
 
     def tx(self, data: bytes) -> bool:
         try:
-            msg = struct.pack(self._length_fmt, len(data)) + data if self._length_fmt else data
-            return sum(tcp_socket_send_data(self._socket, msg)) == len(msg)
+            size = len(data) + struct.calcsize(self._length_fmt) if self._length_fmt else len(data)
+            return sum(tcp_socket_send_data(self._socket, data, self._length_fmt)) == size
         except socket.timeout as err:
             raise TransmitWarning(err)
         except (socket.error, ConnectionError) as err:
@@ -245,17 +258,23 @@ class TCPSocketTransmit(Transmit):
 
         try:
             if self._length_fmt:
-                header = self._socket.recv(struct.calcsize(self._length_fmt))
+                header = bytearray(struct.calcsize(self._length_fmt))
+                received = self._socket.recv_into(header)
                 # Peer closed
-                if not header:
+                if not received:
                     self.disconnect()
-                    return header
+                    return bytes()
+
+                # Header may be received partially
+                received += tcp_socket_recv_into(self._socket, memoryview(header)[received:])
+                if received != len(header):
+                    raise TransmitWarning(f'rx header timeout({received}/{len(header)})')
 
                 # Get message length first
                 size = struct.unpack(self._length_fmt, header)[0]
 
             # Read payload data
-            data = tcp_socket_recv_data(self._socket, size)
+            data = tcp_socket_recv_data(self._socket, size, zero_copy=self._zero_copy)
 
             # Peer closed
             if not self._length_fmt and not data:
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import argparse
+import tempfile
+import resource
+from ..misc.crypto import AESCrypto
+
+
+# Usage: python -m PyAppFramework.tests.aes_stream_benchmark --sizes 1 100 1024 --legacy_limit=128
+def create_file(path: str, size: int):
+    chunk = os.urandom(1024 * 1024)
+    with open(path, 'wb') as fp:
+        for _ in range(size):
+            fp.write(chunk)
+
+
+def measure(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def max_rss() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 100, 1024], help='Synthetic file size in MB')
+    parser.add_argument('--legacy_limit', type=int, default=128, help='Skip whole file encrypt above this size(MB)')
+    args = parser.parse_args()
+
+    aes = AESCrypto(b'PyAppFramework')
+    path = tempfile.mkdtemp()
+    src, encrypted, decrypted = [os.path.join(path, x) for x in ('src', 'encrypted', 'decrypted')]
+
+    # Streaming first, max rss is process wide peak, legacy peak would hide streaming peak
+    print(f'{"size(MB)":>8} {"mode":>8} {"encrypt(MB/s)":>14} {"decrypt(MB/s)":>14} {"max rss(MB)":>12}')
+    for streaming in (True, False):
+        for size in args.sizes:
+            if not streaming and size > args.legacy_limit:
+                continue
+
+            create_file(src, size)
+            encrypt = measure(aes.encrypt_file, src, encrypted, streaming)
+            decrypt = measure(aes.decrypt_file, encrypted, decrypted, streaming)
+            mode = 'stream' if streaming else 'legacy'
+            print(f'{size:>8} {mode:>8} {size / encrypt:>14.2f} {size / decrypt:>14.2f} {max_rss():>12.1f}')
+
+    for name in (src, encrypted, decrypted):
+        os.unlink(name)
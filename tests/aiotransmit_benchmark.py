@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+import time
+import asyncio
+import argparse
+import resource
+import threading
+import tracemalloc
+from ..protocol.aiotransmit import AsyncTCPServer, AsyncTCPClientTransmit, AsyncTCPSocketTransmit
+
+
+# Usage: python -m PyAppFramework.tests.aiotransmit_benchmark --duration=5
+LENGTH_FMT = '>H'
+
+
+async def echo(transmit: AsyncTCPSocketTransmit):
+    while transmit.connected:
+        data = await transmit.rx(0, timeout=0)
+        if not data:
+            break
+
+        await transmit.tx(data)
+
+
+async def client(transmit: AsyncTCPClientTransmit, payload: bytes, stop: float) -> int:
+    count = 0
+    while time.perf_counter() < stop:
+        await transmit.tx(payload)
+        if await transmit.rx(0) != payload:
+            break
+
+        count += 1
+
+    return count
+
+
+async def benchmark(connections: int, duration: float, payload_size: int) -> dict:
+    tracemalloc.start()
+    payload = bytes(range(256)) * (payload_size // 256) + bytes(payload_size % 256)
+
+    servers = list()
+    for _ in range(connections):
+        server = AsyncTCPServer(echo, length_fmt=LENGTH_FMT)
+        await server.start(('127.0.0.1', 0))
+        servers.append(server)
+
+    clients = list()
+    for server in servers:
+        transmit = AsyncTCPClientTransmit(length_fmt=LENGTH_FMT)
+        await transmit.connect(server.address, 1.0)
+        clients.append(transmit)
+
+    # Memory used by servers and connections, tracing is stopped before throughput benchmark
+    memory, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    counts = await asyncio.gather(*[client(x, payload, start + duration) for x in clients])
+    cost = time.perf_counter() - start
+
+    threads = threading.active_count()
+    for transmit in clients:
+        await transmit.disconnect()
+
+    for server in servers:
+        await server.stop()
+
+    return dict(throughput=sum(counts) / cost, memory=memory / 1024 / 1024, threads=threads)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--duration', type=float, default=5.0, help='Each benchmark duration in second')
+    parser.add_argument('--payload', type=int, default=64, help='Echo payload size')
+    args = parser.parse_args()
+
+    # Each connection needs 3 fds: listener, server side and client side
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+    print(f'{"connections":>12} {"msg/s":>12} {"memory(MB)":>12} {"threads":>8}')
+    for number in (10, 100, 1000):
+        r = asyncio.run(benchmark(number, args.duration, args.payload))
+        print(f'{number:>12} {r["throughput"]:>12.2f} {r["memory"]:>12.2f} {r["threads"]:>8}')
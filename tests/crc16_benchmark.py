@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+import os
+import timeit
+import argparse
+from ..protocol.crc16 import crc16, crc16IBM, crc16_fast, crc16IBM_fast, CRC16
+
+
+# Usage: python -m PyAppFramework.tests.crc16_benchmark --max-size=1048576
+def throughput(func, data: bytes) -> float:
+    number = max(1, (1 << 20) // len(data))
+    cost = min(timeit.repeat(lambda: func(data), number=number, repeat=3)) / number
+    return len(data) / cost / 1024 / 1024
+
+
+def streaming(data: bytes, chunk: int = 64) -> CRC16:
+    crc = CRC16()
+    for i in range(0, len(data), chunk):
+        crc.update(data[i:i + chunk])
+    return crc
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--max-size', type=int, default=1 << 20, help='Max input size')
+    args = parser.parse_args()
+
+    functions = (
+        ('crc16', crc16),
+        ('crc16_fast', crc16_fast),
+        ('CRC16.update(64B chunk)', streaming),
+        ('crc16IBM', crc16IBM),
+        ('crc16IBM_fast', crc16IBM_fast),
+    )
+
+    sizes = [x for x in (256, 4096, 65536, 1 << 20) if x <= args.max_size]
+    print(f'{"MB/s":<24}' + ''.join(f'{size:>12}' for size in sizes))
+    for name, func in functions:
+        print(f'{name:<24}' + ''.join(f'{throughput(func, os.urandom(size)):>12.2f}' for size in sizes))
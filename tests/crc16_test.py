@@ -23,6 +23,40 @@ class CRC16Test(unittest.TestCase):
         with self.assertRaises(TypeError):
             crc16(123)
 
+        with self.assertRaises(TypeError):
+            crc16_fast("1212")
+
+        with self.assertRaises(TypeError):
+            crc16_fast(123)
+
+    def testFast(self):
+        data = bytes(range(256)) * 4
+        self.assertEqual(crc16_fast(b"123456789"), 0x4b37)
+        self.assertEqual(crc16IBM_fast(b"123456789"), 0xbb3d)
+        self.assertEqual(crc16_fast(data), crc16(data))
+        self.assertEqual(crc16IBM_fast(data), crc16IBM(data))
+        self.assertEqual(crc16_fast(list(data)), crc16(data))
+        self.assertEqual(crc16_fast(bytearray(data)), crc16(data))
+        self.assertEqual(crc16_fast(memoryview(data)[10:100]), crc16(data[10:100]))
+
+    def testStream(self):
+        data = bytes(range(256)) * 4
+        for init, reference in ((CRC16.MODBUS, crc16), (CRC16.IBM, crc16IBM)):
+            crc = CRC16(init=init)
+            for i in range(0, len(data), 7):
+                crc.update(data[i:i + 7])
+
+            self.assertEqual(crc.value, reference(data))
+            crc.reset()
+            self.assertEqual(crc.update(data[:10]).value, reference(data[:10]))
+
+        # Modbus frame with crc appended, crc of the whole frame is zero
+        crc = CRC16(b"amaork0123456789")
+        copy = crc.copy()
+        self.assertEqual(crc.digest(), crc16(b"amaork0123456789").to_bytes(2, 'little'))
+        self.assertEqual(crc.update(crc.digest()).value, 0)
+        self.assertEqual(copy.value, 0xb251)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,4 +1,7 @@
 # -*- coding: utf-8 -*-
+import io
+import os
+import tempfile
 import unittest
 from ..misc.crypto import *
 
@@ -42,6 +45,51 @@ class CRC16Test(unittest.TestCase):
         self.assertEqual(self.aes_cbc.decrypt(self.aes_cbc.encrypt(b'hello')), b'hello')
         self.assertEqual(self.aes_cbc.decrypt(self.aes_cbc.encrypt(bytes(range(256)))) == bytes(range(256)), True)
 
+    def testAESStream(self):
+        data = os.urandom(100000)
+        for size in (0, 1, 1000, 1024, 4096, len(data)):
+            stream = io.BytesIO()
+            self.aes_cbc.encrypt_stream(io.BytesIO(data[:size]), stream, chunk_size=1024)
+            self.assertEqual(b''.join(self.aes_cbc.decrypt_iter(io.BytesIO(stream.getvalue()))), data[:size])
+
+        # Iterator source and any size pieces
+        pieces = [data[i:i + 777] for i in range(0, len(data), 777)]
+        stream = b''.join(self.aes_ecb.encrypt_iter(pieces, chunk_size=4096))
+        pieces = [stream[i:i + 333] for i in range(0, len(stream), 333)]
+        self.assertEqual(b''.join(self.aes_ecb.decrypt_iter(pieces)), data)
+
+        # Progress
+        progress = list()
+        list(self.aes_ecb.encrypt_iter(io.BytesIO(data), 40000, progress.append))
+        self.assertEqual(progress, [40000, 80000, 100000])
+
+        # Tampered, truncated, dropped final chunk or wrong key
+        tampered = bytearray(stream)
+        tampered[100] ^= 0x1
+        self.assertRaises(ValueError, list, self.aes_ecb.decrypt_iter([bytes(tampered)]))
+        self.assertRaises(ValueError, list, self.aes_ecb.decrypt_iter([stream[:-1]]))
+        self.assertRaises(ValueError, list, self.aes_ecb.decrypt_iter([stream[:17 + 5 + 4096 + 16]]))
+        self.assertRaises(ValueError, list, AESCrypto(key=b'amaork1').decrypt_iter([stream]))
+        self.assertRaises(ValueError, list, self.aes_ecb.decrypt_iter([b'AESX' + stream[4:]]))
+        self.assertRaises(ValueError, list, self.aes_ecb.encrypt_iter([data], chunk_size=0))
+
+    def testAESStreamFile(self):
+        path = tempfile.mkdtemp()
+        src, encrypted, decrypted = [os.path.join(path, x) for x in ('src', 'encrypted', 'decrypted')]
+        with open(src, 'wb') as fp:
+            fp.write(os.urandom(AESCrypto.STREAM_CHUNK_SIZE * 3 + 1))
+
+        progress = list()
+        self.aes_cbc.encrypt_file(src, encrypted, streaming=True, progress=lambda *x: progress.append(x))
+        self.aes_cbc.decrypt_file(encrypted, decrypted, streaming=True)
+        self.assertEqual(progress[-1], (os.path.getsize(src), os.path.getsize(src)))
+
+        with open(src, 'rb') as fp1, open(decrypted, 'rb') as fp2:
+            self.assertEqual(fp1.read(), fp2.read())
+
+        for name in (src, encrypted, decrypted):
+            os.unlink(name)
+
     def testDESEncrypt(self):
         string = "amaork0123456789"
         self.assertEqual(self.des.decrypt(self.des.encrypt(string.encode())).decode(), string)
@@ -50,6 +98,39 @@ class CRC16Test(unittest.TestCase):
         string = "amaork0123456789"
         self.assertEqual(self.private_key.decrypt(self.public_key.encrypt(string.encode())).decode(), string)
 
+    def testRSAEnvelope(self):
+        data = os.urandom(50000)
+        envelope = self.public_key.envelope_encrypt(data)
+        self.assertEqual(self.private_key.envelope_decrypt(envelope), data)
+        self.assertEqual(self.private_key.envelope_decrypt(self.public_key.envelope_encrypt(b'')), b'')
+        self.assertLess(len(envelope), len(data) + 512)
+
+        # Streaming
+        progress = list()
+        pieces = list(self.public_key.envelope_encrypt_iter(io.BytesIO(data), 16384))
+        self.assertEqual(b''.join(self.private_key.envelope_decrypt_iter(pieces, progress.append)), data)
+        self.assertEqual(progress, [16384, 32768, 49152, 50000])
+
+        # Tampered, public key could not decrypt, other key pair
+        tampered = bytearray(envelope)
+        tampered[-1] ^= 0x1
+        self.assertEqual(self.private_key.envelope_decrypt(bytes(tampered)), b'')
+        self.assertEqual(self.private_key.envelope_decrypt(envelope[:-1]), b'')
+        self.assertEqual(self.public_key.envelope_decrypt(envelope), b'')
+        self.assertRaises(ValueError, list, self.public_key.envelope_decrypt_iter(envelope))
+        other = RSAPrivateKeyHandle(RSAKeyHandle.generate_key_pair(bits=1024).private_key)
+        self.assertEqual(other.envelope_decrypt(envelope), b'')
+
+    def testCryptoCommunication(self):
+        data = os.urandom(20000)
+        for envelope in (False, True):
+            self.assertEqual(
+                crypto_communication(self.public_key, self.private_key, data, lambda x: x, envelope=envelope), data
+            )
+
+        with self.assertRaises(CryptoCommVerifyException):
+            crypto_communication(self.public_key, self.private_key, data, lambda x: b'0' + x[1:], envelope=True)
+
     def testRSAMessageSign(self):
         string = "amaork0123456789"
         signature = self.private_key.sign(string.encode())
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import argparse
+import tempfile
+from ..core.database import SQLiteDatabase
+
+
+# Usage: python -m PyAppFramework.tests.database_benchmark --rows 1000 100000
+def legacy_insert_record(db: SQLiteDatabase, name: str, record: tuple):
+    """insertRecord before schema cache: inspect table for each record"""
+    column_names = db.getColumnList(name)
+    column_length = len(column_names) - 1 if db.isAutoincrement(name) else len(column_names)
+    assert column_length == len(record) or len(column_names) == len(record)
+    db.raw_cursor.execute("INSERT INTO {} VALUES({})".format(name, ", ".join(['?'] * len(record))), record)
+
+
+def benchmark(rows: int, bulk: bool) -> float:
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    db = SQLiteDatabase(path)
+    db.rawExecute('CREATE TABLE measurement (id INTEGER PRIMARY KEY AUTOINCREMENT, station TEXT, '
+                  'channel INTEGER, value REAL, timestamp REAL)')
+    records = [(i, 'station', i % 16, i * 0.1, time.time()) for i in range(rows)]
+
+    start = time.perf_counter()
+    if bulk:
+        db.insertRecords('measurement', records)
+    else:
+        # Row by row and commit per call
+        for record in records:
+            legacy_insert_record(db, 'measurement', record)
+            db.commit()
+
+    cost = time.perf_counter() - start
+    assert db.getRowCount('measurement') == rows
+
+    db.raw_connect.close()
+    os.unlink(path)
+    return cost
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 100000], help='Insert rows number')
+    args = parser.parse_args()
+
+    print(f'{"rows":>8} {"insertRecord(s)":>16} {"insertRecords(s)":>17} {"speedup":>8}')
+    for number in args.rows:
+        legacy, bulk = benchmark(number, False), benchmark(number, True)
+        print(f'{number:>8} {legacy:>16.3f} {bulk:>17.3f} {legacy / bulk:>8.1f}')
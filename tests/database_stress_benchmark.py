@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import sqlite3
+import argparse
+import tempfile
+import threading
+from ..core.database import SQLiteDatabase, SQLiteDatabaseError
+
+
+# Usage: python -m PyAppFramework.tests.database_stress_benchmark --readers=4 --duration=5
+def create_database() -> str:
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    db = SQLiteDatabase(path)
+    db.rawExecute('CREATE TABLE log (id INTEGER PRIMARY KEY AUTOINCREMENT, station TEXT, value REAL, ts REAL)')
+    db.insertRecords('log', [('station', i * 0.1, time.time()) for i in range(10000)])
+    db.close()
+    return path
+
+
+def stress(path: str, concurrent: bool, readers: int, duration: float, timeout: float) -> dict:
+    counter = dict(reads=0, writes=0, errors=0)
+    lock = threading.Lock()
+    stop = threading.Event()
+    shared = SQLiteDatabase(path, timeout=timeout, concurrent=True) if concurrent else None
+
+    def database() -> SQLiteDatabase:
+        # Legacy: each thread has it's own connection in rollback journal mode
+        return shared or SQLiteDatabase(path, timeout=timeout)
+
+    def count(key: str):
+        with lock:
+            counter[key] += 1
+
+    def reader():
+        db = database()
+        while not stop.is_set():
+            try:
+                db.getLimitRowData('log', 50, 'id', latest=True)
+                db.getRowCount('log')
+                count('reads')
+            except (SQLiteDatabaseError, sqlite3.OperationalError):
+                count('errors')
+
+    def writer():
+        db = database()
+        while not stop.is_set():
+            try:
+                db.insertRecords('log', [('station', 0.1, time.time())] * 10)
+                count('writes')
+            except (SQLiteDatabaseError, sqlite3.OperationalError):
+                count('errors')
+
+    threads = [threading.Thread(target=reader) for _ in range(readers)] + [threading.Thread(target=writer)]
+    for th in threads:
+        th.start()
+
+    time.sleep(duration)
+    stop.set()
+    for th in threads:
+        th.join()
+
+    if shared:
+        shared.close()
+
+    return dict(reads=counter['reads'] / duration, writes=counter['writes'] / duration, errors=counter['errors'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--readers', type=int, default=4, help='Reader threads number')
+    parser.add_argument('--duration', type=float, default=5.0, help='Each stress duration in second')
+    parser.add_argument('--timeout', type=float, default=0.05, help='Connection busy timeout')
+    args = parser.parse_args()
+
+    print(f'{"mode":>12} {"reads/s":>10} {"writes/s":>10} {"lock errors":>12}')
+    for mode in (False, True):
+        db_path = create_database()
+        r = stress(db_path, mode, args.readers, args.duration, args.timeout)
+        print(f'{"concurrent" if mode else "legacy":>12} {r["reads"]:>10.1f} {r["writes"]:>10.1f} {r["errors"]:>12}')
+
+        for file in (db_path, f'{db_path}-wal', f'{db_path}-shm'):
+            if os.path.isfile(file):
+                os.unlink(file)
@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import sqlite3
+import unittest
+import tempfile
+import threading
+from ..misc.settings import UiLogMessage
+from ..core.database import SQLiteDatabase, SQLiteDatabaseError, SQLiteWriteBehind, \
+    DBTable, DBColumn, DBItemType, DBItemSearchAttr, sqlite_create_tables, sqlite_fts_sentences
+
+
+class SQLiteDatabaseBulkTest(unittest.TestCase):
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+
+        self.db = SQLiteDatabase(self.path)
+        self.db.rawExecute('CREATE TABLE log (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT, value REAL)')
+        self.db.rawExecute('CREATE TABLE kv (key TEXT PRIMARY KEY, value INTEGER)')
+
+    def tearDown(self) -> None:
+        self.db.raw_connect.close()
+        os.unlink(self.path)
+
+    def testSchema(self):
+        schema = self.db.getTableSchema('log')
+        self.assertEqual(schema.columns, ('id', 'name', 'value'))
+        self.assertEqual(schema.pk, 'id')
+        self.assertTrue(schema.autoincrement)
+        self.assertFalse(self.db.getTableSchema('kv').autoincrement)
+        self.assertIs(self.db.getTableSchema('log'), schema)
+
+        self.db.deleteTable('log')
+        self.db.createTable('log', [('id', 'INTEGER', False, None, True), ('name', 'TEXT', True, None, False)])
+        self.assertEqual(self.db.getTableSchema('log').columns, ('id', 'name'))
+        self.assertRaises(SQLiteDatabaseError, self.db.getTableSchema, 'unknown')
+
+    def testInsertRecords(self):
+        rows = [(f'ch{i}', i * 0.5) for i in range(1000)]
+        self.assertEqual(self.db.insertRecords('log', rows), len(rows))
+        self.assertEqual(self.db.insertRecords('log', [(2000, 'full', 1.0)]), 1)
+        self.assertEqual(self.db.insertRecords('log', []), 0)
+
+        self.db.insertRecord('log', ('single', 2.0))
+        self.db.insertRecord('log', ['single', 3.0])
+        self.db.commit()
+
+        self.assertEqual(self.db.getRowCount('log'), 1003)
+        self.assertEqual(self.db.selectRecord('log', ['name', 'value'], 'id = 1'), [('ch0', 0.0)])
+        self.assertEqual(self.db.selectRecord('log', ['id'], 'name = "single"'), [(2001,), (2002,)])
+
+        self.assertRaises(TypeError, self.db.insertRecord, 'log', 'single')
+        self.assertRaises(SQLiteDatabaseError, self.db.insertRecords, 'log', [('a', 1.0), ('b',)])
+        self.assertRaises(SQLiteDatabaseError, self.db.insertRecords, 'kv', [('a',)])
+
+    def testRollback(self):
+        self.db.insertRecords('kv', [('a', 1)])
+        self.assertRaises(SQLiteDatabaseError, self.db.insertRecords, 'kv', [('b', 2), ('a', 3)])
+        self.assertEqual(self.db.selectRecord('kv'), [('a', 1)])
+
+    def testUpsertRecords(self):
+        self.db.insertRecords('kv', [('a', 1), ('b', 2)])
+        self.assertEqual(self.db.upsertRecords('kv', [('b', 20), ('c', 30)]), 2)
+        self.assertEqual(self.db.selectRecord('kv'), [('a', 1), ('b', 20), ('c', 30)])
+
+        self.assertRaises(SQLiteDatabaseError, self.db.upsertRecords, 'kv', [('a',)])
+        if sqlite3.sqlite_version_info >= (3, 24, 0):
+            self.db.upsertRecords('log', [(1, 'x', 1.0), (1, 'y', 2.0)])
+            self.assertEqual(self.db.selectRecord('log'), [(1, 'y', 2.0)])
+
+
+@unittest.skipIf(sqlite3.sqlite_version_info < (3, 34, 0), 'fts5 trigram tokenizer requires sqlite >= 3.34.0')
+class SQLiteDatabaseFTSTest(unittest.TestCase):
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+
+        self.db = SQLiteDatabase(self.path)
+        self.db.rawExecute('CREATE TABLE log (id INTEGER PRIMARY KEY AUTOINCREMENT, sn TEXT, content TEXT)')
+        self.db.insertRecords('log', [('SN0001', 'power on'), ('SN0002', "it's ok"), ('SN1001', 'power off')])
+
+    def tearDown(self) -> None:
+        self.db.close()
+        os.unlink(self.path)
+
+    def search(self, column: str, value: str) -> list:
+        return [x[0] for x in self.db.selectRecord('log', ['id'], self.db.searchCondition('log', column, value))]
+
+    def testIndex(self):
+        self.assertFalse(self.db.hasFTSIndex('log'))
+        self.assertEqual(self.search('sn', '100'), [3])
+
+        self.db.createFTSIndex('log', ['sn', 'content'])
+        self.assertTrue(self.db.hasFTSIndex('log'))
+        self.assertIn('MATCH', self.db.searchCondition('log', 'sn', '100'))
+
+        # Index is built from exist records
+        self.assertEqual(self.search('sn', '100'), [3])
+        self.assertEqual(self.search('sn', 'SN0'), [1, 2])
+        self.assertEqual(self.search('content', 'power'), [1, 3])
+        self.assertEqual(self.search('content', "t's"), [2])
+        self.assertEqual(self.search('content', 'SN0'), [])
+
+        # Less than 3 characters fallback to like
+        self.assertEqual(self.search('content', 'of'), [3])
+
+        self.db.dropFTSIndex('log')
+        self.assertFalse(self.db.hasFTSIndex('log'))
+        self.assertEqual(self.search('content', 'power'), [1, 3])
+
+    def testSync(self):
+        self.db.createFTSIndex('log', ['sn', 'content'])
+        self.db.insertRecords('log', [('SN2001', 'power reset')])
+        self.assertEqual(self.search('content', 'power'), [1, 3, 4])
+
+        self.db.updateRecord('log', {'content': 'reboot'}, 'id = 4')
+        self.assertEqual(self.search('content', 'power'), [1, 3])
+        self.assertEqual(self.search('content', 'reboot'), [4])
+
+        self.db.deleteRecord('log', 'id = 1', commit=True)
+        self.assertEqual(self.search('content', 'power'), [3])
+        self.assertEqual(self.search('sn', 'SN0'), [2])
+
+
+class UnsupportedFTSTable(DBTable):
+    def get_fts_sentences(self):
+        # As trigram tokenizer on sqlite < 3.34.0
+        return sqlite_fts_sentences(self.name, self.get_fts_columns(), tokenize='unknown')
+
+
+class SQLiteDatabaseFTSFallbackTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.path = os.path.join(tempfile.mkdtemp(), 'fallback.db')
+        self.tbl = UnsupportedFTSTable('log', [
+            DBColumn(name='id', type=DBItemType.int, attr='PRIMARY KEY AUTOINCREMENT'),
+            DBColumn(name='content', type=DBItemType.text, search_attr=DBItemSearchAttr.Fuzzy),
+        ], fts=True)
+
+    def tearDown(self) -> None:
+        os.unlink(self.path)
+        os.rmdir(os.path.dirname(self.path))
+
+    def testCreateTables(self):
+        # Index is skipped, table is created and searched by LIKE
+        self.assertTrue(sqlite_create_tables(self.path, [self.tbl]))
+        db = SQLiteDatabase(self.path)
+        try:
+            self.assertFalse(db.hasFTSIndex('log'))
+            db.insertRecords('log', [('power on',), ('power off',)])
+            self.assertNotIn('MATCH', db.searchCondition('log', 'content', 'off'))
+            self.assertEqual(db.selectRecord('log', ['id'], db.searchCondition('log', 'content', 'off')), [(2,)])
+        finally:
+            db.close()
+
+
+class SQLiteDatabaseInstrumentTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.path = os.path.join(tempfile.mkdtemp(), 'instrument.db')
+        self.tbl = DBTable('log', [
+            DBColumn(name='id', type=DBItemType.int, attr='PRIMARY KEY AUTOINCREMENT'),
+            DBColumn(name='sn', type=DBItemType.text),
+            DBColumn(name='ts', type=DBItemType.real),
+            DBColumn(name='level', type=DBItemType.text),
+        ], indexes=[('ts',)])
+
+        self.assertTrue(sqlite_create_tables(self.path, [self.tbl]))
+        self.db = SQLiteDatabase(self.path, instrument=True)
+        self.db.enableInstrument(scan_threshold=100)
+        self.db.insertRecords('log', [(f'SN{i}', float(i), 'INFO') for i in range(1000)])
+
+    def tearDown(self) -> None:
+        self.db.close()
+        os.unlink(self.path)
+
+    def testIndexes(self):
+        self.assertEqual(self.db.listIndexes('log'), {'log_ts_idx': ('ts',)})
+        self.assertEqual(self.db.createIndex('log', ['sn', 'ts'], unique=True), 'log_sn_ts_idx')
+        self.assertEqual(self.db.listIndexes('log')['log_sn_ts_idx'], ('sn', 'ts'))
+        self.assertRaises(SQLiteDatabaseError, self.db.createIndex, 'log', [])
+        self.assertRaises(SQLiteDatabaseError, self.db.createIndex, 'log', ['unknown'])
+
+        self.db.dropIndex('log_sn_ts_idx')
+        self.assertNotIn('log_sn_ts_idx', self.db.listIndexes('log'))
+
+    def testStatistics(self):
+        for i in range(5):
+            self.assertEqual(len(self.db.selectRecord('log', condition=f'ts > {i} AND ts < {i + 3}')), 2)
+
+        statistic = [x for x in self.db.getStatementStatistics() if x.sql.startswith('SELECT * FROM log')]
+        self.assertEqual(len(statistic), 1)
+        self.assertEqual(statistic[0].count, 5)
+        self.assertFalse(statistic[0].full_scan)
+        self.assertTrue(any('log_ts_idx' in x for x in statistic[0].plan))
+        self.assertEqual(len(self.db.getSlowestStatements(1)), 1)
+
+        self.db.clearStatementStatistics()
+        self.db.enableInstrument(False)
+        self.db.selectRecord('log', condition='ts > 0')
+        self.assertFalse(self.db.isInstrumented())
+        self.assertEqual(self.db.getStatementStatistics(), [])
+
+    def testAdvise(self):
+        self.db.selectRecord('log', condition='sn = "SN1" AND level = "INFO"')
+        self.db.selectRecord('log', condition='ts > 10')
+        self.assertEqual(len(self.db.getFullScanStatements()), 1)
+        self.assertEqual(self.db.adviseIndexes(), ['CREATE INDEX IF NOT EXISTS log_sn_level_idx ON log (sn, level);'])
+        self.assertIn('FULL SCAN', self.db.getInstrumentReport())
+
+        # Small table full scan is not flagged
+        self.db.enableInstrument(scan_threshold=10000)
+        self.db.clearStatementStatistics()
+        self.db.selectRecord('log', condition='sn = "SN1"')
+        self.assertEqual(self.db.getFullScanStatements(), [])
+
+
+class SQLiteDatabaseConcurrentTest(unittest.TestCase):
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+
+        self.db = SQLiteDatabase(self.path, concurrent=True)
+        self.db.rawExecute('CREATE TABLE kv (key TEXT PRIMARY KEY, value INTEGER)')
+        self.db.commit()
+
+    def tearDown(self) -> None:
+        self.db.close()
+        for path in (self.path, f'{self.path}-wal', f'{self.path}-shm'):
+            if os.path.isfile(path):
+                os.unlink(path)
+
+    def read_in_thread(self) -> list:
+        result = list()
+        th = threading.Thread(target=lambda: result.extend(self.db.selectRecord('kv')))
+        th.start()
+        th.join()
+        return result
+
+    def testMode(self):
+        self.assertTrue(self.db.is_concurrent())
+        self.assertEqual(self.db.rawExecute('PRAGMA journal_mode'), [('wal',)])
+
+    def testIsolation(self):
+        self.db.insertRecords('kv', [('a', 1)], commit=False)
+
+        # Writer thread reads it's own changes, other threads only read committed data
+        self.assertEqual(self.db.selectRecord('kv'), [('a', 1)])
+        self.assertEqual(self.read_in_thread(), [])
+
+        self.db.commit()
+        self.assertEqual(self.read_in_thread(), [('a', 1)])
+        self.assertEqual(self.db.selectRecord('kv'), [('a', 1)])
+
+    def testConcurrentWriters(self):
+        def writer(index: int):
+            for i in range(100):
+                self.db.insertRecords('kv', [(f'{index}-{i}', i)])
+
+        threads = [threading.Thread(target=writer, args=(x,)) for x in range(4)]
+        for th in threads:
+            th.start()
+
+        for th in threads:
+            th.join()
+
+        self.assertEqual(self.db.getRowCount('kv'), 400)
+        self.assertEqual(len(self.read_in_thread()), 400)
+
+    def start_writer(self, rows: list, errors: list) -> threading.Thread:
+        def writer():
+            for row in rows:
+                try:
+                    self.db.insertRecords('kv', list(row))
+                except SQLiteDatabaseError as e:
+                    errors.append(e)
+
+        th = threading.Thread(target=writer)
+        th.start()
+
+        # Other thread writer waits current thread transaction ended
+        time.sleep(0.2)
+        self.assertTrue(th.is_alive())
+        return th
+
+    def testTransactionCommit(self):
+        errors = list()
+        self.db.insertRecords('kv', [('x', 0)])
+        self.db.insertRecords('kv', [('a', 1)], commit=False)
+
+        # Other thread conflict rollback and commit do not affect current thread transaction
+        th = self.start_writer([(('b', 1), ('x', 1)), (('c', 1),)], errors)
+        self.assertEqual(self.read_in_thread(), [('x', 0)])
+        self.assertEqual(sorted(self.db.selectRecord('kv')), [('a', 1), ('x', 0)])
+
+        self.db.commit()
+        th.join()
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(sorted(self.read_in_thread()), [('a', 1), ('c', 1), ('x', 0)])
+
+    def testTransactionRollback(self):
+        errors = list()
+        self.db.insertRecords('kv', [('a', 1)], commit=False)
+
+        th = self.start_writer([(('b', 1),)], errors)
+        self.db.rollback()
+        th.join()
+        self.assertEqual(errors, [])
+        self.assertEqual(self.read_in_thread(), [('b', 1)])
+        self.assertEqual(self.db.selectRecord('kv'), [('b', 1)])
+
+
+class SQLiteWriteBehindTest(unittest.TestCase):
+    def setUp(self) -> None:
+        fd, self.path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+
+        db = SQLiteDatabase(self.path)
+        db.rawExecute('CREATE TABLE log (id INTEGER PRIMARY KEY AUTOINCREMENT, ts REAL, level INTEGER, msg TEXT)')
+        db.rawExecute('CREATE TABLE kv (key TEXT PRIMARY KEY, value INTEGER)')
+        db.close()
+
+    def tearDown(self) -> None:
+        os.unlink(self.path)
+
+    def testWrite(self):
+        writer = SQLiteWriteBehind(self.path, batch_size=100, batch_window=0.05)
+        callback = writer.loggingCallback('log')
+        for i in range(1000):
+            callback(UiLogMessage.genDefaultInfoMessage(f'{i}'))
+
+        writer.upsert('kv', ('a', 1))
+        writer.upsert('kv', ('a', 2))
+        writer.update('kv', {'value': 3}, 'key = "a"')
+        self.assertTrue(writer.flush(5.0))
+
+        statistic = writer.statistic
+        self.assertEqual(statistic.committed, 1003)
+        self.assertEqual(statistic.pending, 0)
+        self.assertGreaterEqual(statistic.batches, 10)
+        self.assertEqual(writer.database.getRowCount('log'), 1000)
+        self.assertEqual(writer.database.selectRecord('kv'), [('a', 3)])
+
+        # Failed record do not affect others in the same batch
+        writer.insert('kv', ('b', 1))
+        writer.insert('kv', ('a', 1))
+        writer.insert('kv', ('c', 1))
+        writer.close()
+        self.assertEqual(writer.statistic.errors, 1)
+        self.assertFalse(writer.insert('kv', ('d', 1)))
+        self.assertEqual(writer.database.getRowCount('kv'), 3)
+
+    def testCloseFlush(self):
+        writer = SQLiteWriteBehind(self.path, batch_window=10.0)
+        for i in range(100):
+            writer.insert('log', (i, 0, ''))
+
+        writer.close()
+        self.assertEqual(writer.depth, 0)
+        self.assertEqual(writer.database.getRowCount('log'), 100)
+
+    def testBackPressure(self):
+        writer = SQLiteWriteBehind(SQLiteDatabase(self.path, timeout=5, check_same_thread=False),
+                                   batch_window=0, max_depth=1, put_timeout=0)
+        lock = sqlite3.connect(self.path)
+        lock.execute('BEGIN EXCLUSIVE')
+
+        # Writer thread is blocked by database lock, queue is full
+        results = [writer.insert('log', (i, 0, '')) for i in range(100)]
+        self.assertIn(False, results)
+        self.assertEqual(writer.statistic.dropped, results.count(False))
+
+        lock.commit()
+        lock.close()
+        writer.close()
+        self.assertEqual(writer.database.getRowCount('log'), results.count(True))
+
+    def lock_reader(self) -> sqlite3.Connection:
+        # Reader in a read transaction holds shared lock, writer commit raises database is locked
+        reader = sqlite3.connect(self.path)
+        reader.execute('BEGIN')
+        reader.execute('SELECT * FROM log').fetchall()
+        return reader
+
+    def testCommitRetry(self):
+        writer = SQLiteWriteBehind(SQLiteDatabase(self.path, timeout=0, check_same_thread=False), batch_window=0)
+        reader = self.lock_reader()
+        writer.insert('log', (0, 0, ''))
+        time.sleep(0.2)
+
+        reader.rollback()
+        reader.close()
+        self.assertTrue(writer.flush(2.0))
+        self.assertEqual(writer.statistic.errors, 0)
+        self.assertEqual(writer.database.getRowCount('log'), 1)
+        writer.close()
+
+    def testCommitFailed(self):
+        writer = SQLiteWriteBehind(SQLiteDatabase(self.path, timeout=0, check_same_thread=False), batch_window=0)
+        reader = self.lock_reader()
+        writer.insert('log', (0, 0, ''))
+
+        # Retry exhausted, batch is counted as errors, writer thread keeps working
+        self.assertTrue(writer.flush(5.0))
+        self.assertEqual(writer.statistic.errors, 1)
+        self.assertEqual(writer.statistic.pending, 0)
+
+        reader.rollback()
+        reader.close()
+        writer.insert('log', (1, 0, ''))
+        self.assertTrue(writer.flush(2.0))
+        self.assertEqual(writer.database.getRowCount('log'), 1)
+        writer.close()
+
+    def testPutAfterClose(self):
+        writer = SQLiteWriteBehind(self.path)
+        writer.close()
+        self.assertFalse(writer.insert('log', (0, 0, '')))
+        self.assertEqual(writer.statistic.pending, 0)
+        self.assertTrue(writer.flush(0.1))
+
+
+if __name__ == '__main__':
+    unittest.main()
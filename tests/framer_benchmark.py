@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import struct
+import argparse
+from ..protocol.crc16 import crc16_fast
+from ..protocol.framer import CRC16Framer, LengthPrefixFramer
+
+
+# Usage: python -m PyAppFramework.tests.framer_benchmark --frames=1000
+def random_frame(size: int) -> bytes:
+    """Random crc16 terminated frame, without crc16 is zero inside it"""
+    while True:
+        payload = os.urandom(size - 2)
+        frame = payload + struct.pack('<H', crc16_fast(payload))
+        if CRC16Framer().feed(frame) == [frame]:
+            return frame
+
+
+def rescan_crc16(stream: bytes, chunk: int) -> int:
+    """SerialPort.read with ending_check: accumulate and check crc of the whole buffer after each chunk"""
+    frames, data = 0, bytes()
+    for i in range(0, len(stream), chunk):
+        data += stream[i:i + chunk]
+        if len(data) >= 4 and crc16_fast(data) == 0:
+            frames, data = frames + 1, bytes()
+    return frames
+
+
+def framer_feed(framer, stream: bytes, chunk: int) -> int:
+    return sum(len(framer.feed(stream[i:i + chunk])) for i in range(0, len(stream), chunk))
+
+
+def report(name: str, frames: int, func, *args):
+    start = time.process_time()
+    result = func(*args)
+    cost = time.process_time() - start
+    assert result == frames, f'{name}: {result} != {frames}'
+    print(f'{name:<32} {cost / frames * 1e6:>10.2f} us/frame')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=1000, help='Frame number')
+    args = parser.parse_args()
+
+    for size, chunk in ((8, 1), (256, 8), (256, 32)):
+        crc_frames = [random_frame(size) for _ in range(args.frames)]
+        crc_stream = b''.join(crc_frames)
+        length_stream = b''.join(struct.pack('>H', len(x)) + x for x in crc_frames)
+
+        print(f'Frame size: {size}, read chunk: {chunk}')
+        report('rescan crc16(ending_check)', args.frames, rescan_crc16, crc_stream, chunk)
+        report('CRC16Framer', args.frames, framer_feed, CRC16Framer(max_size=size), crc_stream, chunk)
+        report('LengthPrefixFramer', args.frames, framer_feed, LengthPrefixFramer('>H'), length_stream, chunk)
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+import struct
+import unittest
+from ..protocol.crc16 import crc16
+from ..protocol.framer import *
+
+
+def modbus_frame(payload: bytes) -> bytes:
+    return payload + struct.pack('<H', crc16(payload))
+
+
+class FramerTest(unittest.TestCase):
+    def testLengthPrefix(self):
+        framer = LengthPrefixFramer('>L')
+        stream = b''.join(struct.pack('>L', len(x)) + x for x in (b'hello', b'', b'world' * 100))
+
+        frames = list()
+        for i in range(0, len(stream), 3):
+            frames.extend(framer.feed(stream[i:i + 3]))
+
+        self.assertEqual(frames, [b'hello', b'', b'world' * 100])
+        self.assertEqual(len(framer), 0)
+
+        # Leftover bytes are kept for next frame
+        self.assertEqual(framer.feed(struct.pack('>L', 3) + b'abcd'), [b'abc'])
+        self.assertEqual(framer.pending(), b'd')
+
+        # Too long frame is dropped
+        framer = LengthPrefixFramer('>H', max_size=16)
+        self.assertEqual(framer.feed(struct.pack('>H', 17) + b'0' * 17), [])
+        self.assertEqual(framer.dropped, 19)
+        self.assertEqual(len(framer), 0)
+
+    def testCRC16(self):
+        requests = [modbus_frame(bytes([1, 3, 0, x, 0, 10])) for x in range(10)]
+        stream = b''.join(requests)
+
+        for chunk in (1, 3, 7, 8, len(stream)):
+            framer = CRC16Framer(min_size=4)
+            frames = list()
+            for i in range(0, len(stream), chunk):
+                frames.extend(framer.feed(stream[i:i + chunk]))
+
+            self.assertEqual(frames, requests)
+            self.assertEqual(len(framer), 0)
+
+        framer = CRC16Framer(min_size=4)
+        self.assertEqual(framer.feed(requests[0] + requests[1][:3]), [requests[0]])
+        self.assertEqual(framer.pending(), requests[1][:3])
+        self.assertEqual(framer.feed(requests[1][3:]), [requests[1]])
+
+        # Incomplete frame dropped, then resync
+        framer.feed(requests[2][:5])
+        framer.drop()
+        self.assertEqual(framer.dropped, 5)
+        self.assertEqual(framer.feed(requests[3]), [requests[3]])
+
+        # Frame check failed keep receiving
+        framer = CRC16Framer(min_size=4, check=lambda x: x[0] == 1)
+        self.assertEqual(framer.feed(modbus_frame(bytes([2, 3, 0, 0, 0, 1]))), [])
+        self.assertEqual(len(framer), 8)
+
+    def testVarintLength(self):
+        messages = [b'', b'a', b'b' * 127, b'c' * 128, b'd' * 300]
+        stream = b''.join(VarintLengthFramer.encode(x) for x in messages)
+        self.assertEqual(VarintLengthFramer.encode(b'c' * 300)[:2], bytes([0xac, 0x02]))
+
+        framer = VarintLengthFramer()
+        frames = list()
+        for i in range(0, len(stream), 5):
+            frames.extend(framer.feed(stream[i:i + 5]))
+
+        self.assertEqual(frames, messages)
+
+        framer = VarintLengthFramer(max_size=16)
+        self.assertEqual(framer.feed(VarintLengthFramer.encode(b'0' * 17)), [])
+        self.assertEqual(len(framer), 0)
+        self.assertEqual(framer.feed(b'\xff' * 10), [])
+        self.assertEqual(framer.dropped, 28)
+
+    def testMBAP(self):
+        pdus = [bytes([3, 0, 0, 0, 125]), bytes([3, 250]) + bytes(250), bytes([0x83, 2])]
+        stream = b''.join(MBAPFramer.encode(tid, 1, pdu) for tid, pdu in enumerate(pdus))
+
+        framer = MBAPFramer()
+        frames = list()
+        for i in range(0, len(stream), 7):
+            frames.extend(framer.feed(stream[i:i + 7]))
+
+        self.assertEqual([MBAPFramer.decode(x) for x in frames], [(tid, 1, pdu) for tid, pdu in enumerate(pdus)])
+        self.assertEqual(len(framer), 0)
+
+        # Invalid length is dropped
+        self.assertEqual(framer.feed(bytes([0, 1, 0, 0, 0x10, 0]) + bytes(10)), [])
+        self.assertEqual(framer.dropped, 16)
+
+
+if __name__ == "__main__":
+    unittest.main()
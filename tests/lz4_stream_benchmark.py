@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import concurrent.futures
+from ..misc.tarmanager import TarManager
+
+
+# Usage: python -m PyAppFramework.tests.lz4_stream_benchmark --files=64 --size=16 --workers=4
+def create_tree(path: str, files: int, size: int):
+    """Half random half repeated content, lz4 compress ratio is about 2"""
+    for index in range(files):
+        directory = os.path.join(path, f'dir{index % 8}')
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f'file{index}.bin'), 'wb') as fp:
+            for _ in range(size):
+                fp.write(os.urandom(512 * 1024) + bytes(512 * 1024))
+
+
+def run(path: str, streaming: bool, workers: int):
+    """Run in a new process, so that max rss is the peak of this operation only"""
+    package = os.path.join(tempfile.mkdtemp(), 'package.lz4')
+    extract = os.path.join(os.path.dirname(package), 'extract')
+
+    start = time.perf_counter()
+    TarManager.pack(path, package, streaming=streaming, workers=workers)
+    pack = time.perf_counter() - start
+
+    start = time.perf_counter()
+    TarManager.unpack(package, extract, streaming=streaming)
+    unpack = time.perf_counter() - start
+
+    shutil.rmtree(os.path.dirname(package))
+    return pack, unpack, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--files', type=int, default=64, help='Files number')
+    parser.add_argument('--size', type=int, default=16, help='Each file size in MB')
+    parser.add_argument('--workers', type=int, default=4, help='Streaming compress threads')
+    args = parser.parse_args()
+
+    src = tempfile.mkdtemp()
+    create_tree(src, args.files, args.size)
+    total = args.files * args.size
+
+    print(f'{"mode":>10} {"pack(MB/s)":>12} {"unpack(MB/s)":>14} {"max rss(MB)":>12}')
+    for name, streaming in (('legacy', False), ('streaming', True)):
+        with concurrent.futures.ProcessPoolExecutor(1) as executor:
+            pack, unpack, rss = executor.submit(run, src, streaming, args.workers).result()
+
+        print(f'{name:>10} {total / pack:>12.2f} {total / unpack:>14.2f} {rss:>12.1f}')
+
+    shutil.rmtree(src)
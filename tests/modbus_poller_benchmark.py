@@ -0,0 +1,163 @@
+# -*- coding: utf-8 -*-
+import time
+import struct
+import asyncio
+import argparse
+import threading
+from typing import List, Dict
+from ..protocol.framer import MBAPFramer
+from ..protocol.modbus import ModbusTCPPoller, ModbusTCPDevice, ReadRequest, FuncCode, ExceptionCode, \
+    helper_data2bits, helper_bits2data
+
+
+# Usage: python -m PyAppFramework.tests.modbus_poller_benchmark --devices=60 --latency=0.005
+class ModbusTCPStandIn(object):
+    def __init__(self, size: int = 1000, latency: float = 0.0):
+        """Modbus tcp stand-in device, register initial value is it's address, coil initial value is address & 1
+
+        Each request is answered `latency` second later, requests are processed concurrently,
+        so responses may be out of order, address out of `size` gets illegal data address exception
+        """
+        self.size = size
+        self.latency = latency
+        self.requests = 0
+        self.server = None
+        self.writers = set()
+        self.registers = list(range(size))
+        self.coils = [x & 1 for x in range(size)]
+
+    @property
+    def port(self) -> int:
+        return self.server.sockets[0].getsockname()[1]
+
+    def handle(self, pdu: bytes) -> bytes:
+        fc, address, count = struct.unpack_from('>BHH', pdu)
+        self.requests += 1
+        if fc in (FuncCode.ReadRegs, FuncCode.ReadCoils, FuncCode.WriteMultipleRegs, FuncCode.WriteMultipleCoils) \
+                and address + count > self.size or address >= self.size:
+            return struct.pack('>BB', fc | 0x80, ExceptionCode.IllegalDataAddress)
+
+        if fc == FuncCode.ReadRegs:
+            return struct.pack(f'>BB{count}H', fc, count * 2, *self.registers[address:address + count])
+        elif fc == FuncCode.ReadCoils:
+            bits = helper_data2bits(self.coils[address:address + count], msb_first=False)
+            return struct.pack('>BB', fc, len(bits)) + bits
+        elif fc == FuncCode.WriteSingleReg:
+            self.registers[address] = count
+        elif fc == FuncCode.WriteSingleCoil:
+            self.coils[address] = 1 if count else 0
+        elif fc == FuncCode.WriteMultipleRegs:
+            self.registers[address:address + count] = struct.unpack_from(f'>{count}H', pdu, 6)
+        elif fc == FuncCode.WriteMultipleCoils:
+            self.coils[address:address + count] = [int(x) for x in helper_bits2data(pdu[6:], msb_first=False)[:count]]
+        else:
+            return struct.pack('>BB', fc | 0x80, ExceptionCode.IllegalFunction)
+
+        return pdu[:5]
+
+    async def connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        framer = MBAPFramer()
+        self.writers.add(writer)
+        while True:
+            data = await reader.read(4096)
+            if not data:
+                break
+
+            for frame in framer.feed(data):
+                tid, unit, pdu = MBAPFramer.decode(frame)
+                response = MBAPFramer.encode(tid, unit, self.handle(pdu))
+                loop.call_later(self.latency, lambda x=response: writer.is_closing() or writer.write(x))
+
+        writer.close()
+        self.writers.discard(writer)
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.connection, '127.0.0.1', 0)
+
+    async def stop(self):
+        self.server.close()
+        for writer in list(self.writers):
+            writer.transport.abort()
+
+        # Let connection handlers exit
+        while self.writers:
+            await asyncio.sleep(0.01)
+
+
+def start_stand_in_devices(number: int, latency: float) -> (asyncio.AbstractEventLoop, List[ModbusTCPStandIn]):
+    """Start `number` stand-in devices in a new event loop thread"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    devices = [ModbusTCPStandIn(latency=latency) for _ in range(number)]
+    for device in devices:
+        asyncio.run_coroutine_threadsafe(device.start(), loop).result()
+
+    return loop, devices
+
+
+def stop_stand_in_devices(loop: asyncio.AbstractEventLoop, devices: List[ModbusTCPStandIn]):
+    for device in devices:
+        asyncio.run_coroutine_threadsafe(device.stop(), loop).result()
+
+    loop.call_soon_threadsafe(loop.stop)
+
+
+def create_requests(requests: int, count: int) -> List:
+    return [(FuncCode.ReadRegs, ReadRequest(start=i * count, count=count, event=None)) for i in range(requests)]
+
+
+def legacy_cycle_time(stand_in: List[ModbusTCPStandIn], requests: int, count: int, cycles: int) -> float:
+    """ModbusTCPClient: one thread reads every request of every device sequentially"""
+    import pyModbusTCP.client as modbus_client
+    clients = [modbus_client.ModbusClient(host='127.0.0.1', port=x.port, auto_open=True) for x in stand_in]
+    start = time.perf_counter()
+    for _ in range(cycles):
+        for client in clients:
+            for _, request in create_requests(requests, count):
+                client.read_holding_registers(request.start, request.count)
+
+    for client in clients:
+        client.close()
+
+    return (time.perf_counter() - start) / cycles
+
+
+def poller_cycle_time(stand_in: List[ModbusTCPStandIn], requests: int, count: int,
+                      window: int, duration: float) -> Dict[str, float]:
+    poller = ModbusTCPPoller(lambda x: None)
+    for index, device in enumerate(stand_in):
+        poller.add_device(ModbusTCPDevice(name=f'device{index}', host='127.0.0.1', port=device.port,
+                                          cycle=0.1, window=window, requests=create_requests(requests, count)))
+
+    time.sleep(duration)
+    stats = poller.statistics().values()
+    poller.stop()
+    return dict(
+        cycle=max(x.cycle_latency for x in stats),
+        cycle_max=max(x.cycle_latency_max for x in stats),
+        errors=sum(x.errors for x in stats),
+        response=sum(x.response_time for x in stats) / len(stats),
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--devices', type=int, default=60, help='Modbus tcp stand-in devices number')
+    parser.add_argument('--requests', type=int, default=4, help='Each device read requests number')
+    parser.add_argument('--count', type=int, default=100, help='Each read request registers count')
+    parser.add_argument('--latency', type=float, default=0.005, help='Device response latency in second')
+    parser.add_argument('--duration', type=float, default=2.0, help='Poller run time in second')
+    args = parser.parse_args()
+
+    stand_in_loop, stand_in_devices = start_stand_in_devices(args.devices, args.latency)
+
+    print(f'{"poller":<20} {"cycle(ms)":>10} {"cycle max(ms)":>14} {"response(ms)":>13} {"errors":>7}')
+    legacy = legacy_cycle_time(stand_in_devices, args.requests, args.count, 2)
+    print(f'{"legacy sequential":<20} {legacy * 1000:>10.2f} {"-":>14} {"-":>13} {"-":>7}')
+    for size in (1, 4):
+        result = poller_cycle_time(stand_in_devices, args.requests, args.count, size, args.duration)
+        print(f'{f"poller window={size}":<20} {result["cycle"] * 1000:>10.2f} {result["cycle_max"] * 1000:>14.2f} '
+              f'{result["response"] * 1000:>13.2f} {result["errors"]:>7}')
+
+    stop_stand_in_devices(stand_in_loop, stand_in_devices)
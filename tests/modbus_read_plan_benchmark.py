@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+import random
+import argparse
+from ..protocol.modbus import DataConvert, ReadRequest, Address, DataFormat, DataPresent, FuncCode
+
+
+# Usage: python -m PyAppFramework.tests.modbus_read_plan_benchmark --baudrate=9600 --latency=0.02
+def legacy_merge_read_request(address_list):
+    """DataConvert.merge_read_request before gap tolerant planning, only strictly continuous `ma` are merged"""
+    start = 0
+    count = 0
+    latest = 0
+    request_list = list()
+    for address in address_list:
+        if not count:
+            start = address.ma
+            count = DataConvert.get_format_size(address.format)
+        elif latest + 1 == address.ma:
+            count += DataConvert.get_format_size(address.format)
+        else:
+            request_list.append(ReadRequest(start=start, count=count, event=None))
+            start = address.ma
+            count = DataConvert.get_format_size(address.format)
+
+        latest = address.ma
+
+    request_list.append(ReadRequest(start=start, count=count, event=None))
+    return request_list
+
+
+def create_address_list(layout):
+    return [Address(ma=ma, ro=True, format=fmt, present=DataPresent.auto, name=f'{ma}', annotate='')
+            for ma, fmt in layout]
+
+
+def sparse_maps(seed: int):
+    rnd = random.Random(seed)
+    return {
+        # Power meter: float values every 2 registers, a few blocks
+        'power meter': [(base + i * 2, DataFormat.float) for base in (0, 100, 200, 300) for i in range(12)],
+
+        # PLC: status words with small holes
+        'plc status': [(ma, DataFormat.uint16) for ma in sorted(rnd.sample(range(400), 80))],
+
+        # Inverter: scattered registers over a large map
+        'inverter': [(ma, DataFormat.uint16) for ma in sorted(rnd.sample(range(4000), 40))],
+
+        # Dense block exceeds max read count
+        'dense': [(ma, DataFormat.uint16) for ma in range(300)],
+    }
+
+
+def poll_time(requests, baudrate: int, latency: float) -> float:
+    """RTU poll time: request 8 bytes, response 5 + 2 * count bytes, 11 bits per byte, plus turnaround latency"""
+    size = sum(8 + 5 + 2 * x.count for x in requests)
+    return len(requests) * latency + size * 11 / baudrate
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seed', type=int, default=0, help='Random map seed')
+    parser.add_argument('--baudrate', type=int, default=9600, help='RS-485 baudrate')
+    parser.add_argument('--latency', type=float, default=0.02, help='Request turnaround latency in second')
+    args = parser.parse_args()
+
+    print(f'{"map":<12} {"planner":<12} {"requests":>9} {"read regs":>10} {"poll(ms)":>10}')
+    for name, layout in sparse_maps(args.seed).items():
+        address_list = create_address_list(layout)
+        plans = [('legacy', legacy_merge_read_request(address_list))]
+        plans.extend((f'gap={gap}', DataConvert.merge_read_request(address_list, gap)) for gap in (0, 4, 16, 64))
+        for planner, requests in plans:
+            # Legacy planner may create requests exceed protocol max read count
+            invalid = any(x.count > DataConvert.MAX_READ_COUNT[FuncCode.ReadRegs] for x in requests)
+            cost = poll_time(requests, args.baudrate, args.latency) * 1000
+            print(f'{name:<12} {planner:<12} {len(requests):>9} {sum(x.count for x in requests):>10} {cost:>10.1f}'
+                  f'{" (invalid)" if invalid else ""}')
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import struct
+import timeit
+import argparse
+from ..protocol.crc16 import crc16_fast
+from ..protocol.modbus import ModbusServer, Region, DataType, FuncCode, helper_data2bits
+
+
+# Usage: python -m PyAppFramework.tests.modbus_server_benchmark --regions=50 --number=1000
+class LegacyModbusServer(ModbusServer):
+    """Region linear scan and per address lookup, as ModbusServer before address index"""
+    def find_region(self, t: DataType, address: int):
+        for region in self.regions:
+            if region.type == t and region.contains(address):
+                return region
+
+        return None
+
+    def handleReadRegs(self, payload: bytes) -> bytes:
+        addr, count = struct.unpack('>2H', payload)
+        data = [self.find_reg(addr + idx).get(addr + idx) for idx in range(count)]
+        return bytes([count * 2]) + struct.pack(f'>{count}H', *tuple(data))
+
+    def handleReadCoils(self, payload: bytes) -> bytes:
+        start_addr, count = struct.unpack('>2H', payload)
+        data = [self.find_coil(start_addr + offset).get(start_addr + offset) for offset in range(count)]
+        return helper_data2bits(data)
+
+
+def create_server(cls, regions: int, size: int) -> ModbusServer:
+    server = cls(1, callback=lambda *x: x)
+    server.register_region(
+        [Region.create_regs(list={x: x for x in range(i * size, (i + 1) * size)}) for i in range(regions)] +
+        [Region.create_coils(list={x: x & 1 for x in range(i * size, (i + 1) * size)}) for i in range(regions)]
+    )
+    return server
+
+
+def rtu_requests_per_second(server: ModbusServer, total: int, count: int, number: int) -> float:
+    """RTU slave on a local pty pair, master side sends read registers request and waits response"""
+    master, slave = os.openpty()
+    server.start(os.ttyname(slave), 115200, 0.1)
+    os.close(slave)
+
+    requests = list()
+    for i in range(number):
+        payload = struct.pack('>BB2H', 1, FuncCode.ReadRegs, (i * 7) % (total - count), count)
+        requests.append(payload + struct.pack('<H', crc16_fast(payload)))
+
+    # Response: dev id, function code, byte count, data, crc16
+    size = 5 + count * 2
+    start = time.perf_counter()
+    for request in requests:
+        os.write(master, request)
+        response = bytearray()
+        while len(response) < size:
+            response += os.read(master, size - len(response))
+
+    # Serial write waits until port is writable after data is written, let it return before disconnect
+    cost = time.perf_counter() - start
+    time.sleep(0.2)
+    server.transmit.disconnect()
+    os.close(master)
+    return number / cost
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--regions', type=int, default=50, help='Registers and coils regions number')
+    parser.add_argument('--size', type=int, default=10, help='Each region address count')
+    parser.add_argument('--count', type=int, default=125, help='Each read request address count')
+    parser.add_argument('--number', type=int, default=1000, help='Each benchmark requests number')
+    args = parser.parse_args()
+
+    total = args.regions * args.size
+    payload = struct.pack('>2H', total - args.count, args.count)
+    print(f'{"server":<10} {"read regs(us)":>14} {"read coils(us)":>15} {"rtu requests/s":>15}')
+    for name, server_cls in (('legacy', LegacyModbusServer), ('indexed', ModbusServer)):
+        server = create_server(server_cls, args.regions, args.size)
+        regs = min(timeit.repeat(lambda: server.handleReadRegs(payload), number=args.number, repeat=3))
+        coils = min(timeit.repeat(lambda: server.handleReadCoils(payload), number=args.number, repeat=3))
+        rate = rtu_requests_per_second(server, total, args.count, args.number)
+        print(f'{name:<10} {regs / args.number * 1e6:>14.2f} {coils / args.number * 1e6:>15.2f} {rate:>15.2f}')
@@ -0,0 +1,327 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import asyncio
+import struct
+import socket
+import unittest
+from ..protocol.crc16 import crc16
+from ..protocol.modbus import *
+from ..protocol.template import CommunicationSection
+from .modbus_poller_benchmark import ModbusTCPStandIn, start_stand_in_devices, stop_stand_in_devices
+
+
+class MalformedStandIn(ModbusTCPStandIn):
+    def handle(self, pdu: bytes) -> bytes:
+        fc, address, count = struct.unpack_from('>BHH', pdu)
+        # Byte count larger than payload, echo function code only, byte count mismatch
+        return {100: b'\x03\x04\x00', 200: b'\x03', 300: b'\x03\x02\x00\x01'}.get(address) or super().handle(pdu)
+
+
+class ModbusHelperTest(unittest.TestCase):
+    def testBitsConvert(self):
+        for msb_first in (True, False):
+            for data in ([], [1], [1, 0, 1], [1, 0, 0, 0, 0, 0, 0, 1, 1], [x % 3 == 0 for x in range(125)]):
+                bits = helper_data2bits(data, msb_first)
+                self.assertEqual(len(bits), helper_get_bytesize(len(data)))
+                self.assertEqual(helper_bits2data(bits, msb_first)[:len(data)], [bool(x) for x in data])
+
+        self.assertEqual(helper_data2bits([1, 0, 0, 0, 0, 0, 0, 0, 1]), b'\x80\x80')
+        self.assertEqual(helper_data2bits([1, 0, 0, 0, 0, 0, 0, 0, 1], msb_first=False), b'\x01\x01')
+        self.assertEqual(helper_data2bits([0xff00, 0x1, 0x100]), b'\x40')
+        self.assertEqual(helper_bits2data(b'\x01', msb_first=False), [True] + [False] * 7)
+
+
+class ReadRequestPlanTest(unittest.TestCase):
+    @staticmethod
+    def addresses(*args, fmt=DataFormat.uint16):
+        return [Address(ma=x, ro=True, format=fmt, present=DataPresent.auto, name=str(x), annotate='') for x in args]
+
+    def plan(self, address_list, max_gap=0, fc=FuncCode.ReadRegs):
+        return [(x.start, x.count) for x in DataConvert.merge_read_request(address_list, max_gap, fc)]
+
+    def testMerge(self):
+        address_list = self.addresses(0, 1, 3, 5, 100)
+        self.assertEqual(self.plan(address_list), [(0, 2), (3, 1), (5, 1), (100, 1)])
+        self.assertEqual(self.plan(address_list, 1), [(0, 6), (100, 1)])
+        self.assertEqual(self.plan(address_list[::-1], 100), [(0, 101)])
+        self.assertEqual(self.plan([]), [])
+
+        # Multi-register address is never split, and continuous with the next address
+        address_list = self.addresses(0, 2, fmt=DataFormat.float) + self.addresses(4)
+        self.assertEqual(self.plan(address_list), [(0, 5)])
+
+    def testMaxCount(self):
+        address_list = self.addresses(*range(300))
+        self.assertEqual(self.plan(address_list), [(0, 125), (125, 125), (250, 50)])
+        self.assertEqual(self.plan(address_list, fc=FuncCode.ReadCoils), [(0, 300)])
+
+        # Float at 124 doesn't fit in the first request
+        address_list = self.addresses(*range(124)) + self.addresses(124, fmt=DataFormat.float)
+        self.assertEqual(self.plan(address_list), [(0, 124), (124, 2)])
+
+    def testOptimal(self):
+        # Minimal requests first, then minimal over-read: 0 and 130 can't be read together
+        address_list = self.addresses(0, 10, 120, 130)
+        self.assertEqual(self.plan(address_list, 200), [(0, 11), (120, 11)])
+
+    def testSplitResponse(self):
+        address_list = self.addresses(5, 0, 100) + self.addresses(2, fmt=DataFormat.uint32)
+        request = DataConvert.merge_read_request(address_list, 2)[0]
+        response = ReadResponse(request=request, data=list(range(10, 16)))
+        self.assertEqual(DataConvert.split_read_response(response, address_list),
+                         [(0, (15,)), (1, (10,)), (3, (12, 13))])
+
+
+class WatchEventRegistryTest(unittest.TestCase):
+    @staticmethod
+    def watch(name: str, start: int, count: int, t: str = DataType.Register):
+        return WatchEventRequest(name=name, type=t, rd=ReadRequest(start=start, count=count, event=None))
+
+    def testWatchRequest(self):
+        watch = self.watch('a', 10, 5)
+        self.assertEqual(watch, self.watch('a', 10, 5))
+        self.assertNotEqual(hash(watch), hash(self.watch('b', 10, 5)))
+        self.assertEqual(len({watch, self.watch('a', 10, 5), self.watch('a', 11, 4)}), 2)
+
+        self.assertEqual(watch.is_matched(FuncCode.ReadRegs, ReadRequest(0, 12, None)), (10, 2))
+        self.assertEqual(watch.is_matched(FuncCode.ReadRegs, ReadRequest(12, 10, None)), (0, 3))
+        self.assertEqual(watch.is_matched(FuncCode.ReadRegs, ReadRequest(15, 10, None)), (-1, 0))
+        self.assertEqual(watch.is_matched(FuncCode.ReadCoils, ReadRequest(0, 20, None)), (-1, 0))
+
+    def testDispatch(self):
+        registry = WatchEventRegistry()
+        a, b, c = self.watch('a', 10, 2), self.watch('b', 11, 3), self.watch('c', 0, 1, DataType.Coil)
+        for watch in (a, b, c):
+            registry.add(watch)
+
+        self.assertEqual(len(registry), 3)
+        request = ReadRequest(start=0, count=13, event=None)
+        data = list(range(13))
+
+        # First read triggers all overlapped watches
+        responses = registry.dispatch(FuncCode.ReadRegs, request, data)
+        self.assertEqual([(x.name, x.address, x.data) for x in responses], [('a', 10, [10, 11]), ('b', 11, [11, 12])])
+
+        # Not changed
+        self.assertEqual(registry.dispatch(FuncCode.ReadRegs, request, data), [])
+
+        # Only watches of changed address are triggered
+        data[12] = 100
+        responses = registry.dispatch(FuncCode.ReadRegs, request, data)
+        self.assertEqual([(x.name, x.address, x.data) for x in responses], [('b', 11, [11, 100])])
+
+        # Added watch is triggered by next read, other watches of same address are not changed since reported
+        d = self.watch('d', 12, 1)
+        registry.add(d)
+        responses = registry.dispatch(FuncCode.ReadRegs, request, data)
+        self.assertEqual([(x.name, x.address, x.data) for x in responses], [('d', 12, [100])])
+
+        registry.remove(b)
+        registry.remove(d)
+        data[12] = 0
+        self.assertNotIn(b, registry)
+        self.assertEqual(registry.dispatch(FuncCode.ReadRegs, request, data), [])
+        self.assertEqual([x.name for x in registry.dispatch(FuncCode.ReadCoils, request, data)], ['c'])
+
+    def testDeadband(self):
+        registry = WatchEventRegistry()
+        registry.add(self.watch('a', 0, 1), deadband=5)
+        request = ReadRequest(start=0, count=1, event=None)
+
+        self.assertEqual(len(registry.dispatch(FuncCode.ReadRegs, request, [100])), 1)
+        self.assertEqual(registry.dispatch(FuncCode.ReadRegs, request, [103]), [])
+        self.assertEqual(registry.dispatch(FuncCode.ReadRegs, request, [105]), [])
+
+        # Compare to last reported value
+        self.assertEqual(registry.dispatch(FuncCode.ReadRegs, request, [106])[0].data, [106])
+        self.assertEqual(registry.dispatch(FuncCode.ReadRegs, request, [101]), [])
+
+
+class RegionIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.r1 = Region.create_regs(list={x: x for x in range(0, 10)})
+        self.r2 = Region.create_regs(list={x: x for x in range(10, 20)})
+        self.r3 = Region.create_regs(list={x: x for x in (30, 31, 33)})
+        self.index = RegionIndex([self.r1, self.r2, self.r3])
+
+    def testFind(self):
+        self.assertEqual(len(self.index), 4)
+        self.assertIs(self.index.find(0), self.r1)
+        self.assertIs(self.index.find(10), self.r2)
+        self.assertIs(self.index.find(33), self.r3)
+        for address in (-1, 20, 32, 34):
+            self.assertIsNone(self.index.find(address))
+
+        # Overlapped address first region wins
+        self.assertIs(RegionIndex([self.r1, Region.create_regs(list={9: 0, 10: 0})]).find(9), self.r1)
+
+    def testResolve(self):
+        self.assertEqual(self.index.resolve(5, 10), [(self.r1, 5, 5), (self.r2, 10, 5)])
+        self.assertEqual(self.index.resolve(30, 2), [(self.r3, 30, 2)])
+        for start, count in ((15, 10), (30, 4), (-1, 2), (40, 1)):
+            with self.assertRaises(KeyError):
+                self.index.resolve(start, count)
+
+    def testRange(self):
+        changed = list()
+        self.r2.callback = lambda *x: changed.append(x[1:])
+        self.assertEqual(self.r1.get_range(2, 3), [2, 3, 4])
+        self.r2.set_range(18, [1, 2])
+        self.assertEqual(changed, [(18, 1), (19, 2)])
+        self.assertEqual(self.r2.get_range(18, 2), [1, 2])
+
+        # Nothing is set if any address is invalid
+        with self.assertRaises(KeyError):
+            self.r2.set_range(19, [3, 4])
+        self.assertEqual(self.r2.get(19), 2)
+
+
+class ModbusServerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.master, slave = os.openpty()
+        self.server = ModbusServer(1, callback=lambda *x: x)
+        self.server.register_region([
+            Region.create_regs(list={x: x for x in range(0, 100)}),
+            Region.create_regs(list={x: x for x in range(100, 200)}),
+            Region.create_coils(list={x: Region.CoilState.OFF for x in range(8)}),
+        ])
+        self.assertTrue(self.server.start(os.ttyname(slave), 115200, 0.1))
+        os.close(slave)
+
+    def tearDown(self) -> None:
+        self.server.transmit.disconnect()
+        os.close(self.master)
+
+    def testHandle(self):
+        response = self.server.handleReadRegs(struct.pack('>2H', 90, 20))
+        self.assertEqual(response, bytes([40]) + struct.pack('>20H', *range(90, 110)))
+
+        self.server.handleWriteMultipleRegs(struct.pack('>2HB3H', 98, 3, 6, 1, 2, 3))
+        self.assertEqual(self.server.read_range(DataType.Register, 98, 3), [1, 2, 3])
+
+        self.server.handleWriteMultipleCoils(struct.pack('>2HBB', 0, 3, 1, 0xa0))
+        self.assertEqual(self.server.read_range(DataType.Coil, 0, 3), [Region.CoilState.ON, 0, Region.CoilState.ON])
+
+        with self.assertRaises(KeyError):
+            self.server.handleReadRegs(struct.pack('>2H', 190, 20))
+
+    def testRequestFrame(self):
+        # Read request which first 7 bytes crc16 is also zero
+        frame = struct.pack('>BB2H', 1, FuncCode.ReadRegs, 140, 125)
+        frame += struct.pack('<H', crc16(frame))
+        self.assertEqual(crc16(frame[:7]), 0)
+        self.assertFalse(ModbusServer.check_request_frame(frame[:7]))
+        self.assertTrue(ModbusServer.check_request_frame(frame))
+
+        frame = struct.pack('>BB2HB2H', 1, FuncCode.WriteMultipleRegs, 0, 2, 4, 1, 2)
+        frame += struct.pack('<H', crc16(frame))
+        self.assertTrue(ModbusServer.check_request_frame(frame))
+        self.assertFalse(ModbusServer.check_request_frame(frame[:8]))
+
+
+class ModbusTCPPollerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.events = list()
+        self.loop, self.stand_in = start_stand_in_devices(2, 0.01)
+        self.poller = ModbusTCPPoller(self.events.append)
+
+    def tearDown(self) -> None:
+        self.poller.stop()
+        stop_stand_in_devices(self.loop, self.stand_in)
+
+    def add_device(self, name: str, port: int, **kwargs):
+        self.poller.add_device(ModbusTCPDevice(name=name, host='127.0.0.1', port=port, cycle=0.05, **kwargs))
+
+    def sections(self, name: str):
+        return [x.data.section for x in self.events if x.type == ModbusTCPClientEvent.Type.SectionEnd
+                and x.data.sid == name]
+
+    def testPoll(self):
+        requests = [(FuncCode.ReadRegs, ReadRequest(start=10, count=100, event=None)),
+                    (FuncCode.ReadCoils, ReadRequest(start=1, count=9, event=None))]
+        for index, device in enumerate(self.stand_in):
+            self.add_device(f'device{index}', device.port, window=2, requests=requests)
+
+        time.sleep(0.3)
+        for name in self.poller.devices:
+            sections = self.sections(name)
+            self.assertIn(CommunicationSection(requests[0][1], list(range(10, 110))), sections)
+            self.assertIn(CommunicationSection(requests[1][1], [1, 0, 1, 0, 1, 0, 1, 0, 1]), sections)
+
+            statistic = self.poller.statistic(name)
+            self.assertGreater(statistic.cycles, 1)
+            self.assertEqual((statistic.health, statistic.errors, statistic.reconnects),
+                             (ModbusDeviceHealth.Online, 0, 0))
+            self.assertGreaterEqual(statistic.response_time, 0.01)
+
+    def testWatch(self):
+        requests = [(FuncCode.ReadRegs, ReadRequest(start=0, count=10, event=None))]
+        self.add_device('device', self.stand_in[0].port, requests=requests)
+        watch = WatchEventRequest(name='watch', type=DataType.Register, rd=ReadRequest(start=5, count=2, event=None))
+        self.poller.request_watch('device', watch)
+        time.sleep(0.2)
+
+        self.poller.write('device', FuncCode.WriteSingleReg, WriteRequest(None, 6, 100))
+        time.sleep(0.2)
+        watched = [x.data for x in self.events if x.type == ModbusTCPClientEvent.ExtendType.WatchEventOccurred]
+        self.assertEqual([(x.address, x.data) for x in watched], [(5, [5, 6]), (5, [5, 100])])
+
+    def testReadWrite(self):
+        self.add_device('device', self.stand_in[0].port, window=4)
+        time.sleep(0.1)
+
+        self.assertTrue(self.poller.write('device', FuncCode.WriteMultipleRegs, WriteRequest(None, 5, [1, 2, 3])))
+        self.assertTrue(self.poller.write('device', FuncCode.WriteSingleReg, WriteRequest(None, 8, 0xffff)))
+        self.assertTrue(self.poller.write('device', FuncCode.WriteMultipleCoils, WriteRequest(None, 0, [1] * 10)))
+        self.assertTrue(self.poller.write('device', FuncCode.WriteSingleCoil, WriteRequest(None, 10, True)))
+        self.assertEqual(self.poller.read('device', FuncCode.ReadRegs, ReadRequest(4, 6, None)),
+                         [4, 1, 2, 3, 0xffff, 9])
+        self.assertEqual(self.poller.read('device', FuncCode.ReadCoils, ReadRequest(8, 4, None)), [1, 1, 1, 1])
+
+        with self.assertRaises(ModbusException):
+            self.poller.read('device', FuncCode.ReadRegs, ReadRequest(990, 20, None))
+        self.assertEqual(self.poller.statistic('device').errors, 1)
+
+        with self.assertRaises(ValueError):
+            self.poller.read('unknown', FuncCode.ReadRegs, ReadRequest(0, 1, None))
+
+    def testMalformedResponse(self):
+        requests = [(FuncCode.ReadRegs, ReadRequest(start=x, count=2, event=None)) for x in (0, 100, 200, 300)]
+        requests.append((FuncCode.ReadCoils, ReadRequest(start=100, count=9, event=None)))
+        stand_in = MalformedStandIn()
+        asyncio.run_coroutine_threadsafe(stand_in.start(), self.loop).result()
+        try:
+            self.add_device('device', stand_in.port, requests=requests)
+            time.sleep(0.3)
+            statistic = self.poller.statistic('device')
+        finally:
+            self.poller.remove_device('device')
+            asyncio.run_coroutine_threadsafe(stand_in.stop(), self.loop).result()
+
+        # Malformed response only fails it's request, device keeps polling(reconnect if too many failures)
+        self.assertGreater(statistic.cycles, 1)
+        self.assertGreaterEqual(statistic.errors, statistic.cycles * 4)
+        self.assertIn(CommunicationSection(requests[0][1], [0, 1]), self.sections('device'))
+        errors = [x.data.content for x in self.events if x.type == ModbusTCPClientEvent.Type.Logging]
+        self.assertGreaterEqual(len([x for x in errors if 'error: ModbusException' in x]), statistic.cycles * 4)
+
+    def testOffline(self):
+        # Port without listener
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            port = sock.getsockname()[1]
+
+        self.add_device('offline', port, requests=[(FuncCode.ReadRegs, ReadRequest(0, 1, None))])
+        time.sleep(0.2)
+        statistic = self.poller.statistic('offline')
+        self.assertEqual((statistic.health, statistic.connected, statistic.cycles),
+                         (ModbusDeviceHealth.Offline, False, 0))
+        self.assertTrue(any(x.type == ModbusTCPClientEvent.Type.Disconnected for x in self.events))
+
+        self.poller.remove_device('offline')
+        self.assertEqual(self.poller.devices, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
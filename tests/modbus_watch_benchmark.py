@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import random
+import timeit
+import argparse
+from ..protocol.modbus import WatchEventRequest, WatchEventRegistry, ReadRequest, DataType, FuncCode
+
+
+# Usage: python -m PyAppFramework.tests.modbus_watch_benchmark --watches=500 --changes=5
+def legacy_is_matched(watch: WatchEventRequest, fc: int, request: ReadRequest):
+    """WatchEventRequest.is_matched before address indexed registry, build sets for each match"""
+    if watch.fc != fc:
+        return -1, 0
+
+    needle = watch.read_request_to_set(watch.rd)
+    haystack = watch.read_request_to_set(request)
+    found = haystack.intersection(needle)
+    if not found:
+        return -1, 0
+
+    count = len(found)
+    first = found.pop()
+    return list(haystack).index(first), count
+
+
+def legacy_dispatch(watches, fc: int, request: ReadRequest, data):
+    """ModbusTCPClient before registry: scan whole watch list on every read"""
+    responses = list()
+    for watch in watches:
+        index, length = legacy_is_matched(watch, fc, request)
+        if 0 <= index < len(data) and length:
+            responses.append(watch.gen_response(request.start + index, data[index: index + length]))
+
+    return responses
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--watches', type=int, default=500, help='Watches number')
+    parser.add_argument('--size', type=int, default=1000, help='Watched address space')
+    parser.add_argument('--changes', type=int, default=5, help='Changed addresses each read')
+    parser.add_argument('--number', type=int, default=200, help='Each benchmark loop number')
+    args = parser.parse_args()
+
+    rnd = random.Random(0)
+    watches = [WatchEventRequest(name=f'watch{i}', type=DataType.Register,
+                                 rd=ReadRequest(start=rnd.randrange(args.size), count=rnd.randint(1, 4), event=None))
+               for i in range(args.watches)]
+
+    registry = WatchEventRegistry()
+    for watch in watches:
+        registry.add(watch)
+
+    # Poll whole address space by 125 registers read, each read a few addresses changed
+    values = [0] * (args.size + 125)
+    requests = [ReadRequest(start=x, count=125, event=None) for x in range(0, args.size, 125)]
+    for request in requests:
+        registry.dispatch(FuncCode.ReadRegs, request, values[request.start:request.start + request.count])
+
+    def poll(dispatch):
+        for address in rnd.sample(range(args.size), args.changes):
+            values[address] += 1
+
+        for request in requests:
+            dispatch(FuncCode.ReadRegs, request, values[request.start:request.start + request.count])
+
+    legacy = min(timeit.repeat(lambda: poll(lambda *x: legacy_dispatch(watches, *x)), number=args.number, repeat=3))
+    indexed = min(timeit.repeat(lambda: poll(registry.dispatch), number=args.number, repeat=3))
+    print(f'{"dispatch":<10} {"us/read":>10}')
+    print(f'{"legacy":<10} {legacy / args.number / len(requests) * 1e6:>10.2f}')
+    print(f'{"registry":<10} {indexed / args.number / len(requests) * 1e6:>10.2f}')
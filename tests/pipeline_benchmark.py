@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+import time
+import heapq
+import socket
+import struct
+import argparse
+import threading
+from ..core.timer import Task
+from ..network.utility import tcp_socket_recv_data, tcp_socket_send_data
+from ..protocol.transmit import TCPClientTransmit
+from ..protocol.template import CommunicationController, CommunicationEvent, CommunicationObject
+
+
+# Usage: python -m PyAppFramework.tests.pipeline_benchmark --latency=0.005 --number=1000
+LENGTH_FMT = '>H'
+
+
+class TaggedMessage(CommunicationObject):
+    def to_bytes(self) -> bytes:
+        return struct.pack('>I', self.raw)
+
+    @classmethod
+    def from_bytes(cls, obj, data: bytes):
+        return cls(struct.unpack('>I', data)[0])
+
+    def correlation_id(self):
+        return self.raw
+
+    @classmethod
+    def correlation_id_from_bytes(cls, data: bytes):
+        return struct.unpack_from('>I', data)[0]
+
+
+class Controller(CommunicationController):
+    def __init__(self, window: int, finished: threading.Semaphore):
+        super(Controller, self).__init__(
+            CommunicationEvent, TaggedMessage, TaggedMessage,
+            TCPClientTransmit(length_fmt=LENGTH_FMT), 4, 1.0, lambda x: None, pipeline_window=window
+        )
+        self._finished = finished
+
+    def _fetch_state(self, task: Task):
+        pass
+
+    def _simulate_handle(self, request: CommunicationObject) -> bool:
+        return False
+
+    def _response_handle(self, request: CommunicationObject, response: CommunicationObject):
+        self._finished.release()
+
+    def _section_check(self, request: CommunicationObject, response: CommunicationObject, cost_time: float) -> bool:
+        return request.raw == response.raw
+
+
+def device(server: socket.socket, latency: float):
+    """Stand-in device: each request is answered `latency` seconds later, requests are processed concurrently"""
+    while True:
+        try:
+            sock, _ = server.accept()
+        except OSError:
+            return
+
+        pending = list()
+        cond = threading.Condition()
+
+        def responder():
+            while True:
+                with cond:
+                    while not pending or pending[0][0] > time.perf_counter():
+                        cond.wait(pending[0][0] - time.perf_counter() if pending else None)
+
+                    _, tag = heapq.heappop(pending)
+
+                try:
+                    tcp_socket_send_data(sock, tag, LENGTH_FMT)
+                except OSError:
+                    return
+
+        threading.Thread(target=responder, daemon=True).start()
+        while True:
+            try:
+                data = tcp_socket_recv_data(sock, 0, LENGTH_FMT)
+            except OSError:
+                break
+
+            if not data:
+                break
+
+            with cond:
+                heapq.heappush(pending, (time.perf_counter() + latency, data))
+                cond.notify()
+
+
+def benchmark(port: int, window: int, number: int) -> float:
+    finished = threading.Semaphore(0)
+    controller = Controller(window, finished)
+    controller.connect(('127.0.0.1', port), 1.0)
+
+    start = time.perf_counter()
+    for tag in range(number):
+        controller.send_async_request(tag)
+
+    for _ in range(number):
+        finished.acquire()
+
+    cost = time.perf_counter() - start
+    controller.disconnect()
+    return number / cost
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--latency', type=float, default=0.005, help='Device response latency in second')
+    parser.add_argument('--number', type=int, default=1000, help='Each benchmark requests number')
+    args = parser.parse_args()
+
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listener.bind(('127.0.0.1', 0))
+    listener.listen(1)
+    threading.Thread(target=device, args=(listener, args.latency), daemon=True).start()
+
+    print(f'{"window":>8} {"requests/s":>12}')
+    for size in (1, 4, 16):
+        print(f'{size:>8} {benchmark(listener.getsockname()[1], size, args.number):>12.2f}')
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import os
+import timeit
+import argparse
+from Crypto.Cipher import PKCS1_v1_5
+from ..misc.crypto import RSAKeyHandle, RSAPublicKeyHandle, RSAPrivateKeyHandle
+
+
+# Usage: python -m PyAppFramework.tests.rsa_envelope_benchmark --bits=3072 --sizes 1 16 64
+def legacy_encrypt(key: RSAKeyHandle, message: bytes) -> bytes:
+    """RSAKeyHandle.encrypt before join optimized, concatenate each block result"""
+    result = bytes()
+    max_length = key.get_max_length(True)
+    cipher = PKCS1_v1_5.new(getattr(key, '_key'))
+    while message:
+        result += cipher.encrypt(message[:max_length])
+        message = message[max_length:]
+
+    return result
+
+
+def report(name: str, size: int, number: int, stmt) -> None:
+    cost = min(timeit.repeat(stmt, number=number, repeat=3)) / number
+    print(f'{name:<24} {size:>8} {cost * 1000:>12.3f} {size / 1024 / cost:>12.2f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--bits', type=int, default=3072, help='RSA key bits')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 16, 64], help='Payload size in KB')
+    parser.add_argument('--number', type=int, default=5, help='Each benchmark loop number')
+    args = parser.parse_args()
+
+    pair = RSAKeyHandle.generate_key_pair(args.bits)
+    public_key = RSAPublicKeyHandle(pair.public_key)
+    private_key = RSAPrivateKeyHandle(pair.private_key)
+
+    print(f'{"method":<24} {"size(B)":>8} {"cost(ms)":>12} {"KB/s":>12}')
+    for kb in args.sizes:
+        payload = os.urandom(kb * 1024)
+        block = public_key.encrypt(payload)
+        envelope = public_key.envelope_encrypt(payload)
+
+        report('legacy block encrypt', kb * 1024, args.number, lambda: legacy_encrypt(public_key, payload))
+        report('block encrypt', kb * 1024, args.number, lambda: public_key.encrypt(payload))
+        report('block decrypt', kb * 1024, args.number, lambda: private_key.decrypt(block))
+        report('envelope encrypt', kb * 1024, args.number, lambda: public_key.envelope_encrypt(payload))
+        report('envelope decrypt', kb * 1024, args.number, lambda: private_key.envelope_decrypt(envelope))
+        print(f'{"block/envelope size":<24} {kb * 1024:>8} {len(block):>12} {len(envelope):>12}')
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+import serial
+import time
+import struct
+import select
+import argparse
+import tempfile
+import selectors
+import statistics
+from threading import Thread
+from ..core.timer import Task
+from ..protocol.serialport import SerialPort
+from ..protocol.switch import SerialPortSwitch, SerialPortSwitchSettings
+from ..protocol.transmit import TransmitException, TransmitWarning, TCPServerTransmitHandle, TCPClientTransmit, \
+    TCPSocketTransmit
+
+
+# Usage: python -m PyAppFramework.tests.serial_switch_benchmark --down=2 --size=64 --number=200
+class LegacySerialPortSwitch(SerialPortSwitch):
+    """One byte per tcp frame through a loopback server, rules are matched for each payload,
+    as SerialPortSwitch before in-process burst forwarding"""
+    Port = 56789
+
+    def __init__(self):
+        super(LegacySerialPortSwitch, self).__init__()
+        self._cached_msg = bytes()
+        self._client_list = list()
+        self._selector = selectors.DefaultSelector()
+        self._server = TCPServerTransmitHandle(self.handle, length_fmt=TCPSocketTransmit.DefaultLengthFormat)
+
+    def start(self, settings: SerialPortSwitchSettings = None) -> bool:
+        self._server.start(('127.0.0.1', self.Port), backlog=8)
+        self._msg_interval = settings.msg_interval
+        Thread(target=self.thread_switch, daemon=True).start()
+
+        for index, name in enumerate(f'{settings.up_stream}, {settings.down_stream}'.split(',')):
+            name = name.strip()
+            ser = SerialPort(name, **settings.comm_params)
+            self._serial_list.append(ser)
+            self._rules[index] = settings.get_rule(name)
+            Thread(target=self.thread_rx_serial, args=(ser, index), daemon=True).start()
+
+        return True
+
+    def handle(self, transmit: TCPSocketTransmit):
+        self._client_list.append(transmit)
+        port = struct.unpack('>L', transmit.rx(0))[0]
+        self._selector.register(transmit.raw_socket, selectors.EVENT_READ, data=port)
+
+    def rule_process(self, src_port: int, payload: bytes, process: SerialPortSwitch.ProcessFunc):
+        tx_mask = (1 << src_port)
+        src_rule = self._rules.get(src_port)
+        if not src_rule:
+            return
+
+        for dest_port, ser in enumerate(self._serial_list):
+            dest_rule = self._rules.get(dest_port)
+            if src_rule.tx_dest & (1 << dest_port):
+                if dest_rule.rx_mask & tx_mask:
+                    process(src_port, dest_port, ser, payload)
+
+    def relay_client(self, client: TCPSocketTransmit, port: int):
+        try:
+            payload = client.rx(0)
+        except TransmitWarning:
+            return
+        except (BrokenPipeError, ConnectionResetError, TransmitException):
+            payload = b''
+
+        if payload:
+            if self._previous_port != port and self._cached_msg:
+                self.task_write_log()
+
+            self._previous_port = port
+            self._cached_msg += payload
+            self.rule_process(port, payload, lambda _s, d_, ser, data: ser.write(data))
+            self._tasklet.add_task(Task(func=self.task_write_log, timeout=self._msg_interval))
+
+    def thread_switch(self):
+        while not self._exit:
+            if not self._selector.get_map():
+                time.sleep(0.01)
+                continue
+
+            for key, mask in self._selector.select(0.1):
+                for client in self._client_list:
+                    if client.raw_socket == key.fileobj:
+                        self.relay_client(client, key.data)
+
+    def thread_rx_serial(self, ser: SerialPort, index: int):
+        client = TCPClientTransmit(TCPSocketTransmit.DefaultLengthFormat)
+
+        try:
+            client.connect(('127.0.0.1', self.Port))
+        except TransmitException as e:
+            print(f'Connect server error: {e}')
+            sys.exit(-2)
+        else:
+            client.tx(struct.pack('>L', index))
+
+        while not self._exit:
+            try:
+                client.tx(ser.read(1, timeout=0.001))
+            except serial.SerialException:
+                continue
+
+
+def create_ports(number: int):
+    """Simulated serial ports, switch opens the slave side, benchmark reads and writes the master side"""
+    masters, names = list(), list()
+    for _ in range(number):
+        master, slave = os.openpty()
+        masters.append(master)
+        names.append(os.ttyname(slave))
+
+    return masters, names
+
+
+def create_settings(names) -> SerialPortSwitchSettings:
+    up, down = names[0], names[1:]
+    rule = {up: dict(rx_mask=(1 << len(names)) - 2, tx_dest=(1 << len(names)) - 2)}
+    rule.update({name: dict(rx_mask=0x1, tx_dest=0x1) for name in down})
+    return SerialPortSwitchSettings(
+        msg_interval=0.05, up_stream=up, down_stream=', '.join(down), rule=rule,
+        comm_params=dict(baudrate=115200, bytesize=8, parity='N', stopbits=1, timeout=0.1)
+    )
+
+
+def receive(fd: int, size: int, timeout: float = 5.0) -> int:
+    received = 0
+    while received < size:
+        if not select.select([fd], [], [], timeout)[0]:
+            break
+
+        received += len(os.read(fd, 65536))
+
+    return received
+
+
+def benchmark(cls, down: int, size: int, number: int):
+    masters, names = create_ports(down + 1)
+    switch = cls()
+    switch.start(create_settings(names))
+    time.sleep(0.2)
+
+    up, down_masters = masters[0], masters[1:]
+    frame = bytes(x & 0xff for x in range(size))
+
+    # Latency: up stream frame to the last down stream port received the whole frame
+    latency = list()
+    for _ in range(number):
+        start = time.perf_counter()
+        os.write(up, frame)
+        for fd in down_masters:
+            receive(fd, size)
+        latency.append(time.perf_counter() - start)
+
+    # Throughput: up stream keeps writing, all down stream ports receive the whole data
+    total = size * number
+    readers = [Thread(target=receive, args=(fd, total)) for fd in down_masters]
+    start, cpu = time.perf_counter(), time.process_time()
+    for reader in readers:
+        reader.start()
+
+    for _ in range(number):
+        os.write(up, frame)
+
+    for reader in readers:
+        reader.join()
+
+    cost, cpu = time.perf_counter() - start, time.process_time() - cpu
+    switch.stop()
+    time.sleep(0.2)
+    for fd in masters:
+        os.close(fd)
+
+    return total / 1024 / cost, statistics.median(latency) * 1000, cpu / (total / 1024) * 1000
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--down', type=int, default=2, help='Down stream ports number')
+    parser.add_argument('--size', type=int, default=64, help='Up stream frame size')
+    parser.add_argument('--number', type=int, default=200, help='Frames number')
+    args = parser.parse_args()
+
+    # Switch writes relay log to current directory
+    os.chdir(tempfile.mkdtemp())
+    print(f'{"switch":>10} {"KB/s":>10} {"latency p50(ms)":>16} {"cpu(ms)/KB":>12}')
+    for name, switch_cls in (('legacy', LegacySerialPortSwitch), ('burst', SerialPortSwitch)):
+        throughput, p50, cpu_per_kb = benchmark(switch_cls, args.down, args.size, args.number)
+        print(f'{name:>10} {throughput:>10.2f} {p50:>16.3f} {cpu_per_kb:>12.3f}')
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import types
+import serial
+import shutil
+import unittest
+import tempfile
+import threading
+import collections
+from ..protocol.serialport import SerialPort
+from ..protocol.switch import SerialPortSwitch, SerialPortSwitchSettings
+
+
+class FakeSerial:
+    def __init__(self, name: str):
+        self.raw_port = types.SimpleNamespace(port=name)
+
+    def write(self, data: bytes):
+        pass
+
+
+class FakeLogger:
+    def __init__(self):
+        self.messages = list()
+
+    def logging(self, msg):
+        # As writing log file, let rx threads run while logging
+        time.sleep(0.0001)
+        self.messages.append(msg.content)
+
+
+class SerialPortSwitchTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Switch writes relay log to current directory
+        self.cwd = os.getcwd()
+        self.path = tempfile.mkdtemp()
+        os.chdir(self.path)
+
+    def tearDown(self) -> None:
+        os.chdir(self.cwd)
+        shutil.rmtree(self.path)
+
+    def testBuildRoutes(self):
+        settings = SerialPortSwitchSettings.default()
+        rules = {index: settings.get_rule(name) for index, name in enumerate(('COM3', 'COM6', 'COM9'))}
+
+        # COM9 tx to COM3, but COM3 rx mask doesn't have COM9
+        self.assertEqual(SerialPortSwitch.build_routes(rules, 3), {0: (1, 2), 1: (0,), 2: ()})
+
+        # Destination port without rule, or out of range is not routed
+        rule = SerialPortSwitchSettings.Rule
+        self.assertEqual(SerialPortSwitch.build_routes({0: rule(rx_mask=0x2, tx_dest=0x6)}, 3), {0: ()})
+        self.assertEqual(SerialPortSwitch.build_routes({0: rule(0x2, 0x6), 1: rule(0x1, 0x1)}, 1), {0: (), 1: (0,)})
+
+    def testWriteLog(self):
+        number = 2000
+        switch = SerialPortSwitch()
+        switch._log = FakeLogger()
+        switch._serial_list = [FakeSerial(f'COM{x}') for x in range(3)]
+        switch._routes = {0: (1, 2), 1: (0,), 2: ()}
+
+        # Relay from two ports while cached message is written to log
+        threads = [threading.Thread(target=lambda p: [switch.relay(p, bytes([p]) * 3) for _ in range(number)],
+                                    args=(port,)) for port in (0, 1)]
+        for th in threads:
+            th.start()
+
+        while any(th.is_alive() for th in threads):
+            switch.task_write_log()
+
+        switch.task_write_log()
+        logged = collections.Counter()
+        for msg in switch._log.messages:
+            route, data = msg.split(': ')
+            src, dest = route.split(' ==> ')
+            # Every byte is logged once for each destination under its source port
+            self.assertEqual(set(bytes.fromhex(data)), {int(src[-1])})
+            logged[src] += len(bytes.fromhex(data))
+
+        self.assertEqual(logged, {'COM0': number * 3 * 2, 'COM1': number * 3})
+
+
+class SerialPortReadBurstTest(unittest.TestCase):
+    IDLE = 0.02
+
+    def setUp(self) -> None:
+        self.master, slave = os.openpty()
+        self.port = SerialPort(os.ttyname(slave), 115200, timeout=0.5)
+        os.close(slave)
+
+    def tearDown(self) -> None:
+        self.port.close()
+        os.close(self.master)
+
+    def testIdleSplit(self):
+        # Bytes within idle time are one burst
+        os.write(self.master, b'ab')
+        threading.Timer(self.IDLE / 4, os.write, args=(self.master, b'cd')).start()
+        self.assertEqual(self.port.read_burst(self.IDLE), b'abcd')
+
+        # Line idle is a frame boundary
+        os.write(self.master, b'hello')
+        threading.Timer(self.IDLE * 10, os.write, args=(self.master, b'world')).start()
+        self.assertEqual(self.port.read_burst(self.IDLE), b'hello')
+        self.assertEqual(self.port.read_burst(self.IDLE), b'world')
+
+    def testSize(self):
+        os.write(self.master, bytes(range(10)))
+        time.sleep(self.IDLE)
+        self.assertEqual(self.port.read_burst(self.IDLE, size=4), bytes(range(4)))
+        self.assertEqual(self.port.read_burst(self.IDLE), bytes(range(4, 10)))
+
+    def testTimeout(self):
+        start = time.perf_counter()
+        with self.assertRaises(serial.SerialTimeoutException):
+            self.port.read_burst(self.IDLE, timeout=0.1)
+
+        self.assertGreaterEqual(time.perf_counter() - start, 0.1)
+        self.assertRaises(serial.SerialException, self.port.read_burst, self.IDLE, size=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
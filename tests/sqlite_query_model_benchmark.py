@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import os
+import time
+import argparse
+import tempfile
+from PySide2 import QtCore
+from ..gui.model import SqliteQueryModel, create_or_open_sqlite_db
+from ..core.database import DBTable, DBColumn, DBItemType, SQLiteDatabase
+
+
+# Usage: python -m PyAppFramework.tests.sqlite_query_model_benchmark --rows=20 --repeat=10
+TABLE = DBTable('log', [
+    DBColumn(name='id', type=DBItemType.int, attr='PRIMARY KEY AUTOINCREMENT'),
+    DBColumn(name='timestamp', type=DBItemType.real),
+    DBColumn(name='level', type=DBItemType.text),
+    DBColumn(name='content', type=DBItemType.text),
+])
+
+
+def page_load_time(model: SqliteQueryModel, page: int, repeat: int, turn: bool = False) -> float:
+    """Min page load cost, jump(page keys cache dropped) or page turn(previous page was loaded)"""
+    cost = list()
+    for _ in range(repeat):
+        # Row count cache is filled before timing, only page locating and loading is measured
+        model.invalidate_cache()
+        _ = model.record_count
+        if turn and page:
+            model.flush_page(page - 1, force=True)
+
+        start = time.perf_counter()
+        model.flush_page(page, force=True)
+        while model.canFetchMore():
+            model.fetchMore()
+        cost.append(time.perf_counter() - start)
+
+    return min(cost)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=20, help='Rows per page')
+    parser.add_argument('--repeat', type=int, default=10, help='Each page load repeat times')
+    args = parser.parse_args()
+
+    app = QtCore.QCoreApplication([])
+    pages = (1, 1000, 10000)
+    path = os.path.join(tempfile.mkdtemp(), 'page.db')
+
+    create_or_open_sqlite_db(path, [TABLE])
+
+    # Enough records for the last page
+    db = SQLiteDatabase(path)
+    db.insertRecords(TABLE.name, [(time.time(), 'INFO', f'record {i}') for i in range(max(pages) * args.rows * 2)])
+    db.close()
+
+    offset_model = SqliteQueryModel(path, TABLE, rows_per_page=args.rows)
+    keyset_model = SqliteQueryModel(path, TABLE, rows_per_page=args.rows, keyset_column=TABLE.pk)
+
+    print(f'{"page":>8} {"offset(ms)":>12} {"keyset jump(ms)":>16} {"keyset next(ms)":>16}')
+    for number in pages:
+        offset = page_load_time(offset_model, number - 1, args.repeat)
+        jump = page_load_time(keyset_model, number - 1, args.repeat)
+        turn = page_load_time(keyset_model, number - 1, args.repeat, turn=True)
+        print(f'{number:>8} {offset * 1000:>12.3f} {jump * 1000:>16.3f} {turn * 1000:>16.3f}')
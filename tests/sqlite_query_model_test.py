@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import unittest
+import tempfile
+from PySide2 import QtWidgets
+from ..gui.view import SqliteQueryView
+from ..gui.model import SqliteQueryModel, create_or_open_sqlite_db
+from ..core.database import DBTable, DBColumn, DBItemType, SQLiteDatabase
+TABLE = DBTable('log', [
+    DBColumn(name='id', type=DBItemType.int, attr='PRIMARY KEY AUTOINCREMENT'),
+    DBColumn(name='level', type=DBItemType.text),
+    DBColumn(name='content', type=DBItemType.text),
+])
+
+
+class SqliteQueryModelTest(unittest.TestCase):
+    ROWS = 95
+    ROWS_PER_PAGE = 10
+    CONDITION = "level = 'A' OR level = 'B'"
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+        cls.dir = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.dir, 'page.db')
+        create_or_open_sqlite_db(cls.path, [TABLE])
+
+        db = SQLiteDatabase(cls.path)
+        db.insertRecords(TABLE.name, [('ABC'[i % 3], f'record {i}') for i in range(cls.ROWS)])
+        db.close()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(cls.dir)
+
+    @staticmethod
+    def page_rows(model: SqliteQueryModel, page: int) -> list:
+        model.flush_page(page, force=True)
+        while model.canFetchMore():
+            model.fetchMore()
+
+        return [tuple(model.record(row).value(column) for column in range(model.columnCount()))
+                for row in range(model.rowCount())]
+
+    def compare_pages(self, condition: str):
+        offset = SqliteQueryModel(self.path, TABLE, condition=condition, rows_per_page=self.ROWS_PER_PAGE)
+        keyset = SqliteQueryModel(self.path, TABLE, condition=condition,
+                                  rows_per_page=self.ROWS_PER_PAGE, keyset_column=TABLE.pk)
+
+        # Jump back and forth, keyset page key is located from head, tail and cached pages
+        pages = [0, 9, 5, 6, 4, 1, 8, 2, 7, 3]
+        offset_pages = [self.page_rows(offset, x) for x in pages]
+        self.assertEqual([self.page_rows(keyset, x) for x in pages], offset_pages)
+        return offset_pages
+
+    def testKeysetPages(self):
+        pages = self.compare_pages('')
+        self.assertEqual(sum(len(x) for x in pages), self.ROWS)
+
+    def testKeysetPagesWithCondition(self):
+        pages = self.compare_pages(self.CONDITION)
+        rows = [row for page in pages for row in page]
+        self.assertEqual(len(set(rows)), len([x for x in range(self.ROWS) if x % 3 != 2]))
+        self.assertTrue(all(row[1] in ('A', 'B') for row in rows))
+
+    def testFlushExternalRecords(self):
+        model = SqliteQueryModel(self.path, TABLE, rows_per_page=self.ROWS_PER_PAGE, keyset_column=TABLE.pk)
+        view = SqliteQueryView(model)
+        view.slotFlush()
+        self.assertEqual((model.record_count, model.total_page), (self.ROWS, 10))
+
+        # Records written by another connection are shown after refresh
+        db = SQLiteDatabase(self.path)
+        try:
+            db.insertRecords(TABLE.name, [('D', f'external {i}') for i in range(self.ROWS_PER_PAGE)])
+            view.slotFlush(scroll_to_end=True)
+            self.assertEqual((model.record_count, model.total_page), (self.ROWS + self.ROWS_PER_PAGE, 11))
+            model.flush_page(model.total_page - 1)
+            self.assertEqual([model.record(x).value(2) for x in range(model.rowCount())],
+                             [f'external {i}' for i in range(5, 10)])
+        finally:
+            db.deleteRecord(TABLE.name, "level = 'D'", commit=True)
+            db.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
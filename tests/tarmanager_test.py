@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+import os
+import shutil
+import unittest
+import tempfile
+from ..misc.tarmanager import TarManager, TarManagerError, TarManifest
+
+
+class PackageTestBase(unittest.TestCase):
+    FILES = {
+        'empty': b'',
+        'a/small.txt': b'hello' * 100,
+        'a/b/large.bin': os.urandom(300000) + bytes(300000),
+    }
+
+    def setUp(self) -> None:
+        self.path = tempfile.mkdtemp()
+        self.src = os.path.join(self.path, 'src')
+        for name, data in self.FILES.items():
+            os.makedirs(os.path.dirname(os.path.join(self.src, name)), exist_ok=True)
+            with open(os.path.join(self.src, name), 'wb') as fp:
+                fp.write(data)
+
+    def tearDown(self) -> None:
+        shutil.rmtree(self.path)
+
+    def check_tree(self, path: str):
+        for name, data in self.FILES.items():
+            with open(os.path.join(path, name), 'rb') as fp:
+                self.assertEqual(fp.read(), data)
+
+
+class Lz4StreamTest(PackageTestBase):
+    def testWalk(self):
+        self.assertEqual(sorted(TarManager.walk(self.src)), ['./a/b/large.bin', './a/small.txt', './empty'])
+        self.assertEqual(list(TarManager.walk(self.src, extensions=['txt'])), ['./a/small.txt'])
+        self.assertEqual(list(TarManager.walk(self.src, pre_filter=lambda x: x == '.')), ['./empty'])
+
+    def testStreamPack(self):
+        cwd = os.getcwd()
+        package = os.path.join(self.path, 'stream.lz4')
+        callback = list()
+        TarManager.stream_pack(self.src, package, TarManager.walk(self.src), workers=2, block_size=65536,
+                               callback=lambda name, index: callback.append(name))
+        self.assertEqual(os.getcwd(), cwd)
+        self.assertEqual(sorted(callback), ['./a/b/large.bin', './a/small.txt', './empty'])
+        self.assertEqual(sorted(TarManager.get_members(package)),
+                         ['./a/b/large.bin.lz4', './a/small.txt.lz4', './empty.lz4'])
+
+        # Multi frames member could be unpacked by both streaming and legacy unpack
+        for streaming in (True, False):
+            extract = os.path.join(self.path, f'extract{streaming}')
+            TarManager.unpack(package, extract, streaming=streaming)
+            self.check_tree(extract)
+
+    def testLegacyCompatible(self):
+        package = os.path.join(self.path, 'legacy.lz4')
+        TarManager.pack(self.src, package)
+        TarManager.unpack(package, os.path.join(self.path, 'extract'), streaming=True)
+        self.check_tree(os.path.join(self.path, 'extract'))
+
+        package = os.path.join(self.path, 'stream.lz4')
+        TarManager.pack(self.src, package, streaming=True)
+        TarManager.unpack(package, os.path.join(self.path, 'extract2'))
+        self.check_tree(os.path.join(self.path, 'extract2'))
+
+
+class IncrementalPackTest(PackageTestBase):
+    def modify(self):
+        with open(os.path.join(self.src, 'a/small.txt'), 'wb') as fp:
+            fp.write(b'world' * 100)
+        os.utime(os.path.join(self.src, 'a/small.txt'), (1e9, 1e9))
+        os.unlink(os.path.join(self.src, 'empty'))
+        self.FILES = {'a/small.txt': b'world' * 100, 'a/b/large.bin': self.FILES['a/b/large.bin']}
+
+    def testManifest(self):
+        files = list(TarManager.walk(self.src))
+        manifest = TarManifest.create(self.src, files, workers=2)
+        self.assertEqual(sorted(manifest.files), sorted(files))
+        self.assertEqual(manifest.verify(self.src), [])
+
+        filename = os.path.join(self.path, 'test.manifest')
+        manifest.save(filename)
+        self.assertEqual(TarManifest.load(filename).files, manifest.files)
+
+        self.modify()
+        current = TarManifest.create(self.src, TarManager.walk(self.src), manifest)
+        self.assertEqual(current.diff(manifest), (['./a/small.txt'], ['./empty']))
+        self.assertEqual(sorted(manifest.verify(self.src)), ['./a/small.txt', './empty'])
+
+    def testIncrementalPack(self):
+        for fmt in ('lz4', 'gz', 'zip'):
+            package = os.path.join(self.path, f'full.{fmt}')
+            TarManager.pack(self.src, package, incremental=True)
+            self.assertTrue(os.path.isfile(TarManifest.get_manifest_path(package)))
+
+        # Package again with a modified tree, unchanged lz4 members are copied from previous package
+        self.modify()
+        for fmt in ('lz4', 'gz', 'zip'):
+            package = os.path.join(self.path, f'full.{fmt}')
+            TarManager.pack(self.src, package, incremental=True)
+            extract = os.path.join(self.path, f'extract_{fmt}')
+            TarManager.unpack(package, extract)
+            self.check_tree(extract)
+            self.assertEqual(TarManager.verify(extract, package), [])
+
+    def testZipFormat(self):
+        # `dzip` package is written as `.zip`, manifest is saved next to it
+        package = os.path.join(self.path, 'full.zip')
+        files = ['src', 'full.zip', os.path.basename(TarManifest.get_manifest_path(package))]
+        TarManager.incremental_pack(self.src, os.path.join(self.path, 'full.dzip'), TarManager.walk(self.src))
+        self.assertEqual(sorted(os.listdir(self.path)), sorted(files))
+
+        self.modify()
+        manifest = TarManager.incremental_pack(self.src, os.path.join(self.path, 'full.dzip'),
+                                               TarManager.walk(self.src))
+        self.assertEqual(sorted(os.listdir(self.path)), sorted(files))
+        self.assertEqual(manifest.diff(TarManifest.load(TarManifest.get_manifest_path(package))), ([], []))
+
+        TarManager.unpack(package, os.path.join(self.path, 'extract'))
+        self.assertEqual(manifest.verify(os.path.join(self.path, 'extract')), [])
+
+    def testReplaceFailed(self):
+        package = os.path.join(self.path, 'full.gz')
+        os.makedirs(os.path.join(package, 'busy'))
+        with self.assertRaises(TarManagerError):
+            TarManager.incremental_pack(self.src, package, TarManager.walk(self.src))
+
+        self.assertFalse(os.path.exists(f'{package}.tmp'))
+        self.assertFalse(os.path.exists(TarManifest.get_manifest_path(package)))
+
+    def testDeltaPack(self):
+        full = os.path.join(self.path, 'full.lz4')
+        delta = os.path.join(self.path, 'delta.lz4')
+        TarManager.incremental_pack(self.src, full, TarManager.walk(self.src))
+        TarManager.unpack(full, os.path.join(self.path, 'extract'))
+
+        self.modify()
+        manifest = TarManager.incremental_pack(self.src, delta, TarManager.walk(self.src), base=full, delta=True)
+        self.assertEqual((manifest.base, manifest.removed), ('full.lz4', ['./empty']))
+        self.assertEqual(TarManager.get_members(delta), ['./a/small.txt.lz4'])
+
+        manifest = TarManager.apply_delta(delta, os.path.join(self.path, 'extract'), streaming=True)
+        self.assertEqual(manifest.verify(os.path.join(self.path, 'extract')), [])
+        self.assertFalse(os.path.exists(os.path.join(self.path, 'extract', 'empty')))
+        self.check_tree(os.path.join(self.path, 'extract'))
+
+        # Full package again reuse unchanged compressed members
+        manifest = TarManager.incremental_pack(self.src, full, TarManager.walk(self.src))
+        self.assertEqual(manifest.base, '')
+        TarManager.unpack(full, os.path.join(self.path, 'extract2'), streaming=True)
+        self.check_tree(os.path.join(self.path, 'extract2'))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+import inspect
+import timeit
+import argparse
+from typing import Callable, Tuple, Dict, Any
+from ..core import timer
+from ..core.timer import Task
+from ..core.utils import util_auto_kwargs
+
+
+# Usage: python -m PyAppFramework.tests.task_run_benchmark --number=100000
+def legacy_auto_kwargs(func: Callable, args: Tuple, auto_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    """util_auto_kwargs without parameters plan cache, inspect signature on each call"""
+    parameters = inspect.signature(func).parameters
+    normal_params = [k for k in inspect.signature(func).parameters if k not in auto_kwargs.keys()]
+
+    kwargs = {k: auto_kwargs.get(k) for k in auto_kwargs if k in parameters}
+    kwargs.update(dict(zip(normal_params, args)))
+    return kwargs
+
+
+def legacy_task_id(task: Task) -> str:
+    """Task.id() without precomputed id"""
+    return f"{task.func.__name__}{inspect.signature(task.func)}{task.timeout}{task.periodic}"
+
+
+def poll(task, address: int, count: int = 1):
+    return address, count
+
+
+class Device(object):
+    def poll(self, tasklet, address: int, count: int = 1):
+        return address, count
+
+
+def report(name: str, number: int, stmt: Callable):
+    cost = min(timeit.repeat(stmt, number=number, repeat=3))
+    print(f'{name:<32} {cost / number * 1e6:>10.2f} us')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--number', type=int, default=100000, help='Each benchmark loop number')
+    args = parser.parse_args()
+
+    device = Device()
+    auto_args = {Task.TASK_KEYWORD: None, Task.TASKLET_KEYWORD: None}
+    function_task = Task(func=poll, timeout=1.0, args=(1,))
+    method_task = Task(func=device.poll, timeout=1.0, args=(1, 2))
+
+    for name, func, func_args in (('function', poll, (1,)), ('bound method', device.poll, (1, 2))):
+        report(f'legacy_auto_kwargs({name})', args.number, lambda: legacy_auto_kwargs(func, func_args, auto_args))
+        report(f'util_auto_kwargs({name})', args.number, lambda: util_auto_kwargs(func, func_args, auto_args))
+
+    report('legacy Task.id()', args.number, lambda: legacy_task_id(function_task))
+    report('Task.id()', args.number, lambda: function_task.id())
+
+    # Task.run overhead before/after: swap auto kwargs implementation used by Task.run
+    timer.util_auto_kwargs = legacy_auto_kwargs
+    report('legacy Task.run(function)', args.number, lambda: function_task.run())
+    report('legacy Task.run(bound method)', args.number, lambda: method_task.run())
+
+    timer.util_auto_kwargs = util_auto_kwargs
+    report('Task.run(function)', args.number, lambda: function_task.run())
+    report('Task.run(bound method)', args.number, lambda: method_task.run())
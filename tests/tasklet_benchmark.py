@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import time
+import random
+import argparse
+import statistics
+from ..core.timer import Task, Tasklet
+
+
+# Usage: python -m PyAppFramework.tests.tasklet_benchmark --duration=5
+records = dict()
+
+
+def periodic_task(index: int, task: Task):
+    records.setdefault(index, list()).append((time.perf_counter(), task.timeout))
+
+
+def benchmark(policy: str, task_number: int, interval: float, duration: float) -> dict:
+    records.clear()
+    tasklet = Tasklet(schedule_interval=interval, policy=policy, name=policy)
+
+    for i in range(task_number):
+        timeout = random.choice((0.1, 0.2, 0.5, 1.0))
+        tasklet.add_task(Task(func=periodic_task, timeout=timeout, periodic=True,
+                              args=(i,), id_ignore_args=False))
+
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    time.sleep(duration)
+    cpu_cost, wall_cost = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    tasklet.destroy()
+
+    # Dispatch latency: how much later than expected a periodic task runs
+    latency = list()
+    for record in records.values():
+        for (previous, timeout), (current, _) in zip(record, record[1:]):
+            latency.append(max(current - previous - timeout, 0.0))
+
+    latency.sort()
+    return dict(
+        runs=sum(len(x) for x in records.values()),
+        cpu=cpu_cost / wall_cost * 100,
+        mean=statistics.mean(latency) * 1000 if latency else 0.0,
+        p99=latency[int(len(latency) * 0.99)] * 1000 if latency else 0.0,
+    )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--duration', type=float, default=5.0, help='Each benchmark duration in second')
+    parser.add_argument('--interval', type=float, default=0.05, help='Tasklet schedule interval')
+    args = parser.parse_args()
+
+    print(f'{"policy":>10} {"tasks":>6} {"runs":>8} {"cpu%":>8} {"mean(ms)":>10} {"p99(ms)":>10}')
+    for number in (10, 100, 1000):
+        for name in Tasklet.SCHEDULE_POLICIES:
+            r = benchmark(name, number, args.interval, args.duration)
+            print(f'{name:>10} {number:>6} {r["runs"]:>8} {r["cpu"]:>8.2f} {r["mean"]:>10.2f} {r["p99"]:>10.2f}')
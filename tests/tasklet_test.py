@@ -1,7 +1,8 @@
 # -*- coding: utf-8 -*-
 import time
 import unittest
-from ..core.timer import Task, Tasklet
+import threading
+from ..core.timer import Task, Tasklet, SwTimer, TimerScheduler, TaskStatistic
 
 
 def func(x):
@@ -72,6 +73,29 @@ class TaskletTest(unittest.TestCase):
         self.tasklet.add_task(t2)
         time.sleep(2)
 
+    def testTaskBoundMethod(self):
+        class Device(object):
+            def poll(self, tasklet, address, count=1):
+                return address, count
+
+        device = Device()
+        with self.assertRaises(TypeError):
+            Task(func=device.poll, timeout=1)
+
+        t1 = Task(func=device.poll, timeout=0.1, args=(1,))
+        t2 = Task(func=device.poll, timeout=0.1, args=(1, 2))
+        self.assertEqual(t1.id(), str(t1))
+        self.assertEqual(t1.id(), "poll(tasklet, address, count=1)0.1False")
+
+        # Update timeout will update task id
+        t2.update(dict(timeout=0.2))
+        self.assertEqual(t2.id(), "poll(tasklet, address, count=1)0.2False")
+
+        tid1 = self.tasklet.add_task(t1)
+        tid2 = self.tasklet.add_task(t2)
+        self.assertEqual(tid1.result.wait(2), (1, 1))
+        self.assertEqual(tid2.result.wait(2), (1, 2))
+
     def testTasklet(self):
         self.assertEqual(self.tasklet.tick, 1.0)
         self.assertEqual(self.tasklet.is_idle(), (True, True))
@@ -183,5 +207,179 @@ class TaskletTest(unittest.TestCase):
         self.assertEqual(t2.running_times(), t2_cnt)
 
 
+class TaskletDeadlineTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tasklet = Tasklet(schedule_interval=0.1, max_workers=3, policy=Tasklet.SCHEDULE_DEADLINE)
+
+    def tearDown(self) -> None:
+        self.tasklet.destroy()
+
+    def testPolicy(self):
+        with self.assertRaises(ValueError):
+            Tasklet(policy='round-robin')
+
+        self.assertEqual(self.tasklet.policy, Tasklet.SCHEDULE_DEADLINE)
+
+    def testRunningRearm(self):
+        t1 = Task(func=func, timeout=0.1, args=(1,), periodic=True, id_ignore_args=False)
+        self.tasklet.add_task(t1)
+
+        # Hold task running lock, task is due while it's running, it should be re-armed not lost
+        with t1._Task__lock:
+            time.sleep(0.35)
+
+        t1_cnt = t1.running_times()
+        time.sleep(0.5)
+        self.assertGreaterEqual(t1.running_times(), t1_cnt + 3)
+
+    def testSingleShot(self):
+        t1 = Task(func=func, timeout=0.3, args=(1,), id_ignore_args=False)
+        t2 = Task(func=func, timeout=0.5, args=(2,), id_ignore_args=False)
+
+        tid1 = self.tasklet.add_task(t1)
+        tid2 = self.tasklet.add_task(t2)
+        self.assertEqual(tid1.result.wait(1), 1)
+        self.assertEqual(tid2.result.wait(1), 2)
+        self.assertLess(t1.runtime.latest, t2.runtime.latest)
+
+        time.sleep(0.1)
+        self.assertEqual(self.tasklet.is_task_in_schedule(tid1.id), False)
+        self.assertEqual(self.tasklet.is_task_in_schedule(tid2.id), False)
+
+    def testPeriodic(self):
+        t1 = Task(func=func, timeout=0.1, args=(1,), periodic=True, id_ignore_args=False)
+        t2 = Task(func=func, timeout=0.5, args=(2,), periodic=True, id_ignore_args=False)
+
+        self.tasklet.add_task(t1)
+        self.tasklet.add_task(t2)
+        time.sleep(2.05)
+        self.assertGreaterEqual(t1.running_times(), 15)
+        self.assertLessEqual(t1.running_times(), 20)
+        self.assertEqual(t2.running_times(), 4)
+
+        self.tasklet.del_task(t1.id())
+        t1_cnt = t1.running_times()
+        time.sleep(0.5)
+        self.assertEqual(t1.running_times(), t1_cnt)
+        self.assertEqual(t1.is_attached(), False)
+
+    def testPauseResume(self):
+        t1 = Task(func=func, timeout=0.2, args=(1,), periodic=True, id_ignore_args=False)
+
+        self.tasklet.add_task(t1, paused=True)
+        time.sleep(1)
+        self.assertEqual(t1.running_times(), 0)
+
+        self.tasklet.resume_task(t1.id())
+        time.sleep(1.1)
+        self.assertGreaterEqual(t1.running_times(), 4)
+
+        self.tasklet.pause_task(t1.id())
+        t1_cnt = t1.running_times()
+        time.sleep(1)
+        self.assertEqual(t1.running_times(), t1_cnt)
+
+    def testStatistic(self):
+        dumps = list()
+        tasklet = Tasklet(schedule_interval=0.1, max_workers=1, policy=Tasklet.SCHEDULE_DEADLINE,
+                          dump=dumps.append, stats_interval=0.5)
+
+        t1 = Task(func=func, timeout=0.1, args=(1,), periodic=True)
+        t2 = Task(func=lambda: time.sleep(0.15), timeout=0.1, periodic=True)
+        tasklet.add_task(t1)
+        tasklet.add_task(t2)
+        time.sleep(1.2)
+        tasklet.destroy()
+
+        statistics = tasklet.statistics()
+        self.assertEqual(statistics, dict())
+
+        summary = t2.statistic.summary()
+        self.assertEqual(summary['cnt'], t2.running_times())
+        self.assertEqual(summary['overrun'], summary['cnt'])
+        self.assertGreaterEqual(summary['cost_p50'], 0.15)
+        self.assertLessEqual(summary['cost_p50'], summary['cost_p99'])
+        self.assertEqual(t1.statistic.summary()['overrun'], 0)
+        self.assertLess(t1.statistic.summary()['lateness_p50'], 0.05)
+
+        self.assertEqual(len([x for x in dumps if 'statistics' in x]), 2)
+        self.assertEqual(TaskStatistic.percentile([3.0, 1.0, 2.0], 0.5), 2.0)
+        self.assertEqual(TaskStatistic.percentile([], 0.99), 0.0)
+
+    def testReschedule(self):
+        t1 = Task(func=func, timeout=0.5, args=(1,), id_ignore_args=False)
+        tid1 = self.tasklet.add_task(t1)
+        time.sleep(0.3)
+
+        # Re-add task will reload it's deadline
+        self.tasklet.add_task(t1)
+        self.assertEqual(tid1.result.wait(0.4), None)
+        self.assertEqual(tid1.result.wait(0.5), 1)
+
+
+class TimerSchedulerTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.scheduler = TimerScheduler(max_workers=2, name='Shared')
+
+    def tearDown(self) -> None:
+        self.scheduler.shutdown()
+
+    def testSwTimer(self):
+        threads = threading.active_count()
+        timers = [SwTimer(base=0.1, auto_start=True, name=f'timer{i}', scheduler=self.scheduler) for i in range(10)]
+        self.assertEqual(threading.active_count(), threads)
+
+        time.sleep(1.05)
+        for timer in timers:
+            self.assertGreaterEqual(timer.cnt, 9)
+            timer.stop()
+
+        stats = self.scheduler.stats()
+        self.assertEqual(stats['timer0'].cnt, timers[0].cnt)
+
+        cnt = timers[0].cnt
+        time.sleep(0.3)
+        self.assertEqual(timers[0].cnt, cnt)
+
+    def testTasklet(self):
+        threads = threading.active_count()
+        t1 = Tasklet(schedule_interval=0.1, max_workers=2, name='t1', scheduler=self.scheduler)
+        t2 = Tasklet(schedule_interval=0.1, name='t2', policy=Tasklet.SCHEDULE_DEADLINE, scheduler=self.scheduler)
+        self.assertEqual(threading.active_count(), threads)
+
+        task1 = Task(func=func, timeout=0.2, args=(1,), periodic=True)
+        task2 = Task(func=func, timeout=0.2, args=(2,), periodic=True)
+        tid = t1.add_task(Task(func=func, timeout=1, args=(3,)), immediate=True)
+        t1.add_task(task1)
+        t2.add_task(task2)
+
+        self.assertEqual(tid.result.wait(0.5), 3)
+        time.sleep(1.05)
+        self.assertGreaterEqual(task1.running_times(), 4)
+        self.assertGreaterEqual(task2.running_times(), 4)
+        self.assertEqual(self.scheduler.stats()['t1'].jobs, 1)
+        self.assertGreater(self.scheduler.stats()['t2'].cnt, 0)
+
+        t1.destroy()
+        t2.destroy()
+        cnt = task2.running_times()
+        time.sleep(0.5)
+        self.assertEqual(task2.running_times(), cnt)
+
+    def testDefault(self):
+        self.assertEqual(TimerScheduler.default(), None)
+        scheduler = TimerScheduler.install_default(max_workers=1)
+        self.assertIs(TimerScheduler.install_default(), scheduler)
+
+        tasklet = Tasklet(schedule_interval=0.1, name='default')
+        tid = tasklet.add_task(Task(func=func, timeout=0.2, args=(1,)))
+        self.assertEqual(tid.result.wait(1), 1)
+        self.assertEqual(scheduler.stats()['default'].cnt > 0, True)
+
+        tasklet.destroy()
+        TimerScheduler.uninstall_default()
+        self.assertEqual(TimerScheduler.default(), None)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+import time
+import socket
+import struct
+import argparse
+import threading
+from ..network.utility import tcp_socket_recv_data, tcp_socket_send_data
+
+
+# Usage: python -m PyAppFramework.tests.tcp_socket_benchmark --repeat=5
+def legacy_send_data(tcp_socket: socket.socket, data: bytes, header: str = ''):
+    """tcp_socket_send_data before scatter-gather, header and data are concatenated"""
+    total_send = 0
+    data = struct.pack(header, len(data)) + data if header else data
+
+    while total_send < len(data):
+        total_send += tcp_socket.send(data[total_send:])
+
+
+def legacy_recv_data(tcp_socket: socket.socket, length: int, header: str = '') -> bytes:
+    """tcp_socket_recv_data before recv_into, received data is appended to bytes"""
+    recv_data = bytes()
+    if header:
+        length = struct.unpack(header, tcp_socket.recv(struct.calcsize(header)))[0]
+
+    while len(recv_data) < length:
+        try:
+            data = tcp_socket.recv(length - len(recv_data))
+        except socket.timeout:
+            return recv_data
+
+        if not data:
+            raise BrokenPipeError('peer closed')
+
+        recv_data += data
+
+    return recv_data
+
+
+def benchmark(send, recv, size: int, repeat: int, **kwargs) -> float:
+    tx, rx = socket.socketpair()
+    rx.settimeout(5.0)
+    data = bytes(size)
+
+    th = threading.Thread(target=lambda: [send(tx, data, '>L') for _ in range(repeat)], daemon=True)
+    start = time.perf_counter()
+    th.start()
+
+    for _ in range(repeat):
+        assert len(recv(rx, 0, '>L', **kwargs)) == size
+
+    cost = time.perf_counter() - start
+    th.join()
+    tx.close()
+    rx.close()
+    return size * repeat / cost / 1024 / 1024
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--repeat', type=int, default=5, help='Each benchmark repeat times')
+    args = parser.parse_args()
+
+    print(f'{"size":>10} {"legacy(MB/s)":>14} {"bytes(MB/s)":>14} {"memoryview(MB/s)":>18}')
+    for mb in (1, 4, 16):
+        legacy = benchmark(legacy_send_data, legacy_recv_data, mb << 20, args.repeat)
+        current = benchmark(tcp_socket_send_data, tcp_socket_recv_data, mb << 20, args.repeat)
+        view = benchmark(tcp_socket_send_data, tcp_socket_recv_data, mb << 20, args.repeat, zero_copy=True)
+        print(f'{mb:>8}MB {legacy:>14.2f} {current:>14.2f} {view:>18.2f}')
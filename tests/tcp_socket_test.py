@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+import socket
+import struct
+import unittest
+import threading
+from ..network.utility import tcp_socket_recv_data, tcp_socket_send_data
+
+
+class TCPSocketDataTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.tx, self.rx = socket.socketpair()
+        self.rx.settimeout(1.0)
+
+    def tearDown(self) -> None:
+        self.tx.close()
+        self.rx.close()
+
+    def testSendRecv(self):
+        data = bytes(range(256)) * 4096
+        th = threading.Thread(target=tcp_socket_send_data, args=(self.tx, data, '>L'))
+        th.start()
+
+        self.assertEqual(tcp_socket_recv_data(self.rx, 0, '>L'), data)
+        th.join()
+
+        self.assertEqual(tcp_socket_send_data(self.tx, b''), [])
+        self.assertEqual(sum(tcp_socket_send_data(self.tx, b'', '>H')), 2)
+        self.assertEqual(tcp_socket_recv_data(self.rx, 0, '>H'), b'')
+
+    def testPartialHeader(self):
+        header = struct.pack('>L', 3)
+        self.tx.sendall(header[:1])
+
+        timer = threading.Timer(0.1, lambda: self.tx.sendall(header[1:] + b'abc'))
+        timer.start()
+        self.assertEqual(tcp_socket_recv_data(self.rx, 0, '>L'), b'abc')
+        timer.join()
+
+    def testTimeoutAndZeroCopy(self):
+        self.rx.settimeout(0.1)
+        self.tx.sendall(b'abc')
+        self.assertEqual(tcp_socket_recv_data(self.rx, 5), b'abc')
+
+        self.tx.sendall(b'abcde')
+        data = tcp_socket_recv_data(self.rx, 5, zero_copy=True)
+        self.assertIsInstance(data, memoryview)
+        self.assertEqual(data, b'abcde')
+
+    def testPeerClosed(self):
+        self.tx.sendall(b'ab')
+        self.tx.close()
+        self.assertRaises(BrokenPipeError, tcp_socket_recv_data, self.rx, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
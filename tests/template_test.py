@@ -0,0 +1,345 @@
+# -*- coding: utf-8 -*-
+import time
+import socket
+import asyncio
+import struct
+import unittest
+import threading
+import collections
+from ..core.timer import Task
+from ..protocol.transmit import TCPClientTransmit, TransmitWarning
+from ..protocol.aiotransmit import AsyncTCPClientTransmit, AsyncTransmitAdapter
+from ..network.utility import tcp_socket_recv_data, tcp_socket_send_data
+from ..protocol.template import CommunicationController, CommunicationEvent, CommunicationObject
+LENGTH_FMT = '>H'
+
+
+def tag_of(data: bytes) -> int:
+    return TaggedMessage.correlation_id_from_bytes(data)
+
+
+class TaggedMessage(CommunicationObject):
+    def to_bytes(self) -> bytes:
+        return struct.pack('>I', self.raw)
+
+    @classmethod
+    def from_bytes(cls, obj, data: bytes):
+        return cls(struct.unpack('>I', data)[0])
+
+    def correlation_id(self):
+        return self.raw
+
+    @classmethod
+    def correlation_id_from_bytes(cls, data: bytes):
+        return struct.unpack_from('>I', data)[0]
+
+
+class RegisterMessage(CommunicationObject):
+    """raw: (write, address, count or value), a write request writes one register"""
+    FMT = '>?HH'
+
+    def is_write(self) -> bool:
+        return self.raw[0]
+
+    def coalesce_key(self):
+        return self.raw[1], 1 if self.is_write() else self.raw[2]
+
+    def coalesce(self, other) -> bool:
+        write, address, count = self.raw
+        if other.is_write() or other.raw[1] != address + count:
+            return False
+
+        self.raw = (write, address, count + other.raw[2])
+        return True
+
+    def to_bytes(self) -> bytes:
+        return struct.pack(self.FMT, *self.raw)
+
+    @classmethod
+    def from_bytes(cls, obj, data: bytes):
+        return cls(struct.unpack(cls.FMT, data))
+
+
+class Controller(CommunicationController):
+    def __init__(self, transmit, message_cls=TaggedMessage, **kwargs):
+        self.events = list()
+        self.responses = list()
+        super(Controller, self).__init__(
+            CommunicationEvent, message_cls, message_cls, transmit, 4, 10.0, self.events.append, **kwargs
+        )
+
+    def _fetch_state(self, task: Task):
+        pass
+
+    def _simulate_handle(self, request: CommunicationObject) -> bool:
+        return False
+
+    def _response_handle(self, request: CommunicationObject, response: CommunicationObject):
+        self.responses.append(response.raw)
+        request.set_response(response.raw)
+
+    def _section_check(self, request: CommunicationObject, response: CommunicationObject, cost_time: float) -> bool:
+        return request.raw == response.raw
+
+    def event_data(self, type_):
+        return [x.data for x in self.events if x.isEvent(type_)]
+
+
+class Device(object):
+    def __init__(self, length_fmt: str = LENGTH_FMT, size: int = 0):
+        """Stand-in device echo request back, `plan(data, times)` returns response delay, None means drop it
+
+        :param length_fmt: msg header length struct pack format, empty means fixed `size` message
+        :param size: fixed message size
+        """
+        self.size = size
+        self.length_fmt = length_fmt
+        self.plan = lambda data, times: 0.0
+        self.history = list()
+        self.requests = collections.Counter()
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.bind(('127.0.0.1', 0))
+        self.server.listen(1)
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    @property
+    def address(self):
+        return self.server.getsockname()
+
+    def close(self):
+        self.server.close()
+
+    def serve(self):
+        try:
+            sock, _ = self.server.accept()
+        except OSError:
+            return
+
+        with sock:
+            while True:
+                try:
+                    data = tcp_socket_recv_data(sock, self.size, self.length_fmt)
+                except OSError:
+                    break
+
+                if not data:
+                    break
+
+                self.history.append(data)
+                self.requests[data] += 1
+                delay = self.plan(data, self.requests[data])
+                if delay is not None:
+                    threading.Timer(delay, self.response, args=(sock, data)).start()
+
+    def response(self, sock: socket.socket, data: bytes):
+        try:
+            tcp_socket_send_data(sock, data, self.length_fmt)
+        except OSError:
+            pass
+
+
+class PipelineTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.device = Device()
+        self.controller = Controller(TCPClientTransmit(length_fmt=LENGTH_FMT), pipeline_window=4)
+        self.controller.connect(self.device.address, 0.2)
+
+    def tearDown(self) -> None:
+        self.controller.disconnect()
+        self.device.close()
+
+    def testOutOfOrder(self):
+        # Each window later request responses earlier
+        self.device.plan = lambda data, times: (3 - tag_of(data) % 4) * 0.05
+        for tag in range(8):
+            self.controller.send_async_request(tag)
+
+        self.assertTrue(self.controller.wait_comm_idle(remain=0))
+        time.sleep(0.1)
+        self.assertEqual(sorted(self.controller.responses), list(range(8)))
+        self.assertNotEqual(self.controller.responses, list(range(8)))
+
+        ends = self.controller.event_data(CommunicationEvent.Type.SectionEnd)
+        self.assertEqual(len(ends), 8)
+        self.assertEqual(len({x.sid for x in ends}), 8)
+        self.assertTrue(all(x.section.request.raw == x.section.response.raw for x in ends))
+
+    def testCorrelationId(self):
+        results = dict()
+        self.device.plan = lambda data, times: 0.1 - tag_of(data) * 0.01
+
+        def request(tag_):
+            results[tag_] = self.controller.send_sync_request(tag_, timeout=1.0)
+
+        threads = [threading.Thread(target=request, args=(x,)) for x in range(8)]
+        for th in threads:
+            th.start()
+
+        for th in threads:
+            th.join()
+
+        self.assertEqual(results, {x: x for x in range(8)})
+
+    def testRetry(self):
+        # First attempt is dropped, second attempt succeeded
+        self.device.plan = lambda data, times: None if times == 1 else 0.0
+
+        start = time.perf_counter()
+        self.assertEqual(self.controller.send_sync_request(1, timeout=2.0), 1)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.2 + 0.3)
+        self.assertEqual(self.device.requests[TaggedMessage(1).to_bytes()], 2)
+
+        time.sleep(0.05)
+        self.assertEqual(len(self.controller.event_data(CommunicationEvent.Type.SectionStart)), 1)
+        ends = self.controller.event_data(CommunicationEvent.Type.SectionEnd)
+        self.assertEqual(len(ends), 1)
+        self.assertEqual(ends[0].section.response.raw, 1)
+
+    def testTimeout(self):
+        self.device.plan = lambda data, times: None if tag_of(data) == 2 else 0.0
+        self.controller.send_async_request(2)
+        self.controller.send_async_request(3)
+
+        time.sleep(0.2 * 3 + 0.3 + 0.6 + 0.3)
+        self.assertEqual(self.device.requests[TaggedMessage(2).to_bytes()], 3)
+        self.assertEqual(self.controller.responses, [3])
+        self.assertTrue(self.controller.is_timeout())
+        self.assertEqual(len(self.controller.event_data(CommunicationEvent.Type.Timeout)), 1)
+
+        ends = self.controller.event_data(CommunicationEvent.Type.SectionEnd)
+        self.assertEqual(len(ends), 2)
+        self.assertIsInstance([x for x in ends if x.section.request.raw == 2][0].section.response, TransmitWarning)
+
+
+class CoalescingTest(unittest.TestCase):
+    BLOCKER = (False, 100, 1)
+
+    def setUp(self) -> None:
+        self.device = Device()
+        self.device.plan = lambda data, times: 0.3 if data == self.encode(self.BLOCKER) else 0.0
+        self.controller = Controller(TCPClientTransmit(length_fmt=LENGTH_FMT), RegisterMessage, coalescing=True)
+        self.controller.connect(self.device.address, 1.0)
+
+        # Occupy communication thread, following requests are pending in queue
+        self.controller.send_async_request(self.BLOCKER)
+        time.sleep(0.05)
+
+    def tearDown(self) -> None:
+        self.controller.disconnect()
+        self.device.close()
+
+    @staticmethod
+    def encode(raw) -> bytes:
+        return RegisterMessage(raw).to_bytes()
+
+    def send(self, *requests):
+        wraps = [RegisterMessage(x) for x in requests]
+        for request in wraps:
+            self.assertTrue(self.controller.send_request_wrap(request))
+
+        return wraps
+
+    def received(self):
+        self.assertTrue(self.controller.wait_comm_idle(remain=0))
+        time.sleep(0.05)
+        return [struct.unpack(RegisterMessage.FMT, x) for x in self.device.history[1:]]
+
+    def testDuplicate(self):
+        result = list()
+        r1, = self.send((False, 0, 2))
+        th = threading.Thread(target=lambda: result.append(self.controller.send_sync_request((False, 0, 2), 1.0)))
+        th.start()
+        th.join()
+
+        self.assertEqual(result, [(False, 0, 2)])
+        self.assertEqual(r1.wait_response(0), (False, 0, 2))
+        self.assertEqual(self.received(), [(False, 0, 2)])
+        self.assertEqual(self.controller.coalesce_statistic.dict, dict(merged=0, dropped=1, replaced=0))
+
+    def testMerge(self):
+        result = list()
+        r1, = self.send((False, 0, 2))
+        th = threading.Thread(target=lambda: result.append(self.controller.send_sync_request((False, 2, 2), 1.0)))
+        th.start()
+        th.join()
+
+        self.assertEqual(result, [(False, 0, 4)])
+        self.assertEqual(r1.wait_response(0), (False, 0, 4))
+        self.assertEqual(self.received(), [(False, 0, 4)])
+        self.assertEqual(self.controller.coalesce_statistic.dict, dict(merged=1, dropped=0, replaced=0))
+
+    def testLatestWriteWins(self):
+        w1, w2 = self.send((True, 5, 1), (True, 5, 2))
+        self.assertEqual(w1.wait_response(1.0), (True, 5, 2))
+        self.assertEqual(w2.wait_response(0), (True, 5, 2))
+        self.assertEqual(self.received(), [(True, 5, 2)])
+        self.assertEqual(self.controller.coalesce_statistic.dict, dict(merged=0, dropped=0, replaced=1))
+
+    def testReadAcrossWrite(self):
+        # Read after a write never shares response of the read before it
+        self.send((False, 5, 1), (False, 0, 2), (True, 5, 9), (False, 5, 1), (False, 2, 2))
+        self.assertEqual(self.received(), [(False, 5, 1), (False, 0, 2), (True, 5, 9), (False, 5, 1), (False, 2, 2)])
+        self.assertEqual(self.controller.coalesce_statistic.dict, dict(merged=0, dropped=0, replaced=0))
+
+    def testWriteAcrossRead(self):
+        # Read between two writes must see the first write
+        self.send((True, 5, 1), (False, 5, 1), (True, 5, 2))
+        self.assertEqual(self.received(), [(True, 5, 1), (False, 5, 1), (True, 5, 2)])
+        self.assertEqual(self.controller.coalesce_statistic.dict, dict(merged=0, dropped=0, replaced=0))
+
+
+class AsyncCommunicationTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+        # Fixed size message without length header, rx timeout is detected by transmit
+        self.device = Device(length_fmt='', size=4)
+        self.transmit = AsyncTransmitAdapter(AsyncTCPClientTransmit(), self.loop)
+
+    def tearDown(self) -> None:
+        self.controller.disconnect()
+        time.sleep(0.1)
+        self.device.close()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+        self.loop.close()
+
+    def connect(self, **kwargs):
+        self.controller = Controller(self.transmit, **kwargs)
+        self.controller.connect(self.device.address, 0.1)
+
+    def testRequest(self):
+        self.connect()
+        self.assertEqual([self.controller.send_sync_request(x, 1.0) for x in range(4)], list(range(4)))
+        self.assertEqual(self.controller.responses, list(range(4)))
+        self.assertEqual(len(self.controller.event_data(CommunicationEvent.Type.SectionEnd)), 4)
+
+    def testRetry(self):
+        self.connect()
+        self.device.plan = lambda data, times: None if times == 1 else 0.0
+
+        start = time.perf_counter()
+        self.assertEqual(self.controller.send_sync_request(1, 2.0), 1)
+        self.assertGreaterEqual(time.perf_counter() - start, 0.1 + 0.3)
+        self.assertEqual(self.device.requests[TaggedMessage(1).to_bytes()], 2)
+        self.assertFalse(self.controller.is_timeout())
+
+    def testTimeout(self):
+        self.connect(retry=2)
+        self.device.plan = lambda data, times: None
+
+        for tag in range(3):
+            self.controller.send_async_request(tag)
+
+        time.sleep(3 * (0.1 * 2 + 0.3 + 0.1 * 2) + 0.5)
+        self.assertTrue(self.controller.is_timeout())
+        self.assertEqual(len(self.controller.event_data(CommunicationEvent.Type.Timeout)), 3)
+        self.assertEqual(len(self.controller.event_data(CommunicationEvent.Type.Disconnected)), 1)
+        self.assertTrue(all(isinstance(x.section.response, TransmitWarning)
+                            for x in self.controller.event_data(CommunicationEvent.Type.SectionEnd)))
+
+
+if __name__ == '__main__':
+    unittest.main()